@@ -1,6 +1,7 @@
 import datetime
 import json
 import os
+import re
 import sys
 from functools import wraps
 
@@ -13,6 +14,15 @@ try:
 except ImportError:
     JSONDecodeError = ValueError
 
+try:
+    import rpm
+except ImportError:
+    rpm = None
+
+# Names of packages of the leapp framework and the leapp repositories (including e.g. leapp-rhui-* and vendor
+# leapp-data-* packages)
+_LEAPP_PACKAGES_RE = re.compile('leapp|snactor')
+
 
 class _BreadCrumbs(object):
     def __init__(self, activity):
@@ -63,12 +73,36 @@ class _BreadCrumbs(object):
             sys.stderr.write('WARNING: Could not write to /etc/migration-results\n')
 
     def _get_packages(self):
-        cmd = ['/bin/bash', '-c', 'rpm -qa --queryformat="%{nevra} %{SIGPGP:pgpsig}\n" | grep -Ee "leapp|snactor"']
+        if rpm:
+            try:
+                return self._get_packages_from_rpmdb()
+            except (rpm.error, AttributeError):
+                # AttributeError - the rpm python module is too old to provide the dbIndex method
+                pass
+        return self._get_packages_from_rpm_tool()
+
+    @staticmethod
+    def _get_packages_from_rpmdb():
+        # Look up the matching names in the index of names instead of reading headers of all installed packages
+        ts = rpm.TransactionSet()
+        names = set()
+        for name in ts.dbIndex('name'):
+            if isinstance(name, bytes):
+                name = name.decode('utf-8', 'replace')
+            if _LEAPP_PACKAGES_RE.search(name):
+                names.add(name)
+        return [{'nevra': hdr.format('%{nevra}'), 'signature': hdr.format('%{SIGPGP:pgpsig}')}
+                for name in sorted(names) for hdr in ts.dbMatch('name', name)]
+
+    @staticmethod
+    def _get_packages_from_rpm_tool():
+        cmd = ['rpm', '-qa', '--queryformat', r'%{name} %{nevra} %{SIGPGP:pgpsig}\n']
         res = _call(cmd, lambda x, y: None, lambda x, y: None)
         if res.get('exit_code', None) == 0:
             if res.get('stdout', None):
-                return [{'nevra': t[0], 'signature': t[1]}
-                        for t in [line.strip().split(' ', 1) for line in res['stdout'].split('\n') if line.strip()]]
+                return [{'nevra': t[1], 'signature': t[2]}
+                        for t in [line.strip().split(' ', 2) for line in res['stdout'].split('\n') if line.strip()]
+                        if len(t) == 3 and _LEAPP_PACKAGES_RE.search(t[0])]
         return []
 
 
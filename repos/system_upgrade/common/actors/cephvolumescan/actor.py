@@ -1,6 +1,6 @@
 from leapp.actors import Actor
 from leapp.libraries.actor import cephvolumescan
-from leapp.models import CephInfo, InstalledRPM
+from leapp.models import CephInfo, InstalledRPMTable
 from leapp.tags import ChecksPhaseTag, IPUWorkflowTag
 
 
@@ -11,7 +11,7 @@ class CephVolumeScan(Actor):
     """
 
     name = 'cephvolumescan'
-    consumes = (InstalledRPM,)
+    consumes = (InstalledRPMTable,)
     produces = (CephInfo,)
     tags = (ChecksPhaseTag, IPUWorkflowTag)
 
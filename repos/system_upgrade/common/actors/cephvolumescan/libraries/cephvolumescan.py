@@ -5,7 +5,7 @@ import re
 from leapp.exceptions import StopActorExecutionError
 from leapp.libraries.common.rpms import has_package
 from leapp.libraries.stdlib import CalledProcessError, run
-from leapp.models import InstalledRPM
+from leapp.models import InstalledRPMTable
 
 CEPH_CONF = "/etc/ceph/ceph.conf"
 CONTAINER = "ceph-osd"
@@ -29,8 +29,8 @@ def select_osd_container(engine):
 
 def get_ceph_lvm_list():
     base_cmd = ['ceph-volume', 'lvm', 'list', '--format', 'json']
-    container_binary = 'podman' if has_package(InstalledRPM, 'podman') else \
-        'docker' if has_package(InstalledRPM, 'docker') else ''
+    container_binary = 'podman' if has_package(InstalledRPMTable, 'podman') else \
+        'docker' if has_package(InstalledRPMTable, 'docker') else ''
     if container_binary == '':
         cmd_ceph_lvm_list = base_cmd
     else:
@@ -1,5 +1,5 @@
 from leapp.actors import Actor
-from leapp.models import InstalledRPM, HybridImage, FirmwareFacts
+from leapp.models import InstalledRPMTable, HybridImage, FirmwareFacts
 from leapp.tags import ChecksPhaseTag, IPUWorkflowTag
 from leapp.libraries.actor.checkhybridimage import check_hybrid_image
 
@@ -15,7 +15,7 @@ class CheckHybridImage(Actor):
     """
 
     name = 'checkhybridimage'
-    consumes = (InstalledRPM, FirmwareFacts)
+    consumes = (InstalledRPMTable, FirmwareFacts)
     produces = (HybridImage,)
     tags = (ChecksPhaseTag, IPUWorkflowTag)
 
@@ -4,7 +4,7 @@ from leapp import reporting
 from leapp.libraries.common import rhui
 from leapp.libraries.common.rpms import has_package
 from leapp.libraries.stdlib import api
-from leapp.models import FirmwareFacts, HybridImage, InstalledRPM
+from leapp.models import FirmwareFacts, HybridImage, InstalledRPMTable
 
 BIOS_PATH = '/boot/grub2/grubenv'
 EFI_PATH = '/boot/efi/EFI/redhat/grubenv'
@@ -22,7 +22,7 @@ def is_azure_agent_installed():
     """Check whether 'WALinuxAgent' package is installed."""
     upg_path = rhui.get_upg_path()
     agent_pkg = rhui.RHUI_CLOUD_MAP[upg_path].get('azure', {}).get('agent_pkg', '')
-    return has_package(InstalledRPM, agent_pkg)
+    return has_package(InstalledRPMTable, agent_pkg)
 
 
 def is_bios():
@@ -1,9 +1,10 @@
 import pytest
 
 from leapp.libraries.actor import checkhybridimage
+from leapp.libraries.common.rpms import create_rpm_table
 from leapp.libraries.common.testutils import produce_mocked, create_report_mocked, CurrentActorMocked
 from leapp.libraries.stdlib import api
-from leapp.models import FirmwareFacts, InstalledRPM, RPM
+from leapp.models import FirmwareFacts, InstalledRPMTable, RPM
 from leapp.reporting import Report
 from leapp import reporting
 
@@ -18,8 +19,8 @@ NO_AGENT_RPM = RPM(
     pgpsig='RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 199e2f91fd431d51'
 )
 
-INSTALLED_AGENT = InstalledRPM(items=[WA_AGENT_RPM])
-NOT_INSTALLED_AGENT = InstalledRPM(items=[NO_AGENT_RPM])
+INSTALLED_AGENT = create_rpm_table(InstalledRPMTable, [WA_AGENT_RPM])
+NOT_INSTALLED_AGENT = create_rpm_table(InstalledRPMTable, [NO_AGENT_RPM])
 
 BIOS_FIRMWARE = FirmwareFacts(firmware='bios')
 EFI_FIRMWARE = FirmwareFacts(firmware='efi')
@@ -8,7 +8,7 @@ from leapp.libraries.stdlib import api
 from leapp.models import (
     CopyFile,
     DNFPluginTask,
-    InstalledRPM,
+    InstalledRPMTable,
     KernelCmdlineArg,
     RequiredTargetUserspacePackages,
     RHUIInfo,
@@ -26,7 +26,7 @@ class CheckRHUI(Actor):
     """
 
     name = 'checkrhui'
-    consumes = (InstalledRPM)
+    consumes = (InstalledRPMTable)
     produces = (
         KernelCmdlineArg,
         RHUIInfo,
@@ -41,7 +41,7 @@ class CheckRHUI(Actor):
     def process(self):
         upg_path = rhui.get_upg_path()
         for provider, info in rhui.RHUI_CLOUD_MAP[upg_path].items():
-            if has_package(InstalledRPM, info['src_pkg']):
+            if has_package(InstalledRPMTable, info['src_pkg']):
                 # we need to do this workaround in order to overcome our RHUI handling limitation
                 # in case there are more client packages on the source system
                 if 'azure' in info['src_pkg']:
@@ -51,7 +51,7 @@ class CheckRHUI(Actor):
                     ]
                     for azure_sap_variant in azure_sap_variants:
                         sap_variant_info = rhui.RHUI_CLOUD_MAP[upg_path][azure_sap_variant]
-                        if has_package(InstalledRPM, sap_variant_info['src_pkg']):
+                        if has_package(InstalledRPMTable, sap_variant_info['src_pkg']):
                             info = sap_variant_info
                             provider = azure_sap_variant
 
@@ -79,7 +79,7 @@ class CheckRHUI(Actor):
 
                 # When upgrading with RHUI we cannot switch certs and let RHSM provide us repos for target OS content.
                 # Instead, Leapp's provider-specific package containing target OS certs and repos has to be installed.
-                if not has_package(InstalledRPM, info['leapp_pkg']):
+                if not has_package(InstalledRPMTable, info['leapp_pkg']):
                     create_report([
                         reporting.Title('Package "{}" is missing'.format(info['leapp_pkg'])),
                         reporting.Summary(
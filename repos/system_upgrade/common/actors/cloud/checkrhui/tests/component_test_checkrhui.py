@@ -3,9 +3,10 @@ from collections import namedtuple
 import pytest
 
 from leapp.snactor.fixture import current_actor_context
+from leapp.libraries.common.rpms import create_rpm_table
 from leapp.models import (
     InstalledRedHatSignedRPM,
-    InstalledRPM,
+    InstalledRPMTable,
     RPM,
     RHUIInfo,
     RequiredTargetUserspacePackages,
@@ -36,7 +37,7 @@ ON_AWS_WITH_LEAPP_PKG = [
 
 
 def create_modulesfacts(installed_rpm):
-    return InstalledRPM(items=installed_rpm)
+    return create_rpm_table(InstalledRPMTable, installed_rpm)
 
 
 msgs_received = namedtuple('MsgsReceived', ['report', 'rhui_info', 'req_target_userspace'])
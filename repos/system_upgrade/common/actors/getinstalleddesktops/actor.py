@@ -1,6 +1,6 @@
 from leapp.actors import Actor
 from leapp.tags import FactsPhaseTag, IPUWorkflowTag
-from leapp.models import InstalledDesktopsFacts, InstalledRPM
+from leapp.models import InstalledDesktopsFacts, InstalledRPMTable
 from leapp.libraries.actor.getinstalleddesktops import get_installed_desktops
 
 
@@ -11,7 +11,7 @@ class GetInstalledDesktops(Actor):
     """
 
     name = 'get_installed_desktops'
-    consumes = (InstalledRPM,)
+    consumes = (InstalledRPMTable,)
     produces = (InstalledDesktopsFacts,)
     tags = (FactsPhaseTag, IPUWorkflowTag)
 
@@ -1,6 +1,6 @@
 from leapp.libraries.stdlib import api
 from leapp.libraries.common.rpms import has_package
-from leapp.models import InstalledRPM
+from leapp.models import InstalledRPMTable
 
 
 def get_installed_desktops():
@@ -8,8 +8,8 @@ def get_installed_desktops():
     api.current_logger().info("==================================")
 
     # Detect installed desktops by one of the base rpm packages
-    kde_desktop_installed = has_package(InstalledRPM, "kde-workspace")
-    gnome_desktop_installed = has_package(InstalledRPM, "gnome-session")
+    kde_desktop_installed = has_package(InstalledRPMTable, "kde-workspace")
+    gnome_desktop_installed = has_package(InstalledRPMTable, "gnome-session")
     api.current_logger().info("* KDE installed: {0}".format(kde_desktop_installed))
     api.current_logger().info("* Gnome installed: {0}".format(gnome_desktop_installed))
     api.current_logger().info("----------------------------------")
@@ -1,5 +1,6 @@
 from leapp.snactor.fixture import current_actor_context
-from leapp.models import InstalledRPM, RPM, InstalledDesktopsFacts
+from leapp.libraries.common.rpms import create_rpm_table
+from leapp.models import InstalledRPMTable, RPM, InstalledDesktopsFacts
 
 RH_PACKAGER = 'Red Hat, Inc. <http://bugzilla.redhat.com/bugzilla>'
 Gnome_RPM = RPM(name='gnome-session', version='0.1', release='1.sm01', epoch='1', packager=RH_PACKAGER, arch='noarch',
@@ -9,28 +10,28 @@ KDE_RPM = RPM(name='kde-workspace', version='0.1', release='1.sm01', epoch='1',
 
 
 def test_Gnome_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[Gnome_RPM, ]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [Gnome_RPM, ]))
     current_actor_context.run()
     message = current_actor_context.consume(InstalledDesktopsFacts)[0]
     assert message.gnome_installed
 
 
 def test_KDE_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[KDE_RPM, ]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [KDE_RPM, ]))
     current_actor_context.run()
     message = current_actor_context.consume(InstalledDesktopsFacts)[0]
     assert message.kde_installed
 
 
 def test_KDE_Gnome_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[Gnome_RPM, KDE_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [Gnome_RPM, KDE_RPM]))
     current_actor_context.run()
     message = current_actor_context.consume(InstalledDesktopsFacts)[0]
     assert message.gnome_installed and message.kde_installed
 
 
 def test_no_desktop_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, []))
     current_actor_context.run()
     message = current_actor_context.consume(InstalledDesktopsFacts)[0]
     assert not message.gnome_installed and not message.kde_installed
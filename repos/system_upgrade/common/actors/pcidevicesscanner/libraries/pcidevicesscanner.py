@@ -1,5 +1,6 @@
 import re
 
+from leapp.libraries.common import factscache
 from leapp.libraries.stdlib import api, run
 from leapp.models import (
     ActiveKernelModulesFacts,
@@ -113,11 +114,25 @@ def produce_pci_devices(producer, devices):
     producer(PCIDevices(devices=devices))
 
 
-def scan_pci_devices(producer):
-    """ Scan system PCI Devices """
+def _get_inputs():
+    # NOTE: lspci reads the names of devices from the pci.ids database (hwdata)
+    # and the kernel modules from the modules.alias of the running kernel
+    return [
+        factscache.get_content_fingerprint('/proc/bus/pci/devices'),
+        factscache.get_content_fingerprint('/proc/sys/kernel/osrelease'),
+        factscache.get_rpmdb_fingerprint(),
+    ]
+
+
+def _scan_pci_devices():
     pci_textual = run(['lspci', '-vmmk'], checked=False)['stdout']
     pci_numeric = run(['lspci', '-vmmkn'], checked=False)['stdout']
-    devices = parse_pci_devices(pci_textual, pci_numeric)
+    return [PCIDevices(devices=parse_pci_devices(pci_textual, pci_numeric))]
+
+
+def scan_pci_devices(producer):
+    """ Scan system PCI Devices """
+    devices = factscache.collect_cached('pci_devices_scanner', _get_inputs, _scan_pci_devices)[0].devices
     produce_detected_devices(devices)
     produce_detected_drivers(devices)
     produce_pci_devices(producer, devices)
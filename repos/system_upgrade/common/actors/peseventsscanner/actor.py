@@ -2,7 +2,7 @@ from leapp.actors import Actor
 from leapp.libraries.actor.pes_events_scanner import process
 from leapp.models import (
     EnabledModules,
-    InstalledRedHatSignedRPM,
+    InstalledRedHatSignedRPMTable,
     PESRpmTransactionTasks,
     RepositoriesBlacklisted,
     RepositoriesFacts,
@@ -26,7 +26,7 @@ class PesEventsScanner(Actor):
     name = 'pes_events_scanner'
     consumes = (
         EnabledModules,
-        InstalledRedHatSignedRPM,
+        InstalledRedHatSignedRPMTable,
         RepositoriesBlacklisted,
         RepositoriesFacts,
         RepositoriesMapping,
@@ -1,15 +1,23 @@
+import hashlib
 import json
 import os
+import pickle
 from collections import defaultdict, namedtuple
 from enum import IntEnum
+from functools import partial
 from itertools import chain
 
 from leapp import reporting
 from leapp.exceptions import StopActorExecution
-from leapp.libraries.common import fetch
+from leapp.libraries.common import fetch, jsonstream
 from leapp.libraries.common.config import architecture
 from leapp.libraries.stdlib import api
 
+PES_EVENTS_CACHE_PATH = '/var/lib/leapp/pes-events.cache'
+
+# Bump whenever the layout of the cached data changes
+_PES_EVENTS_CACHE_FORMAT = 1
+
 # NOTE(mhecko): The modulestream field contains a set of modulestreams until the very end when we generate a Package
 # for every modulestream in this set.
 _Package = namedtuple('Package', ['name',         # str
@@ -63,13 +71,21 @@ def get_pes_events(pes_json_directory, pes_json_filename):
     """
     Get all the events from the source JSON file exported from PES.
 
+    The parsed events matching the current architecture are cached in PES_EVENTS_CACHE_PATH, so the (expensive)
+    parsing is skipped when neither the PES data nor the parsing code changed since the cache was created.
+
     :return: List of Event tuples, where each event contains event type and input/output pkgs
     """
     try:
-        all_events = parse_pes_events(fetch.read_or_fetch(pes_json_filename, directory=pes_json_directory,
-                                                          allow_empty=True))
         arch = api.current_actor().configuration.architecture
-        events_matching_arch = [e for e in all_events if not e.architectures or arch in e.architectures]
+        with fetch.open_or_fetch(pes_json_filename, directory=pes_json_directory, allow_empty=True) as pes_data:
+            cache_key = _get_pes_events_cache_key(pes_data, arch)
+            events_matching_arch = _load_cached_pes_events(cache_key)
+            if events_matching_arch is None:
+                pes_data.seek(0)
+                all_events = iter_pes_events(pes_data)
+                events_matching_arch = [e for e in all_events if not e.architectures or arch in e.architectures]
+                _store_pes_events_to_cache(cache_key, events_matching_arch)
         return events_matching_arch
     except (ValueError, KeyError):
         title = 'Missing/Invalid PES data file ({}/{})'.format(pes_json_directory, pes_json_filename)
@@ -86,6 +102,79 @@ def get_pes_events(pes_json_directory, pes_json_filename):
         raise StopActorExecution()
 
 
+def _get_parser_digest():
+    """
+    Get the digest of the source code of this module.
+
+    The digest identifies the version of the parser, so any update of leapp-repository changing the way the events
+    are parsed invalidates previously cached events.
+    """
+    source_path = __file__[:-1] if __file__.endswith(('.pyc', '.pyo')) else __file__
+    with open(source_path, 'rb') as source:
+        return hashlib.sha256(source.read()).hexdigest()
+
+
+def _get_pes_events_cache_key(pes_data, arch):
+    pes_data_digest = hashlib.sha256()
+    for chunk in iter(partial(pes_data.read, jsonstream.DEFAULT_CHUNK_SIZE), ''):
+        pes_data_digest.update(chunk.encode('utf-8'))
+    return (_PES_EVENTS_CACHE_FORMAT, _get_parser_digest(), pes_data_digest.hexdigest(), arch)
+
+
+def _serialize_pkgs(pkgs):
+    return tuple((pkg.name, pkg.repository, pkg.modulestream) for pkg in pkgs)
+
+
+def _deserialize_pkgs(serialized_pkgs):
+    return {Package(name, repository, modulestream) for name, repository, modulestream in serialized_pkgs}
+
+
+def _load_cached_pes_events(cache_key):
+    """
+    Load events from the PES events cache.
+
+    :param cache_key: Key the cached events have to be stored with, see _get_pes_events_cache_key.
+    :returns: List of Event tuples or None if there are no (valid) cached events for the given key.
+    """
+    if not os.path.exists(PES_EVENTS_CACHE_PATH):
+        return None
+
+    try:
+        with open(PES_EVENTS_CACHE_PATH, 'rb') as cache:
+            if pickle.load(cache) != cache_key:
+                api.current_logger().debug('The PES events cache is outdated, PES data will be parsed.')
+                return None
+            serialized_events = pickle.load(cache)
+
+        return [
+            Event(event_id, Action(action_id), _deserialize_pkgs(in_pkgs), _deserialize_pkgs(out_pkgs),
+                  tuple(from_release), tuple(to_release), list(architectures))
+            for event_id, action_id, in_pkgs, out_pkgs, from_release, to_release, architectures in serialized_events
+        ]
+    except Exception as e:  # pylint: disable=broad-except
+        # The cache is just an optimization - any corrupted data should result only in parsing the PES data again
+        api.current_logger().warning('Failed to load the PES events cache {0}: {1}'.format(PES_EVENTS_CACHE_PATH, e))
+        return None
+
+
+def _store_pes_events_to_cache(cache_key, events):
+    serialized_events = [
+        (event.id, int(event.action), _serialize_pkgs(event.in_pkgs), _serialize_pkgs(event.out_pkgs),
+         event.from_release, event.to_release, event.architectures)
+        for event in events
+    ]
+
+    # Write the cache into a temporary file first, so a concurrently running leapp never reads incomplete data
+    tmp_cache_path = '{0}.tmp'.format(PES_EVENTS_CACHE_PATH)
+    try:
+        with open(tmp_cache_path, 'wb') as cache:
+            pickle.dump(cache_key, cache, protocol=2)
+            pickle.dump(serialized_events, cache, protocol=2)
+        os.rename(tmp_cache_path, PES_EVENTS_CACHE_PATH)
+    except EnvironmentError as e:
+        api.current_logger().warning('Failed to store the PES events cache {0}: {1}'.format(PES_EVENTS_CACHE_PATH, e))
+
+
 def generate_event_for_ms_mapping_entry(from_ms_to_ms_entry, event):
     from_modulestream, to_modulestreams = from_ms_to_ms_entry
 
@@ -156,6 +245,29 @@ def parse_pes_events(json_data):
     return list(chain(*[parse_entry(entry) for entry in data['packageinfo']]))
 
 
+def iter_pes_events(pes_data):
+    """
+    Parse PES events from the given file with JSON data incrementally.
+
+    Contrary to parse_pes_events, the entries are decoded and parsed one at a time, so the whole JSON document
+    is never kept in memory.
+
+    :param pes_data: A text file object containing PES data.
+    :return: Iterator over Event tuples, where each event contains event type and input/output pkgs
+    """
+    found_entries = False
+    for key, value in jsonstream.iter_object_members(pes_data, streamed_keys=('packageinfo',)):
+        if key != 'packageinfo':
+            continue
+        for entry in value:
+            found_entries = True
+            for event in parse_entry(entry):
+                yield event
+
+    if not found_entries:
+        raise ValueError('Found PES data with invalid structure')
+
+
 def parse_entry(entry):
     """
     Parse PES event data
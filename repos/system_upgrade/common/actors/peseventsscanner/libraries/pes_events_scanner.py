@@ -10,7 +10,7 @@ from leapp.libraries.stdlib import api
 from leapp.libraries.stdlib.config import is_verbose
 from leapp.models import (
     EnabledModules,
-    InstalledRedHatSignedRPM,
+    InstalledRedHatSignedRPMTable,
     Module,
     PESIDRepositoryEntry,
     PESRpmTransactionTasks,
@@ -57,20 +57,24 @@ def get_best_pesid_candidate(candidate_a, candidate_b, cloud_provider):
 def get_installed_pkgs():
     installed_pkgs = set()
 
-    installed_rh_signed_rpm_msgs = api.consume(InstalledRedHatSignedRPM)
+    installed_rh_signed_rpm_msgs = api.consume(InstalledRedHatSignedRPMTable)
     installed_rh_signed_rpm_msg = next(installed_rh_signed_rpm_msgs, None)
     if list(installed_rh_signed_rpm_msgs):
-        api.current_logger().warning('Unexpectedly received more than one InstalledRedHatSignedRPM message.')
+        api.current_logger().warning('Unexpectedly received more than one InstalledRedHatSignedRPMTable message.')
     if not installed_rh_signed_rpm_msg:
         raise StopActorExecutionError('Cannot parse PES data properly due to missing list of installed packages',
                                       details={'Problem': 'Did not receive a message with installed Red Hat-signed '
-                                                          'packages (InstalledRedHatSignedRPM)'})
+                                                          'packages (InstalledRedHatSignedRPMTable)'})
 
-    for pkg in installed_rh_signed_rpm_msg.items:
+    # Only a few columns are needed, so read them directly instead of creating views of whole packages
+    for name, repository, module, stream in zip(installed_rh_signed_rpm_msg.names,
+                                                installed_rh_signed_rpm_msg.repositories,
+                                                installed_rh_signed_rpm_msg.modules,
+                                                installed_rh_signed_rpm_msg.streams):
         modulestream = None
-        if pkg.module and pkg.stream:
-            modulestream = (pkg.module, pkg.stream)
-        installed_pkgs.add(Package(name=pkg.name, repository=pkg.repository, modulestream=modulestream))
+        if module and stream:
+            modulestream = (module, stream)
+        installed_pkgs.add(Package(name=name, repository=repository, modulestream=modulestream))
 
     return installed_pkgs
 
@@ -121,16 +125,74 @@ def _get_enabled_modules():
     return enabled_modules_msg.modules
 
 
+class EventIndex(object):
+    """
+    Index over PES events allowing to quickly look up events that can affect a given set of packages.
+
+    Events are bucketed by their target release and every bucket holds an inverted index mapping the names of
+    the event's in_pkgs to the positions of the events in the bucket. Events without any in_pkgs are always
+    considered relevant, as their applicability does not depend on any installed package.
+    """
+
+    def __init__(self, events):
+        self._events_by_release = {}
+        self._positions_by_pkg_name = {}
+        self._unconditional_positions = {}
+
+        for event in events:
+            release_events = self._events_by_release.setdefault(event.to_release, [])
+            position = len(release_events)
+            release_events.append(event)
+
+            if not event.in_pkgs:
+                self._unconditional_positions.setdefault(event.to_release, []).append(position)
+                continue
+
+            release_name_index = self._positions_by_pkg_name.setdefault(event.to_release, {})
+            for pkg_name in {pkg.name for pkg in event.in_pkgs}:
+                release_name_index.setdefault(pkg_name, []).append(position)
+
+    def get_release_events_for_pkg_names(self, release, pkg_names):
+        """
+        Get events of the given release having at least one of their in_pkgs named as one of the given names.
+
+        Events without in_pkgs are always included. The events are returned in the same order as they were
+        given when constructing the index, as the order of event application matters.
+
+        :param release: Release (major, minor) the events should be targeting.
+        :param pkg_names: Names of the packages the events should be relevant for.
+        :returns: List of Event tuples.
+        """
+        release_events = self._events_by_release.get(release, [])
+        release_name_index = self._positions_by_pkg_name.get(release, {})
+
+        positions = set(self._unconditional_positions.get(release, []))
+
+        # Iterate over the smaller of the two collections so the lookup scales with the number of packages
+        if len(pkg_names) <= len(release_name_index):
+            for pkg_name in pkg_names:
+                positions.update(release_name_index.get(pkg_name, ()))
+        else:
+            for pkg_name, pkg_positions in release_name_index.items():
+                if pkg_name in pkg_names:
+                    positions.update(pkg_positions)
+
+        return [release_events[position] for position in sorted(positions)]
+
+
 def compute_pkg_changes_between_consequent_releases(source_installed_pkgs,
-                                                    events,
-                                                    release,
+                                                    release_events,
                                                     seen_pkgs,
                                                     pkgs_to_demodularize):
+    """
+    Apply the events of a single release to the given packages.
+
+    :param release_events: Events of the release that should be applied, in the order they should be applied.
+                           Events whose in_pkgs are not in seen_pkgs can be omitted as they do not have any effect.
+    """
     # Start with the installed packages and modify the set according to release events
     target_pkgs = set(source_installed_pkgs)
 
-    release_events = [e for e in events if e.to_release == release]
-
     for event in release_events:
         # PRESENCE events have a different semantics than the other events - they add a package to a target state
         # only if it had been seen (installed) during the course of the overall target packages
@@ -168,6 +230,12 @@ def compute_packages_on_target_system(source_pkgs, events, releases):
     seen_pkgs = set(source_pkgs)  # Used to track whether PRESENCE events can be applied
     target_pkgs = set(source_pkgs)
 
+    # The installed packages, as well as the packages to demodularize, are always a subset of the seen packages.
+    # Therefore, an event none of whose in_pkgs has been seen cannot have any effect and it does not need to be
+    # evaluated at all.
+    event_index = EventIndex(events)
+    seen_pkg_names = {pkg.name for pkg in seen_pkgs}
+
     source_major_version = int(version.get_source_major_version())
     did_processing_cross_major_version = False
     pkgs_to_demodularize = set()  # Modified by compute_pkg_changes
@@ -177,10 +245,13 @@ def compute_packages_on_target_system(source_pkgs, events, releases):
             did_processing_cross_major_version = True
             pkgs_to_demodularize = {pkg for pkg in target_pkgs if pkg.modulestream}
 
-        target_pkgs, pkgs_to_demodularize = compute_pkg_changes_between_consequent_releases(target_pkgs, events,
-                                                                                            release, seen_pkgs,
+        release_events = event_index.get_release_events_for_pkg_names(release, seen_pkg_names)
+        target_pkgs, pkgs_to_demodularize = compute_pkg_changes_between_consequent_releases(target_pkgs,
+                                                                                            release_events,
+                                                                                            seen_pkgs,
                                                                                             pkgs_to_demodularize)
         seen_pkgs = seen_pkgs.union(target_pkgs)
+        seen_pkg_names.update(pkg.name for pkg in target_pkgs)
 
     demodularized_pkgs = {Package(pkg.name, pkg.repository, None) for pkg in pkgs_to_demodularize}
     demodularized_target_pkgs = target_pkgs.difference(pkgs_to_demodularize).union(demodularized_pkgs)
@@ -1,16 +1,23 @@
+import io
 import os.path
 from collections import namedtuple
 
 import pytest
 
+from leapp.libraries.actor import pes_event_parsing
 from leapp.libraries.actor.pes_event_parsing import (
     Action,
+    api,
     Event,
+    fetch,
+    get_pes_events,
+    iter_pes_events,
     Package,
     parse_entry,
     parse_packageset,
     parse_pes_events
 )
+from leapp.libraries.common.testutils import CurrentActorMocked
 
 CUR_DIR = os.path.dirname(os.path.abspath(__file__))
 
@@ -146,3 +153,51 @@ def test_parse_pes_events_with_modulestreams(current_actor_context):
         if not expected:
             break
     assert not expected
+
+
+@pytest.mark.parametrize('sample_file', ('sample01.json', 'sample04.json'))
+def test_iter_pes_events(current_actor_context, sample_file):
+    """
+    Tests whether the events parsed incrementally from a file match the events parsed from the whole JSON data.
+    """
+    with io.open(os.path.join(CUR_DIR, 'files', sample_file), encoding='utf-8') as f:
+        expected_events = parse_pes_events(f.read())
+        f.seek(0)
+        events = list(iter_pes_events(f))
+
+    assert events == expected_events
+
+
+@pytest.mark.parametrize('json_data', ('', '[]', '{}', '{"packageinfo": []}', '{"packageinfo": [}'))
+def test_iter_pes_events_invalid_data(current_actor_context, json_data):
+    with pytest.raises(ValueError):
+        list(iter_pes_events(io.StringIO(u'{0}'.format(json_data))))
+
+
+def test_pes_events_are_cached(monkeypatch, tmpdir):
+    """
+    Tests whether the parsed events are loaded from the cache as long as the PES data did not change.
+    """
+    sample_path = os.path.join(CUR_DIR, 'files/sample04.json')
+
+    monkeypatch.setattr(pes_event_parsing, 'PES_EVENTS_CACHE_PATH', str(tmpdir.join('pes-events.cache')))
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked())
+    monkeypatch.setattr(fetch, 'open_or_fetch', lambda *args, **kwargs: io.open(sample_path, encoding='utf-8'))
+
+    parsed_events = get_pes_events('/etc/leapp/files', 'pes-events.json')
+
+    def iter_pes_events_mocked(pes_data):
+        raise AssertionError('PES events should have been loaded from the cache')
+
+    with monkeypatch.context() as m:
+        m.setattr(pes_event_parsing, 'iter_pes_events', iter_pes_events_mocked)
+        cached_events = get_pes_events('/etc/leapp/files', 'pes-events.json')
+
+    assert cached_events == parsed_events
+
+    # Changed PES data have to invalidate the cache
+    sample_path = os.path.join(CUR_DIR, 'files/sample01.json')
+
+    events = get_pes_events('/etc/leapp/files', 'pes-events.json')
+    assert len(events) == 2
+    assert events[0].action == Action.SPLIT
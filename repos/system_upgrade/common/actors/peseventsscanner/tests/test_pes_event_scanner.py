@@ -9,16 +9,18 @@ from leapp.libraries.actor.pes_events_scanner import (
     api,
     compute_packages_on_target_system,
     compute_rpm_tasks_from_pkg_set_diff,
+    EventIndex,
     get_installed_pkgs,
     Package,
     process,
     reporting,
     TransactionConfiguration
 )
+from leapp.libraries.common.rpms import create_rpm_table
 from leapp.libraries.common.testutils import create_report_mocked, CurrentActorMocked, produce_mocked
 from leapp.models import (
     EnabledModules,
-    InstalledRedHatSignedRPM,
+    InstalledRedHatSignedRPMTable,
     PESIDRepositoryEntry,
     PESRpmTransactionTasks,
     RepoMapEntry,
@@ -178,6 +180,32 @@ def test_compute_pkg_state(monkeypatch):
     assert target_pkgs == expected_target_pkgs
 
 
+def test_event_index_lookup():
+    events = [
+        Event(1, Action.REMOVED, {Package('a', 'rhel7-repo', None)}, set(), (7, 9), (8, 0), []),
+        Event(2, Action.RENAMED, {Package('b', 'rhel7-repo', None)}, {Package('c', 'rhel8-repo', None)},
+              (7, 9), (8, 0), []),
+        Event(3, Action.SPLIT, set(), {Package('d', 'rhel8-repo', None)}, (7, 9), (8, 0), []),
+        Event(4, Action.MERGED,
+              {Package('a', 'rhel7-repo', None), Package('c', 'rhel8-repo', None)},
+              {Package('e', 'rhel8-repo', None)}, (7, 9), (8, 0), []),
+        Event(5, Action.REMOVED, {Package('a', 'rhel8-repo', None)}, set(), (8, 0), (8, 1), []),
+    ]
+
+    event_index = EventIndex(events)
+
+    def ids(release, pkg_names):
+        return [event.id for event in event_index.get_release_events_for_pkg_names(release, pkg_names)]
+
+    # Events without in_pkgs are always relevant and the original event order is preserved
+    assert ids((8, 0), {'a'}) == [1, 3, 4]
+    assert ids((8, 0), {'c', 'b', 'x'}) == [2, 3, 4]
+    assert ids((8, 0), set()) == [3]
+    assert ids((8, 1), {'a'}) == [5]
+    assert ids((8, 1), {'b'}) == []
+    assert ids((9, 0), {'a'}) == []
+
+
 def test_compute_rpm_tasks_from_pkg_set_diff(monkeypatch):
     monkeypatch.setattr(api, 'current_actor', CurrentActorMocked(msgs=[EnabledModules(modules=[])]))
     source_pkgs = {
@@ -229,7 +257,7 @@ def test_actor_performs(monkeypatch):
 
     _RPM = partial(RPM, epoch='', packager='', version='', release='', arch='', pgpsig='')
 
-    installed_pkgs = InstalledRedHatSignedRPM(items=[
+    installed_pkgs = create_rpm_table(InstalledRedHatSignedRPMTable, [
         _RPM(name='split-in'), _RPM(name='moved-in'), _RPM(name='removed')
     ])
 
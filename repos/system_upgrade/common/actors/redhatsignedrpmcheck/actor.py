@@ -1,6 +1,6 @@
 from leapp.actors import Actor
 from leapp.libraries.actor.redhatsignedrpmcheck import check_unsigned_packages
-from leapp.models import InstalledUnsignedRPM
+from leapp.models import InstalledUnsignedRPMTable
 from leapp.reporting import Report
 from leapp.tags import ChecksPhaseTag, IPUWorkflowTag
 
@@ -14,7 +14,7 @@ class RedHatSignedRpmCheck(Actor):
     """
 
     name = 'red_hat_signed_rpm_check'
-    consumes = (InstalledUnsignedRPM,)
+    consumes = (InstalledUnsignedRPMTable,)
     produces = (Report,)
     tags = (IPUWorkflowTag, ChecksPhaseTag)
 
@@ -1,16 +1,16 @@
 from leapp import reporting
 from leapp.libraries.actor import redhatsignedrpmcheck
+from leapp.libraries.common.rpms import create_rpm_table
 from leapp.libraries.common.testutils import produce_mocked, create_report_mocked
 from leapp.libraries.stdlib import api
-from leapp.models import RPM, InstalledUnsignedRPM
+from leapp.models import RPM, InstalledUnsignedRPMTable
 
 RH_PACKAGER = 'Red Hat, Inc. <http://bugzilla.redhat.com/bugzilla>'
 
 
 def test_actor_execution_without_unsigned_data(monkeypatch):
     def consume_unsigned_message_mocked(*models):
-        installed_rpm = []
-        yield InstalledUnsignedRPM(items=installed_rpm)
+        yield InstalledUnsignedRPMTable()
     monkeypatch.setattr(api, "consume", consume_unsigned_message_mocked)
     monkeypatch.setattr(api, "produce", produce_mocked())
     monkeypatch.setattr(api, "show_message", lambda x: True)
@@ -33,7 +33,7 @@ def test_actor_execution_with_unsigned_data(monkeypatch):
                 pgpsig='SOME_OTHER_SIG_X'),
             RPM(name='sample08', version='0.1', release='1.sm01', epoch='1', packager=RH_PACKAGER, arch='noarch',
                 pgpsig='SOME_OTHER_SIG_X')]
-        yield InstalledUnsignedRPM(items=installed_rpm)
+        yield create_rpm_table(InstalledUnsignedRPMTable, installed_rpm)
 
     monkeypatch.setattr(api, "consume", consume_unsigned_message_mocked)
     monkeypatch.setattr(api, "produce", produce_mocked())
@@ -0,0 +1,91 @@
+import json
+
+from leapp.exceptions import StopActorExecutionError
+from leapp.libraries.common import rhui
+from leapp.libraries.common.config import get_env
+from leapp.libraries.common.rpms import create_rpm_table, get_pgpsig_key_id, iter_rpm_rows
+from leapp.libraries.stdlib import api
+from leapp.models import (
+    InstalledRedHatSignedRPM,
+    InstalledRedHatSignedRPMTable,
+    InstalledRPMTable,
+    InstalledUnsignedRPMTable
+)
+
+RH_SIGS = frozenset([
+    '199e2f91fd431d51',
+    '5326810137017186',
+    '938a80caf21541eb',
+    'fd372689897da07a',
+    '45689c882fa658e0',
+])
+
+TRUSTED_KEYS_FILE = 'trusted_keys.json'
+
+# AWS RHUI packages do not have to be whitelisted because they are signed by RedHat
+WHITELISTED_CLOUD_FLAVOURS = ('azure', 'azure-eus', 'azure-sap', 'google', 'google-sap')
+
+
+def _get_extra_trusted_keys():
+    """
+    Return IDs of the additional trusted keys listed in the data file of the actor.
+
+    The data file allows to trust packages signed by the keys of other vendors without changes of the code.
+    """
+    path = api.get_actor_file_path(TRUSTED_KEYS_FILE)
+    if not path:
+        return set()
+    try:
+        with open(path) as f:
+            return {key.lower() for key in json.load(f)['keys']}
+    except (IOError, OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+        raise StopActorExecutionError(
+            'Cannot read the list of trusted keys from {}'.format(path),
+            details={'details': str(e)}
+        )
+
+
+def _get_whitelisted_cloud_pkgs():
+    cloud_map = rhui.RHUI_CLOUD_MAP[rhui.get_upg_path()]
+    pkgs = set()
+    for flavour in WHITELISTED_CLOUD_FLAVOURS:
+        pkgs.add(cloud_map.get(flavour, {}).get('src_pkg'))
+        pkgs.add(cloud_map.get(flavour, {}).get('target_pkg'))
+    pkgs.discard(None)
+    return pkgs
+
+
+def _is_signed(pkg, trusted_keys, whitelisted_pkgs):
+    # The checks are ordered from the most common case, so the rest is evaluated only for unsigned packages
+    return (
+        get_pgpsig_key_id(pkg.pgpsig) in trusted_keys
+        or pkg.name in whitelisted_pkgs
+        # gpg-pubkey is not signed as it would require another package to verify its signature
+        or (pkg.name == 'gpg-pubkey' and pkg.packager.startswith('Red Hat, Inc.'))
+        # Whitelist the katello package
+        or pkg.name.startswith('katello-ca-consumer')
+    )
+
+
+def process():
+    signed_pkgs = []
+    unsigned_pkgs = []
+    # if we start upgrade with LEAPP_DEVEL_RPMS_ALL_SIGNED=1, we consider all packages to be signed
+    if get_env('LEAPP_DEVEL_RPMS_ALL_SIGNED', '0') == '1':
+        for rpm_table in api.consume(InstalledRPMTable):
+            signed_pkgs.extend(iter_rpm_rows(rpm_table))
+    else:
+        trusted_keys = RH_SIGS | _get_extra_trusted_keys()
+        whitelisted_pkgs = _get_whitelisted_cloud_pkgs()
+        for rpm_table in api.consume(InstalledRPMTable):
+            for pkg in iter_rpm_rows(rpm_table):
+                if _is_signed(pkg, trusted_keys, whitelisted_pkgs):
+                    signed_pkgs.append(pkg)
+                else:
+                    unsigned_pkgs.append(pkg)
+
+    # NOTE: the RPM models are created just for the signed packages, as the InstalledRedHatSignedRPM message
+    # is still consumed by many actors
+    api.produce(InstalledRedHatSignedRPM(items=[pkg.to_model() for pkg in signed_pkgs]))
+    api.produce(create_rpm_table(InstalledRedHatSignedRPMTable, signed_pkgs))
+    api.produce(create_rpm_table(InstalledUnsignedRPMTable, unsigned_pkgs))
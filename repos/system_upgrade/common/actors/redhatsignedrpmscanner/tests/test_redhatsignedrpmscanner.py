@@ -1,12 +1,17 @@
+import json
+
 import mock
 
+from leapp.libraries.actor import redhatsignedrpmscanner
 from leapp.libraries.common import rpms
 from leapp.libraries.common.config import mock_configs
+from leapp.libraries.common.testutils import CurrentActorMocked, produce_mocked
+from leapp.libraries.stdlib import api
 from leapp.models import (
     RPM,
     InstalledRedHatSignedRPM,
-    InstalledRPM,
-    InstalledUnsignedRPM,
+    InstalledRPMTable,
+    InstalledUnsignedRPMTable,
     IPUConfig,
     Model,
     fields,
@@ -31,7 +36,7 @@ class MockModel(Model):
 def test_no_installed_rpms(current_actor_context):
     current_actor_context.run(config_model=mock_configs.CONFIG)
     assert current_actor_context.consume(InstalledRedHatSignedRPM)
-    assert current_actor_context.consume(InstalledUnsignedRPM)
+    assert current_actor_context.consume(InstalledUnsignedRPMTable)
 
 
 def test_actor_execution_with_signed_unsigned_data(current_actor_context):
@@ -55,12 +60,12 @@ def test_actor_execution_with_signed_unsigned_data(current_actor_context):
         RPM(name='sample09', version='0.1', release='1.sm01', epoch='1', packager=RH_PACKAGER, arch='noarch',
             pgpsig='RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 45689c882fa658e0')]
 
-    current_actor_context.feed(InstalledRPM(items=installed_rpm))
+    current_actor_context.feed(rpms.create_rpm_table(InstalledRPMTable, installed_rpm))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     assert current_actor_context.consume(InstalledRedHatSignedRPM)
     assert len(current_actor_context.consume(InstalledRedHatSignedRPM)[0].items) == 5
-    assert current_actor_context.consume(InstalledUnsignedRPM)
-    assert len(current_actor_context.consume(InstalledUnsignedRPM)[0].items) == 4
+    assert current_actor_context.consume(InstalledUnsignedRPMTable)
+    assert len(current_actor_context.consume(InstalledUnsignedRPMTable)[0].names) == 4
 
 
 def test_all_rpms_signed(current_actor_context):
@@ -75,11 +80,11 @@ def test_all_rpms_signed(current_actor_context):
             pgpsig='SOME_OTHER_SIG_X')
     ]
 
-    current_actor_context.feed(InstalledRPM(items=installed_rpm))
+    current_actor_context.feed(rpms.create_rpm_table(InstalledRPMTable, installed_rpm))
     current_actor_context.run(config_model=mock_configs.CONFIG_ALL_SIGNED)
     assert current_actor_context.consume(InstalledRedHatSignedRPM)
     assert len(current_actor_context.consume(InstalledRedHatSignedRPM)[0].items) == 4
-    assert not current_actor_context.consume(InstalledUnsignedRPM)[0].items
+    assert not current_actor_context.consume(InstalledUnsignedRPMTable)[0].names
 
 
 def test_katello_pkg_goes_to_signed(current_actor_context):
@@ -93,11 +98,11 @@ def test_katello_pkg_goes_to_signed(current_actor_context):
             pgpsig=''),
     ]
 
-    current_actor_context.feed(InstalledRPM(items=installed_rpm))
+    current_actor_context.feed(rpms.create_rpm_table(InstalledRPMTable, installed_rpm))
     current_actor_context.run(config_model=mock_configs.CONFIG_ALL_SIGNED)
     assert current_actor_context.consume(InstalledRedHatSignedRPM)
     assert len(current_actor_context.consume(InstalledRedHatSignedRPM)[0].items) == 1
-    assert not current_actor_context.consume(InstalledUnsignedRPM)[0].items
+    assert not current_actor_context.consume(InstalledUnsignedRPMTable)[0].names
 
 
 def test_gpg_pubkey_pkg(current_actor_context):
@@ -108,12 +113,12 @@ def test_gpg_pubkey_pkg(current_actor_context):
             pgpsig='RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 9ea903b1361e896b'),
     ]
 
-    current_actor_context.feed(InstalledRPM(items=installed_rpm))
+    current_actor_context.feed(rpms.create_rpm_table(InstalledRPMTable, installed_rpm))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     assert current_actor_context.consume(InstalledRedHatSignedRPM)
     assert len(current_actor_context.consume(InstalledRedHatSignedRPM)[0].items) == 1
-    assert current_actor_context.consume(InstalledUnsignedRPM)
-    assert len(current_actor_context.consume(InstalledUnsignedRPM)[0].items) == 1
+    assert current_actor_context.consume(InstalledUnsignedRPMTable)
+    assert len(current_actor_context.consume(InstalledUnsignedRPMTable)[0].names) == 1
 
 
 def test_create_lookup():
@@ -163,9 +168,36 @@ def test_has_package(current_actor_context):
             pgpsig='SOME_OTHER_SIG_X'),
     ]
 
-    current_actor_context.feed(InstalledRPM(items=installed_rpm))
+    current_actor_context.feed(rpms.create_rpm_table(InstalledRPMTable, installed_rpm))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     assert rpms.has_package(InstalledRedHatSignedRPM, 'sample01', context=current_actor_context)
     assert not rpms.has_package(InstalledRedHatSignedRPM, 'nosuchpackage', context=current_actor_context)
-    assert rpms.has_package(InstalledUnsignedRPM, 'sample02', context=current_actor_context)
-    assert not rpms.has_package(InstalledUnsignedRPM, 'nosuchpackage', context=current_actor_context)
+    assert rpms.has_package(InstalledUnsignedRPMTable, 'sample02', context=current_actor_context)
+    assert not rpms.has_package(InstalledUnsignedRPMTable, 'nosuchpackage', context=current_actor_context)
+
+
+def test_extra_trusted_keys(monkeypatch, tmpdir):
+    keys_file = tmpdir.join('trusted_keys.json')
+    keys_file.write(json.dumps({'keys': ['AAAABBBBCCCCDDDD']}))
+    installed_rpm = [
+        RPM(name='sample01', version='0.1', release='1.sm01', epoch='1', packager='Vendor', arch='noarch',
+            pgpsig='RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID aaaabbbbccccdddd'),
+        RPM(name='sample02', version='0.1', release='1.sm01', epoch='1', packager='Vendor', arch='noarch',
+            pgpsig='RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 9ea903b1361e896b'),
+        RPM(name='sample03', version='0.1', release='1.sm01', epoch='1', packager=RH_PACKAGER, arch='noarch',
+            pgpsig='RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 199e2f91fd431d51'),
+        RPM(name='sample04', version='0.1', release='1.sm01', epoch='1', packager=RH_PACKAGER, arch='noarch',
+            pgpsig='(none)'),
+    ]
+
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked(
+        msgs=[rpms.create_rpm_table(InstalledRPMTable, installed_rpm)]
+    ))
+    monkeypatch.setattr(api, 'get_actor_file_path', lambda dummy_name: keys_file.strpath)
+    monkeypatch.setattr(api, 'produce', produce_mocked())
+    redhatsignedrpmscanner.process()
+
+    signed, signed_table, unsigned_table = api.produce.model_instances
+    assert [pkg.name for pkg in signed.items] == ['sample01', 'sample03']
+    assert signed_table.names == ['sample01', 'sample03']
+    assert unsigned_table.names == ['sample02', 'sample04']
@@ -0,0 +1,20 @@
+from leapp.actors import Actor
+from leapp.libraries.actor import removepackagecache
+from leapp.tags import FirstBootPhaseTag, IPUWorkflowTag
+
+
+class RemovePackageCache(Actor):
+    """
+    Remove the package cache of leapp.
+
+    The packages stored to not download them again on the next run of leapp are not needed
+    after the upgrade anymore.
+    """
+
+    name = 'remove_package_cache'
+    consumes = ()
+    produces = ()
+    tags = (FirstBootPhaseTag.After, IPUWorkflowTag)
+
+    def process(self):
+        removepackagecache.process()
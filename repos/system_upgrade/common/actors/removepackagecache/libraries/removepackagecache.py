@@ -0,0 +1,5 @@
+from leapp.libraries.common import pkgcache
+
+
+def process():
+    pkgcache.remove_cache()
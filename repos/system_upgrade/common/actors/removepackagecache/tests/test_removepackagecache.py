@@ -0,0 +1,46 @@
+import os
+import sys
+
+from leapp.libraries.actor import removepackagecache
+from leapp.libraries.common import pkgcache
+from leapp.libraries.common.testutils import logger_mocked
+from leapp.libraries.stdlib import api
+
+
+def _mock_package_cache(monkeypatch, tmpdir):
+    monkeypatch.setattr(api, 'current_logger', logger_mocked())
+    monkeypatch.setattr(pkgcache, 'PACKAGE_CACHE_DIR', tmpdir.join('package-cache').strpath)
+
+
+def test_remove_package_cache(monkeypatch, tmpdir):
+    _mock_package_cache(monkeypatch, tmpdir)
+    tmpdir.mkdir('package-cache').mkdir('ab').join('abcdef.rpm').write('package')
+
+    removepackagecache.process()
+    assert not os.path.exists(pkgcache.PACKAGE_CACHE_DIR)
+    assert not api.current_logger.warnmsg
+
+
+def test_remove_missing_package_cache(monkeypatch, tmpdir):
+    _mock_package_cache(monkeypatch, tmpdir)
+
+    removepackagecache.process()
+    assert not os.path.exists(pkgcache.PACKAGE_CACHE_DIR)
+    assert not api.current_logger.infomsg
+    assert not api.current_logger.warnmsg
+
+
+def test_remove_package_cache_error(monkeypatch, tmpdir):
+    def rmtree_mocked(path, onerror):
+        try:
+            raise OSError('Device or resource busy')
+        except OSError:
+            onerror(os.rmdir, path, sys.exc_info())
+
+    _mock_package_cache(monkeypatch, tmpdir)
+    tmpdir.mkdir('package-cache')
+    monkeypatch.setattr(pkgcache.shutil, 'rmtree', rmtree_mocked)
+
+    # The error is just logged, it must not stop the upgrade
+    removepackagecache.process()
+    assert api.current_logger.warnmsg
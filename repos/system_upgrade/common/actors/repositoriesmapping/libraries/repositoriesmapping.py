@@ -1,10 +1,10 @@
 from collections import defaultdict
-import json
 import os
 
 from leapp.exceptions import StopActorExecutionError
+from leapp.libraries.common import jsonstream
 from leapp.libraries.common.config.version import get_target_major_version, get_source_major_version
-from leapp.libraries.common.fetch import read_or_fetch
+from leapp.libraries.common.fetch import open_or_fetch
 from leapp.libraries.stdlib import api
 from leapp.models import RepositoriesMapping, PESIDRepositoryEntry, RepoMapEntry
 from leapp.models.fields import ModelViolationError
@@ -90,43 +90,64 @@ class RepoMapData(object):
 
     @staticmethod
     def load_from_dict(data):
-        if data['version_format'] != RepoMapData.VERSION_FORMAT:
-            raise ValueError(
-                'The obtained repomap data has unsupported version of format.'
-                ' Get {} required {}'
-                .format(data['version_format'], RepoMapData.VERSION_FORMAT)
-            )
+        """
+        Load the repository mapping data.
 
-        repomap = RepoMapData()
+        :param data: The repository mapping JSON data - either a dict, or an iterable of its (key, value) pairs.
+                     The values of the mapping and repositories keys can be any iterables, so the entries
+                     can be loaded incrementally, see jsonstream.iter_object_members.
+        """
+        items = data.items() if isinstance(data, dict) else data
 
-        # Load reposiories
+        repomap = RepoMapData()
+        loaded_keys = set()
         existing_pesids = set()
-        for repo_family in data['repositories']:
-            existing_pesids.add(repo_family['pesid'])
-            for repo in repo_family['entries']:
-                repomap.add_repository(repo, repo_family['pesid'])
-
-        # Load mappings
-        for mapping in data['mapping']:
-            for entry in mapping['entries']:
-                if not isinstance(entry['target'], list):
+        referenced_pesids = set()
+
+        for key, value in items:
+            loaded_keys.add(key)
+            if key == 'version_format':
+                if value != RepoMapData.VERSION_FORMAT:
                     raise ValueError(
-                        'The target field of a mapping entry is not a list: {}'
-                        .format(entry)
+                        'The obtained repomap data has unsupported version of format.'
+                        ' Get {} required {}'
+                        .format(value, RepoMapData.VERSION_FORMAT)
                     )
-
-                for pesid in [entry['source']] + entry['target']:
-                    if pesid not in existing_pesids:
-                        raise ValueError(
-                            'The {} pesid is not related to any repository.'
-                            .format(pesid)
+            elif key == 'repositories':
+                # Load reposiories
+                for repo_family in value:
+                    existing_pesids.add(repo_family['pesid'])
+                    for repo in repo_family['entries']:
+                        repomap.add_repository(repo, repo_family['pesid'])
+            elif key == 'mapping':
+                # Load mappings
+                for mapping in value:
+                    for entry in mapping['entries']:
+                        if not isinstance(entry['target'], list):
+                            raise ValueError(
+                                'The target field of a mapping entry is not a list: {}'
+                                .format(entry)
+                            )
+
+                        referenced_pesids.update([entry['source']] + entry['target'])
+                        repomap.add_mapping(
+                            source_major_version=mapping['source_major_version'],
+                            target_major_version=mapping['target_major_version'],
+                            source_pesid=entry['source'],
+                            target_pesid=entry['target'],
                         )
-                repomap.add_mapping(
-                    source_major_version=mapping['source_major_version'],
-                    target_major_version=mapping['target_major_version'],
-                    source_pesid=entry['source'],
-                    target_pesid=entry['target'],
-                )
+
+        for required_key in ('version_format', 'repositories', 'mapping'):
+            if required_key not in loaded_keys:
+                raise KeyError(required_key)
+
+        # The mapping can precede the repositories in the data, so the pesids can be checked only at the end
+        unknown_pesids = sorted(referenced_pesids - existing_pesids)
+        if unknown_pesids:
+            raise ValueError(
+                'The {} pesid is not related to any repository.'
+                .format(unknown_pesids[0])
+            )
         return repomap
 
 
@@ -139,16 +160,23 @@ def _inhibit_upgrade(msg):
 
 
 def _read_repofile(repofile):
+    """
+    Read the repository mapping file incrementally.
+
+    :returns: Iterator over (key, value) pairs of the top-level JSON object. Entries of the mapping and repositories
+              arrays are decoded one by one as they are consumed, so the whole file is never kept in memory.
+    """
     # NOTE: what about catch StopActorExecution error when the file cannot be
     # obtained -> then check whether old_repomap file exists and in such a case
     # inform user they have to provde the new repomap.json file (we have the
     # warning now only which could be potentially overlooked)
-    try:
-        return json.loads(read_or_fetch(repofile))
-    except ValueError:
-        # The data does not contain a valid json
-        _inhibit_upgrade('The repository mapping file is invalid: file does not contain a valid JSON object.')
-    return None  # Avoids inconsistent-return-statements warning
+    with open_or_fetch(repofile) as repofile_data:
+        try:
+            for item in jsonstream.iter_object_members(repofile_data, streamed_keys=('mapping', 'repositories')):
+                yield item
+        except ValueError:
+            # The data does not contain a valid json
+            _inhibit_upgrade('The repository mapping file is invalid: file does not contain a valid JSON object.')
 
 
 def scan_repositories(read_repofile_func=_read_repofile):
@@ -1,3 +1,4 @@
+import io
 import json
 import os
 
@@ -91,13 +92,34 @@ def test_scan_existing_valid_data(monkeypatch, adjust_cwd):
         assert expected_pesid_repo in pesid_repos, fail_description
 
 
+def test_scan_repositories_streams_repofile(monkeypatch, adjust_cwd):
+    """
+    Tests whether the repomap file is loaded correctly when it is read incrementally.
+    """
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked(src_ver='7.9', dst_ver='8.4'))
+    monkeypatch.setattr(api, 'produce', produce_mocked())
+    monkeypatch.setattr(repositoriesmapping, 'open_or_fetch',
+                        lambda dummy: io.open('files/repomap_example.json', encoding='utf-8'))
+
+    repositoriesmapping.scan_repositories()
+
+    with open('files/repomap_example.json') as repomap_file:
+        data = json.load(repomap_file)
+    expected_repomap = repositoriesmapping.RepoMapData.load_from_dict(data)
+
+    assert len(api.produce.model_instances) == 1
+    repo_mapping = api.produce.model_instances[0]
+    assert repo_mapping.mapping == expected_repomap.get_mappings('7', '8')
+    assert repo_mapping.repositories == expected_repomap.get_repositories(['7', '8'])
+
+
 def test_scan_repositories_with_missing_data(monkeypatch):
     """
     Tests whether the scanning process fails gracefully when no data are read.
     """
     monkeypatch.setattr(api, 'current_actor', CurrentActorMocked(src_ver='7.9', dst_ver='8.4'))
     monkeypatch.setattr(api, 'produce', produce_mocked())
-    monkeypatch.setattr(repositoriesmapping, 'read_or_fetch', lambda dummy: '')
+    monkeypatch.setattr(repositoriesmapping, 'open_or_fetch', lambda dummy: io.StringIO(u''))
 
     with pytest.raises(StopActorExecutionError) as missing_data_error:
         repositoriesmapping.scan_repositories()
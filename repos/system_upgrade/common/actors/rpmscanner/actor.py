@@ -1,6 +1,6 @@
 from leapp.actors import Actor
 from leapp.libraries.actor import rpmscanner
-from leapp.models import InstalledRPM
+from leapp.models import InstalledRPMTable
 from leapp.tags import IPUWorkflowTag, FactsPhaseTag
 
 
@@ -8,12 +8,13 @@ class RpmScanner(Actor):
     """
     Provides data about installed RPM Packages.
 
-    After collecting data from RPM query, a message with relevant data will be produced.
+    After collecting data from RPM query, a message with relevant data will be produced
+    in the compact columnar format (InstalledRPMTable).
     """
 
     name = 'rpm_scanner'
     consumes = ()
-    produces = (InstalledRPM,)
+    produces = (InstalledRPMTable,)
     tags = (IPUWorkflowTag, FactsPhaseTag)
 
     def process(self):
@@ -1,10 +1,11 @@
 import warnings
 
 from leapp.exceptions import StopActorExecutionError
+from leapp.libraries.common import factscache
 from leapp.libraries.common import module as module_lib
 from leapp.libraries.common import rpms
 from leapp.libraries.stdlib import api
-from leapp.models import InstalledRPM, RPM
+from leapp.models import InstalledRPMTable
 
 no_yum = False
 no_yum_warning_msg = "package `yum` is unavailable"
@@ -17,7 +18,7 @@ except ImportError:
 no_dnf = False
 no_dnf_warning_msg = "package `dnf` is unavailable"
 try:
-    import dnf
+    import dnf  # noqa: F401; pylint: disable=unused-import
 except ImportError:
     no_dnf = True
     warnings.warn(no_dnf_warning_msg, ImportWarning)
@@ -44,14 +45,14 @@ def _get_package_repository_data_yum():
 
 
 def _get_package_repository_data_dnf():
-    dnf_base = dnf.Base()
     pkg_repos = {}
 
     try:
-        # NOTE: currently we do not initialize/load DNF plugins here as we are
-        # working just with the local stuff (load_system_repo=True)
-        dnf_base.fill_sack(load_system_repo=True, load_available_repos=False)
-        for pkg in dnf_base.sack.query():
+        # NOTE: we need just the installed packages here, however, the shared
+        # base is needed anyway to map the modular packages to module streams,
+        # so reuse it instead of filling another sack with the system repo
+        dnf_base = module_lib.get_dnf_base()
+        for pkg in dnf_base.sack.query().installed():
             pkg_repos[pkg.name] = pkg._from_repo.lstrip('@')
     except ValueError as e:
         if 'locale' not in str(e):  # reraise if error is not related to locales
@@ -104,30 +105,39 @@ def map_modular_rpms_to_modules():
     return rpm_streams
 
 
-# TODO(drehak) unit tests
-def process():
-    output = rpms.get_installed_rpms()
+def _get_inputs():
+    # NOTE: the module metadata of the installed modular packages cannot
+    # change without a change of the packages themselves (and so the RPM DB)
+    return [
+        factscache.get_rpmdb_fingerprint(),
+        factscache.get_dir_fingerprint('/etc/dnf/modules.d'),
+        factscache.get_dir_fingerprint('/etc/yum.repos.d'),
+    ]
+
+
+def scan_installed_rpms():
+    # NOTE: the origin repositories of packages are not stored in the RPM
+    # database and the module streams are defined by the module metadata,
+    # so these are obtained from yum/dnf (a single DNF sack is used for both)
     pkg_repos = get_package_repository_data()
     rpm_streams = map_modular_rpms_to_modules()
 
-    result = InstalledRPM()
-    for entry in output:
-        entry = entry.strip()
-        if not entry:
-            continue
-        name, version, release, epoch, packager, arch, pgpsig = entry.split('|')
-        repository = pkg_repos.get(name, '')
+    result = InstalledRPMTable()
+    for name, version, release, epoch, packager, arch, pgpsig in rpms.iter_installed_rpms():
         rpm_key = (name, epoch, version, release, arch)
         module, stream = rpm_streams.get(rpm_key, (None, None))
-        result.items.append(RPM(
-            name=name,
-            version=version,
-            epoch=epoch,
-            packager=packager,
-            arch=arch,
-            release=release,
-            pgpsig=pgpsig,
-            repository=repository,
-            module=module,
-            stream=stream))
-    api.produce(result)
+        result.names.append(name)
+        result.epochs.append(epoch)
+        result.packagers.append(packager)
+        result.versions.append(version)
+        result.releases.append(release)
+        result.arches.append(arch)
+        result.pgpsigs.append(pgpsig)
+        result.repositories.append(pkg_repos.get(name, ''))
+        result.modules.append(module)
+        result.streams.append(stream)
+    return [result]
+
+
+def process():
+    factscache.produce_cached('rpm_scanner', _get_inputs, scan_installed_rpms)
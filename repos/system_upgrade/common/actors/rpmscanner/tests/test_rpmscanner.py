@@ -6,7 +6,7 @@ from leapp.libraries.actor import rpmscanner
 from leapp.libraries.common import module as module_lib
 from leapp.libraries.common import rpms, testutils
 from leapp.libraries.stdlib import api
-from leapp.models import InstalledRPM, RPM
+from leapp.models import InstalledRPMTable
 from leapp.snactor.fixture import current_actor_context
 
 no_yum = False
@@ -104,8 +104,8 @@ MODULES = [
 def test_actor_execution(monkeypatch, current_actor_context):
     monkeypatch.setattr(rpmscanner.module_lib, 'get_modules', lambda: [])
     current_actor_context.run()
-    assert current_actor_context.consume(InstalledRPM)
-    assert current_actor_context.consume(InstalledRPM)[0].items
+    assert current_actor_context.consume(InstalledRPMTable)
+    assert current_actor_context.consume(InstalledRPMTable)[0].names
 
 
 def test_map_modular_rpms_to_modules_empty(monkeypatch):
@@ -155,15 +155,19 @@ PACKAGE_REPOS = {
 def test_process(monkeypatch):
     monkeypatch.setattr(module_lib, 'get_modules', lambda: MODULES)
     monkeypatch.setattr(rpmscanner, 'get_package_repository_data', lambda: PACKAGE_REPOS)
+    monkeypatch.setattr(rpms, 'rpm', None)
     monkeypatch.setattr(rpms, 'get_installed_rpms', lambda: INSTALLED_RPMS)
+    monkeypatch.setattr(api, 'current_actor', testutils.CurrentActorMocked())
     monkeypatch.setattr(api, 'produce', testutils.produce_mocked())
 
     rpmscanner.process()
     assert api.produce.called
     assert len(api.produce.model_instances) == 1
-    assert isinstance(api.produce.model_instances[0], InstalledRPM)
-    items = {i.name: i for i in api.produce.model_instances[0].items}
+    assert isinstance(api.produce.model_instances[0], InstalledRPMTable)
+    items = {i.name: i for i in rpms.iter_rpm_rows(api.produce.model_instances[0])}
     assert len(items) == 4
+    assert items['afterburn'].repository == 'repo1'
+    assert items['passwd'].repository == ''
 
     assert items['afterburn'].epoch == '0'
     assert items['afterburn'].version == '4.2.0'
@@ -2,9 +2,13 @@ import os
 import re
 import shutil
 
+from leapp import reporting
+from leapp.libraries.common.semodules import ModuleContents
 from leapp.libraries.stdlib import api, CalledProcessError, run
+from leapp.models import SELinuxCustom, SELinuxModules
 
 BACKUP_DIRECTORY = '/var/lib/selinux/leapp-backup'
+WORKING_DIRECTORY = '/tmp/selinux/'
 
 
 def list_selinux_modules():
@@ -34,39 +38,217 @@ def list_selinux_modules():
     return modules
 
 
-# determine which (if any) udica templates where installed and install their new versions
-def install_udica_templates(templates):
-    if not templates:
-        return
+def _get_udica_template_path(template):
+    """Return path to the latest version of the given udica template installed by container-selinux"""
+    return '/usr/share/udica/templates/{}.cil'.format(template.name)
+
+
+def _install_modules(modules):
+    """
+    Install given policy modules in a single transaction
 
+    Expects a list of tuples (priority, path to the cil file)
+    """
     command = ['semodule']
-    for module in templates:
-        command.extend(
-            [
-                '-X',
-                str(module.priority),
-                '-i',
-                '/usr/share/udica/templates/{}.cil'.format(module.name)
-            ]
-        )
+    for (priority, path) in modules:
+        command.extend(['-X', str(priority), '-i', path])
+    run(command)
+
 
+def _import_customizations(commands):
+    """Import given semanage commands in a single transaction"""
+    run(['semanage', 'import'], stdin='{}\n'.format('\n'.join(commands)))
+
+
+def _apply_bisect(items, apply_items):
+    """
+    Apply given items using apply_items in a single transaction
+
+    Each transaction requires a full policy rebuild. So in case the transaction
+    fails, the items are split in halves and applied separately (recursively),
+    so that only the items that actually fail are retried one by one.
+
+    Returns a list of tuples (item, error) of the items that couldn't be applied
+    """
+    if not items:
+        return []
     try:
-        run(command)
+        apply_items(items)
+        return []
     except CalledProcessError as e:
-        api.current_logger().warning('Error installing udica templates: {}'.format(e.stderr))
+        if len(items) == 1:
+            return [(items[0], e)]
+        api.current_logger().debug(
+            'Failed to apply a batch of {} items, bisecting: {}'.format(len(items), e.stderr)
+        )
+    middle = len(items) // 2
+    return _apply_bisect(items[:middle], apply_items) + _apply_bisect(items[middle:], apply_items)
+
+
+def _get_backup_path(module):
+    """
+    Return path to the backup of the given policy module
+
+    A directory is used for each priority (as in the working directory), so that modules
+    with the same name do not overwrite each other and the backups can be installed as they are.
+    """
+    return os.path.join(BACKUP_DIRECTORY, str(module.priority), '{}.cil'.format(module.name))
 
 
 # move given file to the backup directory so that users can access it after the upgrade
-def back_up_failed(module_path):
+def back_up_failed(module, module_path):
+    backup_path = _get_backup_path(module)
     # make sure the backup dir exists
-    if not os.path.isdir(BACKUP_DIRECTORY):
+    if not os.path.isdir(os.path.dirname(backup_path)):
         try:
-            os.mkdir(BACKUP_DIRECTORY)
+            os.makedirs(os.path.dirname(backup_path))
         except OSError:
             api.current_logger().warning('Failed to create backup directory!')
             return
     try:
-        shutil.move(module_path, BACKUP_DIRECTORY)
+        shutil.move(module_path, backup_path)
     except OSError:
         api.current_logger().warning('Failed to back-up: {}!'.format(module_path))
         return
+
+
+def _write_modules(semodules, installed_modules):
+    """
+    Write custom policy modules from the given SELinuxModules message to the working directory
+
+    Returns a list of tuples (module, path to the cil file)
+    """
+    contents = ModuleContents(semodules.contents)
+    modules = []
+    for module in semodules.modules:
+        # Skip modules that are already installed. This prevents DSP modules installed with wrong
+        # priority (usually 400) from being overwritten by an older version
+        if module.name in installed_modules:
+            api.current_logger().info(
+                'Skipping module {} on priority {} because it is already installed.'.format(
+                    module.name,
+                    module.priority
+                )
+            )
+            continue
+
+        api.current_logger().info(
+            'Installing module {} on priority {}.'.format(module.name, module.priority)
+        )
+        if module.removed:
+            api.current_logger().warning(
+                '{}: The following lines where removed because of incompatibility:\n{}'.format(
+                    module.name,
+                    '\n'.join(module.removed)
+                )
+            )
+        # cil module files need to be extracted to disk in order to be installed.
+        # The module name is given by the file name, so a directory is used for each priority
+        # to prevent modules with the same name from overwriting each other.
+        cil_filename = os.path.join(
+            WORKING_DIRECTORY, str(module.priority), '{}.cil'.format(module.name)
+        )
+        try:
+            if not os.path.isdir(os.path.dirname(cil_filename)):
+                os.mkdir(os.path.dirname(cil_filename))
+            contents.write(module, cil_filename)
+        except (IOError, OSError, KeyError) as e:
+            api.current_logger().warning('Error writing {} : {}'.format(cil_filename, e))
+            continue
+        modules.append((module, cil_filename))
+    return modules
+
+
+def _create_report(failed_modules, failed_custom):
+    summary = ''
+    if failed_modules:
+        summary = (
+            'The following policy modules couldn\'t be installed: {}.\n'
+            'You can review their content in {}.'.format(
+                ', '.join(['{} (priority {})'.format(x.name, x.priority) for x in failed_modules]),
+                BACKUP_DIRECTORY
+            )
+        )
+    if failed_custom:
+        if summary:
+            summary = '{}\n\n'.format(summary)
+        summary = '{}The following commands couldn\'t be applied:\n{}'.format(
+            summary, '\n'.join(['semanage {}'.format(x) for x in failed_custom])
+        )
+
+    reporting.create_report(
+        [
+            reporting.Title(
+                'SELinux failed to reapply some customizations after the upgrade.'
+            ),
+            reporting.Summary(summary),
+            reporting.Severity(reporting.Severity.MEDIUM),
+            reporting.Tags([reporting.Tags.SECURITY, reporting.Tags.SELINUX]),
+        ]
+        + [
+            reporting.RelatedResource('file', _get_backup_path(x))
+            for x in failed_modules
+        ]
+    )
+
+
+def process():
+    # save progress for repoting purposes
+    failed_modules = []
+    failed_custom = []
+
+    # clear working directory
+    shutil.rmtree(WORKING_DIRECTORY, ignore_errors=True)
+
+    try:
+        os.mkdir(WORKING_DIRECTORY)
+    except OSError:
+        api.current_logger().warning('Failed to create working directory! Aborting.')
+        return
+
+    # get list of policy modules after the upgrade
+    installed_modules = set(
+        [module[0] for module in list_selinux_modules()]
+    )
+
+    # Every transaction rebuilds the whole policy, so all udica templates and
+    # custom modules are installed by a single semodule call
+    to_install = []
+    for semodules in api.consume(SELinuxModules):
+        api.current_logger().info(
+            'Processing custom SELinux policy modules. Count: {}.'.format(len(semodules.modules))
+        )
+        # check for presence of udica templates and make sure to install their latest versions
+        to_install.extend([(template, _get_udica_template_path(template)) for template in semodules.templates])
+        to_install.extend(_write_modules(semodules, installed_modules))
+
+    failed = _apply_bisect(
+        to_install, lambda items: _install_modules([(module.priority, path) for (module, path) in items])
+    )
+    for ((module, path), e) in failed:
+        if path == _get_udica_template_path(module):
+            api.current_logger().warning('Error installing udica template {}: {}'.format(module.name, e.stderr))
+            continue
+        api.current_logger().warning('Error installing module {}: {}'.format(module.name, e.stderr))
+        failed_modules.append(module)
+        back_up_failed(module, path)
+
+    # import SELinux customizations collected by "semanage export"
+    commands = []
+    for custom in api.consume(SELinuxCustom):
+        commands.extend(custom.commands)
+    if commands:
+        api.current_logger().info(
+            'Importing the following SELinux customizations collected by "semanage export":\n{}'.format(
+                '\n'.join(commands)
+            )
+        )
+    for (cmd, e) in _apply_bisect(commands, _import_customizations):
+        api.current_logger().warning('Error applying "semanage {}": {}'.format(cmd, e.stderr))
+        failed_custom.append(cmd)
+
+    # clean-up
+    shutil.rmtree(WORKING_DIRECTORY, ignore_errors=True)
+
+    if failed_modules or failed_custom:
+        _create_report(failed_modules, failed_custom)
@@ -0,0 +1,101 @@
+import os
+
+from leapp import reporting
+from leapp.libraries.actor import selinuxapplycustom
+from leapp.libraries.common.semodules import ModuleContents
+from leapp.libraries.common.testutils import create_report_mocked, CurrentActorMocked, logger_mocked
+from leapp.libraries.stdlib import api, CalledProcessError
+from leapp.models import SELinuxCustom, SELinuxModule, SELinuxModules
+
+
+class run_mocked(object):
+    def __init__(self, failing=()):
+        self.commands = []
+        self.failing = failing
+
+    def __call__(self, args, split=False, stdin=None):
+        self.commands.append((args, stdin))
+        if args == ['semodule', '-lfull']:
+            return {'stdout': ['100 zebra pp', '400 dsp_module cil']}
+        payload = ' '.join(args) if args[0] == 'semodule' else stdin
+        if any(item in payload for item in self.failing):
+            raise CalledProcessError('Mock error', args, {'exit_code': 1, 'stderr': 'Mock error'})
+        return {'stdout': []}
+
+
+def test_apply_bisect(monkeypatch):
+    monkeypatch.setattr(api, 'current_logger', logger_mocked())
+    applied = []
+
+    def apply_items(items):
+        if 3 in items or 6 in items:
+            raise CalledProcessError('Mock error', items, {'exit_code': 1})
+        applied.extend(items)
+
+    failed = selinuxapplycustom._apply_bisect(list(range(8)), apply_items)
+
+    assert [item for (item, dummy_error) in failed] == [3, 6]
+    assert sorted(applied) == [0, 1, 2, 4, 5, 7]
+    assert selinuxapplycustom._apply_bisect([], apply_items) == []
+
+
+def _mock_environment(monkeypatch, tmpdir, run):
+    contents = ModuleContents()
+    modules = [
+        SELinuxModule(name='mock1', priority=400, digest=contents.add('(type mock1_t)\n'), removed=[]),
+        SELinuxModule(name='mock1', priority=300, digest=contents.add('(type mock1_300_t)\n'), removed=[]),
+        SELinuxModule(name='mock2', priority=400, digest=contents.add('(type mock2_t)\n'), removed=[]),
+        SELinuxModule(name='dsp_module', priority=400, digest=contents.add('(type dsp_t)\n'), removed=[]),
+    ]
+    templates = [SELinuxModule(name='base_container', priority=200, removed=[])]
+    msgs = [
+        SELinuxModules(modules=modules, templates=templates, contents=contents.to_list()),
+        SELinuxCustom(commands=['boolean -m -1 cron_can_relabel', 'port -a -t http_port_t -p udp 81'], removed=[]),
+    ]
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked(msgs=msgs))
+    monkeypatch.setattr(api, 'current_logger', logger_mocked())
+    monkeypatch.setattr(reporting, 'create_report', create_report_mocked())
+    monkeypatch.setattr(selinuxapplycustom, 'run', run)
+    monkeypatch.setattr(selinuxapplycustom, 'WORKING_DIRECTORY', tmpdir.join('selinux').strpath)
+    monkeypatch.setattr(selinuxapplycustom, 'BACKUP_DIRECTORY', tmpdir.join('backup').strpath)
+
+
+def test_process(monkeypatch, tmpdir):
+    run = run_mocked()
+    _mock_environment(monkeypatch, tmpdir, run)
+
+    selinuxapplycustom.process()
+
+    working_dir = tmpdir.join('selinux').strpath
+    # a single transaction for all modules and templates and another one for semanage customizations
+    assert run.commands[1:] == [
+        (['semodule',
+          '-X', '200', '-i', '/usr/share/udica/templates/base_container.cil',
+          '-X', '400', '-i', os.path.join(working_dir, '400', 'mock1.cil'),
+          '-X', '300', '-i', os.path.join(working_dir, '300', 'mock1.cil'),
+          '-X', '400', '-i', os.path.join(working_dir, '400', 'mock2.cil')], None),
+        (['semanage', 'import'], 'boolean -m -1 cron_can_relabel\nport -a -t http_port_t -p udp 81\n'),
+    ]
+    assert not reporting.create_report.called
+
+
+def test_process_failures(monkeypatch, tmpdir):
+    run = run_mocked(failing=('mock1.cil', 'port -a'))
+    _mock_environment(monkeypatch, tmpdir, run)
+
+    selinuxapplycustom.process()
+
+    assert reporting.create_report.called == 1
+    summary = reporting.create_report.report_fields['summary']
+    assert 'couldn\'t be installed: mock1 (priority 400), mock1 (priority 300).' in summary
+    assert 'semanage port -a -t http_port_t -p udp 81' in summary
+    # the failed modules are backed up, modules with the same name on different priorities separately
+    assert tmpdir.join('backup', '400', 'mock1.cil').read() == '(type mock1_t)\n'
+    assert tmpdir.join('backup', '300', 'mock1.cil').read() == '(type mock1_300_t)\n'
+    related_resources = reporting.create_report.report_fields['detail']['related_resources']
+    assert [resource['title'] for resource in related_resources] == [
+        tmpdir.join('backup', '400', 'mock1.cil').strpath,
+        tmpdir.join('backup', '300', 'mock1.cil').strpath,
+    ]
+    # the valid customizations are still applied
+    assert (['semanage', 'import'], 'boolean -m -1 cron_can_relabel\n') in run.commands
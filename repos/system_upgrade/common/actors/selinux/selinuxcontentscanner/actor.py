@@ -25,31 +25,4 @@ class SELinuxContentScanner(Actor):
             if not fact.enabled:
                 return
 
-        (semodule_list, template_list, rpms_to_install,) = selinuxcontentscanner.get_selinux_modules()
-
-        self.produce(
-            SELinuxModules(
-                modules=semodule_list,
-                templates=template_list
-            )
-        )
-        self.produce(
-            RpmTransactionTasks(
-                to_install=rpms_to_install
-            )
-        )
-        # this is produced so that we can later verify that the RPMs are present after upgrade
-        self.produce(
-            SELinuxRequestRPMs(
-                to_install=rpms_to_install
-            )
-        )
-
-        (semanage_valid, semanage_removed,) = selinuxcontentscanner.get_selinux_customizations()
-
-        self.produce(
-            SELinuxCustom(
-                commands=semanage_valid,
-                removed=semanage_removed
-            )
-        )
+        selinuxcontentscanner.process()
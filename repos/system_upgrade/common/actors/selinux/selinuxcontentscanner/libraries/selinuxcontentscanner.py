@@ -1,10 +1,13 @@
+import glob
 import os
 import re
 from shutil import rmtree
 
+from leapp.libraries.common import factscache
 from leapp.libraries.common.config import version
+from leapp.libraries.common.semodules import ModuleContents
 from leapp.libraries.stdlib import api, CalledProcessError, run
-from leapp.models import SELinuxModule
+from leapp.models import RpmTransactionTasks, SELinuxCustom, SELinuxModule, SELinuxModules, SELinuxRequestRPMs
 
 # types and attributes that where removed between RHEL 7 and 8
 REMOVED_TYPES_EL7 = ["base_typeattr_15", "direct_run_init", "gpgdomain", "httpd_exec_scripts",
@@ -44,25 +47,73 @@ UDICA_TEMPLATES = {"base_container", "config_container", "home_container", "log_
                    "net_container", "tmp_container", "tty_container", "virt_container", "x_container"}
 
 
-def check_module(name):
+def _compile_words_regex(words):
+    """Compile a regex matching any of the given words as a whole word (like "grep -w")."""
+    return re.compile(r'\b(?:{})\b'.format('|'.join(re.escape(word) for word in sorted(set(words)))))
+
+
+REMOVED_TYPES_EL7_RE = _compile_words_regex(REMOVED_TYPES_EL7)
+REMOVED_TYPES_EL8_RE = _compile_words_regex(REMOVED_TYPES_EL8)
+CONTAINER_TYPES_RE = _compile_words_regex(CONTAINER_TYPES)
+
+
+def check_module(content):
     """
     Check if given module contains one of removed types and comment out corresponding lines.
 
-    The function expects a text file "$name" containing cil policy
-    to be present in the current directory.
+    Returns a tuple (content, removed) where "content" is the cil policy
+    with the invalid lines commented out and "removed" is a list of the invalid lines.
+    """
+    # get removed types based on upgrade path
+    removed_types_re = REMOVED_TYPES_EL7_RE if version.get_source_major_version() == "7" else REMOVED_TYPES_EL8_RE
+
+    removed = []
+    lines = content.splitlines(True)
+    for i, line in enumerate(lines):
+        if removed_types_re.search(line):
+            removed.append(line.rstrip('\n'))
+            # Add ";" at the beginning of invalid lines (comment them out)
+            lines[i] = ';' + line
+    return (''.join(lines), removed)
 
-    Returns a list of invalid lines.
+
+def _extract_modules(modules):
     """
-    # get removed_types list based on upgrade path
-    removed_types = REMOVED_TYPES_EL7 if version.get_source_major_version() == "7" else REMOVED_TYPES_EL8
+    Extract given SELinux policy modules into cil files in the current directory
+
+    All modules are extracted by a single semodule call, as each call loads the whole
+    policy store. In case the call fails, the modules are extracted one by one so
+    that only the modules that cannot be extracted are skipped.
 
+    Returns a dict mapping (name, priority) tuples of the extracted modules to their content
+    """
+    cmd = ["semodule", "-c"]
+    for (name, priority) in modules:
+        cmd.extend(["-X", priority, "-E", name])
     try:
-        removed = run(["grep", "-w", "-E", "|".join(removed_types), name], split=True)
-        # Add ";" at the beginning of invalid lines (comment them out)
-        run(["sed", "-i", "/{}/s/^/;/g".format(r"\|".join(removed_types)), name])
-        return removed.get("stdout", [])
+        run(cmd)
+        batches = [modules]
     except CalledProcessError:
-        return []
+        batches = []
+        for (name, priority) in modules:
+            try:
+                run(["semodule", "-c", "-X", priority, "-E", name])
+            except CalledProcessError:
+                api.current_logger().warning("Module {} could not be extracted!".format(name))
+                continue
+            batches.append([(name, priority)])
+
+    contents = {}
+    for batch in batches:
+        for (name, priority) in batch:
+            module_file = name + ".cil"
+            try:
+                with open(module_file) as cil_file:
+                    contents[(name, priority)] = cil_file.read()
+                os.remove(module_file)
+            except (IOError, OSError) as e:
+                api.current_logger().warning("Error reading {}.cil : {}".format(name, e))
+    return contents
 
 
 def list_selinux_modules():
@@ -95,10 +146,13 @@ def get_selinux_modules():
     """
     Read all custom SELinux policy modules from the system
 
-    Returns a tuple (modules, install_rpms)
-    where "modules" is a list of "SELinuxModule" objects
-    and "install_rpms" is a list of RPMs
+    Returns a tuple (modules, templates, install_rpms, contents)
+    where "modules" is a list of "SELinuxModule" objects,
+    "templates" is a list of "SELinuxModule" objects of udica templates,
+    "install_rpms" is a list of RPMs
     that should be installed during the upgrade
+    and "contents" is a list of "SELinuxModuleContent" objects
+    with the compressed content of the modules
 
     """
 
@@ -122,8 +176,12 @@ def get_selinux_modules():
         os.chdir(WORKING_DIRECTORY)
     except OSError:
         api.current_logger().warning("Failed to access working directory! Aborting.")
-        return ([], [], [])
+        return ([], [], [], [])
 
+    # custom modules to be extracted, split into batches so that each batch
+    # contains a module name at most once (the same module can be installed
+    # on multiple priorities and is always extracted into "<name>.cil")
+    batches = []
     for (name, priority) in modules:
         # Udica templates should not be transfered, we only need a list of their
         # names and priorities so that we can reinstall their latest verisions
@@ -142,40 +200,35 @@ def get_selinux_modules():
             # 100 - module from selinux-policy-* package
             # 200 - DSP module - installed by an RPM - handled by PES
             continue
-        # extract custom module and save it to SELinuxModule object
-        module_file = name + ".cil"
-        try:
-            run(["semodule", "-c", "-X", priority, "-E", name])
-            # check if the module contains invalid types and remove them if so
-            removed = check_module(module_file)
-
-            # get content of the module
-            try:
-                with open(module_file) as cil_file:
-                    module_content = cil_file.read()
-            except OSError as e:
-                api.current_logger().warning("Error reading {}.cil : {}".format(name, e))
-                continue
 
-            semodule_list.append(
-                SELinuxModule(
-                    name=name,
-                    priority=int(priority),
-                    content=module_content,
-                    removed=removed,
-                )
-            )
-        except CalledProcessError:
-            api.current_logger().warning("Module {} could not be extracted!".format(name))
+        for batch in batches:
+            if name not in [module[0] for module in batch]:
+                batch.append((name, priority))
+                break
+        else:
+            batches.append([(name, priority)])
+
+    contents = {}
+    for batch in batches:
+        contents.update(_extract_modules(batch))
+
+    # module contents are stored compressed and only once, even if a module is installed on multiple priorities
+    module_contents = ModuleContents()
+    container_types_used = False
+    for (name, priority) in modules:
+        if (name, priority) not in contents:
             continue
-        # rename the cil module file so that it does not clash
-        # with the same module on different priority
-        try:
-            os.rename(module_file, "{}_{}".format(name, priority))
-        except OSError:
-            api.current_logger().warning(
-                "Failed to rename module file {} to include priority.".format(name)
+        # check if the module contains invalid types and remove them if so
+        (module_content, removed) = check_module(contents.pop((name, priority)))
+        container_types_used = container_types_used or bool(CONTAINER_TYPES_RE.search(module_content))
+        semodule_list.append(
+            SELinuxModule(
+                name=name,
+                priority=int(priority),
+                digest=module_contents.add(module_content),
+                removed=removed,
             )
+        )
 
     # Udica templates where moved to container-selinux package.
     # Make sure it is installed so that the templates can be reinstalled
@@ -185,19 +238,15 @@ def get_selinux_modules():
     # Process customizations introduced by "semanage"
     # this is necessary for check if container-selinux needs to be installed
     try:
-        run(["semanage", "export", "-f", "semanage"])
+        semanage = run(["semanage", "export"], split=False).get("stdout", "")
     except CalledProcessError:
-        pass
+        semanage = ""
     # Check if modules contain any type, attribute, or boolean contained in container-selinux and install it if so
     # This is necessary since container policy module is part of selinux-policy-targeted in RHEL 7 (but not in RHEL 8)
-    try:
-        run(["grep", "-w", "-r", "-E", "|".join(CONTAINER_TYPES)], split=False)
+    if container_types_used or CONTAINER_TYPES_RE.search(semanage):
         # Request "container-selinux" to be installed since container types where used in local customizations
         # and container-selinux policy was removed from selinux-policy-* packages
         install_rpms.append("container-selinux")
-    except CalledProcessError:
-        # expected, ignore exception
-        pass
 
     try:
         os.chdir(wd)
@@ -205,7 +254,7 @@ def get_selinux_modules():
         pass
     rmtree(WORKING_DIRECTORY, ignore_errors=True)
 
-    return (semodule_list, template_list, list(set(install_rpms)))
+    return (semodule_list, template_list, list(set(install_rpms)), module_contents.to_list())
 
 
 def get_selinux_customizations():
@@ -244,3 +293,41 @@ def get_selinux_customizations():
         )
 
     return (semanage_valid, semanage_removed)
+
+
+def _get_inputs():
+    # NOTE: every transaction of a policy store (semodule, semanage) increases its commit number
+    commit_nums = glob.glob('/etc/selinux/*/active/commit_num') + glob.glob('/var/lib/selinux/*/active/commit_num')
+    return [factscache.get_content_fingerprint('/etc/selinux/config')] + [
+        factscache.get_content_fingerprint(path) for path in sorted(commit_nums)
+    ]
+
+
+def scan_selinux_content():
+    """
+    Collect the messages describing SELinux customizations
+    """
+    (semodule_list, template_list, rpms_to_install, contents,) = get_selinux_modules()
+    (semanage_valid, semanage_removed,) = get_selinux_customizations()
+    return [
+        SELinuxModules(
+            modules=semodule_list,
+            templates=template_list,
+            contents=contents
+        ),
+        RpmTransactionTasks(
+            to_install=rpms_to_install
+        ),
+        # this is produced so that we can later verify that the RPMs are present after upgrade
+        SELinuxRequestRPMs(
+            to_install=rpms_to_install
+        ),
+        SELinuxCustom(
+            commands=semanage_valid,
+            removed=semanage_removed
+        ),
+    ]
+
+
+def process():
+    factscache.produce_cached('selinuxcontentscanner', _get_inputs, scan_selinux_content)
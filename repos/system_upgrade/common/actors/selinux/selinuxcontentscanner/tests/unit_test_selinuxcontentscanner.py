@@ -1,5 +1,7 @@
 from leapp.libraries.actor import selinuxcontentscanner
 from leapp.libraries.common.config import version
+from leapp.libraries.common.semodules import ModuleContents
+from leapp.libraries.common.testutils import logger_mocked
 from leapp.libraries.stdlib import CalledProcessError
 
 
@@ -73,3 +75,75 @@ def test_get_selinux_customizations(monkeypatch):
     assert semanage_valid[1] == "port -a -t http_port_t -p udp 81"
     assert semanage_valid[2] == "fcontext -a -f a -t httpd_sys_content_t '/web(/.*)?'"
     assert semanage_removed == ["fcontext -a -f a -t cgdcbxd_exec_t '/ganesha(/.*)?'"]
+
+
+def test_check_module(monkeypatch):
+    monkeypatch.setattr(version, "get_source_major_version", lambda: '8')
+
+    content = ("(type mock_type_t)\n"
+               "(allow mock_type_t cephfs_t (file (getattr open read)))\n"
+               "(allow mock_type_t mycephfs_t (file (getattr open read)))\n")
+    (new_content, removed) = selinuxcontentscanner.check_module(content)
+
+    assert removed == ["(allow mock_type_t cephfs_t (file (getattr open read)))"]
+    assert new_content == ("(type mock_type_t)\n"
+                           ";(allow mock_type_t cephfs_t (file (getattr open read)))\n"
+                           "(allow mock_type_t mycephfs_t (file (getattr open read)))\n")
+
+
+class run_mocked_extract(object):
+    def __init__(self, failing=()):
+        self.commands = []
+        self.failing = failing
+
+    def __call__(self, args, split=True):
+        self.commands.append(args)
+        if args == ['semodule', '-lfull']:
+            return {'stdout': ["400 mock1 cil", "300 mock1 cil", "400 mock2 cil", "100 vpn pp",
+                               "200 base_container cil"]}
+        if args[0] == 'semodule':
+            modules = list(zip(args[3::4], args[5::4]))
+            if any(name in self.failing for dummy_priority, name in modules):
+                raise CalledProcessError("Mock error", args, {'exit_code': 1})
+            for priority, name in modules:
+                with open(name + '.cil', 'w') as f:
+                    f.write('(type {}_{}_t)\n(allow container_runtime_t cephfs_t (file (read)))\n'.format(
+                        name, priority))
+            return {'stdout': []}
+        return {'stdout': ''}
+
+
+def test_get_selinux_modules(monkeypatch, tmpdir):
+    monkeypatch.setattr(version, "get_source_major_version", lambda: '8')
+    monkeypatch.setattr(selinuxcontentscanner, "WORKING_DIRECTORY", tmpdir.join('selinux').strpath)
+    run = run_mocked_extract()
+    monkeypatch.setattr(selinuxcontentscanner, "run", run)
+
+    (modules, templates, install_rpms, contents) = selinuxcontentscanner.get_selinux_modules()
+
+    assert [(m.name, m.priority) for m in modules] == [("mock1", 400), ("mock1", 300), ("mock2", 400)]
+    assert sorted(m.digest for m in modules) == sorted(c.digest for c in contents)
+    module_file = tmpdir.join('mock1.cil')
+    ModuleContents(contents).write(modules[1], module_file.strpath)
+    assert module_file.read().startswith("(type mock1_300_t)\n;(allow")
+    assert modules[1].removed == ["(allow container_runtime_t cephfs_t (file (read)))"]
+    assert [(t.name, t.priority) for t in templates] == [("base_container", 200)]
+    assert install_rpms == ["container-selinux"]
+    # mock1 is extracted in a separate call for each priority as the cil files would clash
+    extract_commands = [cmd for cmd in run.commands if cmd[0] == 'semodule' and '-E' in cmd]
+    assert extract_commands == [
+        ['semodule', '-c', '-X', '400', '-E', 'mock1', '-X', '400', '-E', 'mock2'],
+        ['semodule', '-c', '-X', '300', '-E', 'mock1'],
+    ]
+
+
+def test_get_selinux_modules_extraction_fallback(monkeypatch, tmpdir):
+    monkeypatch.setattr(version, "get_source_major_version", lambda: '8')
+    monkeypatch.setattr(selinuxcontentscanner, "WORKING_DIRECTORY", tmpdir.join('selinux').strpath)
+    monkeypatch.setattr(selinuxcontentscanner, "run", run_mocked_extract(failing=("mock2",)))
+    monkeypatch.setattr(selinuxcontentscanner.api, "current_logger", logger_mocked())
+
+    (modules, dummy_templates, dummy_install_rpms, dummy_contents) = selinuxcontentscanner.get_selinux_modules()
+
+    assert [(m.name, m.priority) for m in modules] == [("mock1", 400), ("mock1", 300)]
+    assert "Module mock2 could not be extracted!" in selinuxcontentscanner.api.current_logger.warnmsg
@@ -1,10 +1,12 @@
 import functools
+import json
 import os
 import subprocess
 
 import pyudev
 
 from leapp import reporting
+from leapp.libraries.common import factscache
 from leapp.libraries.stdlib import api
 from leapp.models import (
     FstabEntry,
@@ -18,6 +20,14 @@ from leapp.models import (
     VgsEntry
 )
 
+# Fields of the lvm reports in the order of the default output of pvs, vgs and lvdisplay -C
+LVM_REPORT_FIELDS = (
+    ('pv', ('pv_name', 'vg_name', 'pv_fmt', 'pv_attr', 'pv_size', 'pv_free')),
+    ('vg', ('vg_name', 'pv_count', 'lv_count', 'snap_count', 'vg_attr', 'vg_size', 'vg_free')),
+    ('lv', ('lv_name', 'vg_name', 'lv_attr', 'lv_size', 'pool_lv', 'origin', 'data_percent', 'metadata_percent',
+            'move_pv', 'mirror_log', 'copy_percent', 'convert_lv')),
+)
+
 
 def aslist(f):
     """ Decorator used to convert generator to list """
@@ -32,11 +42,11 @@ def _is_file_readable(path):
     return os.path.isfile(path) and os.access(path, os.R_OK)
 
 
-def _get_cmd_output(cmd, delim, expected_len):
-    """ Verify if command exists and return output """
+def _get_raw_cmd_output(cmd):
+    """ Verify if command exists and return its output or None if it fails """
     if not any(os.access(os.path.join(path, cmd[0]), os.X_OK) for path in os.environ['PATH'].split(os.pathsep)):
         api.current_logger().warning("'%s': command not found" % cmd[0])
-        return
+        return None
 
     try:
         # FIXME: Will keep call to subprocess until our stdlib supports "env" parameter
@@ -46,10 +56,18 @@ def _get_cmd_output(cmd, delim, expected_len):
 
     except subprocess.CalledProcessError as e:
         api.current_logger().debug("Command '%s' return non-zero exit status: %s" % (" ".join(cmd), e.returncode))
-        return
+        return None
 
     if bytes is not str:
         output = output.decode('utf-8')
+    return output
+
+
+def _get_cmd_output(cmd, delim, expected_len):
+    """ Verify if command exists and return output """
+    output = _get_raw_cmd_output(cmd)
+    if output is None:
+        return
 
     for entry in output.split('\n'):
         entry = entry.strip()
@@ -163,18 +181,38 @@ def _get_mount_info(path):
             )
 
 
+def _get_lsblk_names_info(dev_path=None):
+    """
+    Get names of block devices and their human readable sizes from lsblk
+
+    The names without the path and the human readable sizes cannot be listed by the same lsblk call
+    as the device paths and the sizes in bytes.
+    """
+    cmd = ['lsblk', '-nr', '--output', 'NAME,KNAME,SIZE,MAJ:MIN']
+    if dev_path:
+        cmd.append(dev_path)
+    return _get_cmd_output(cmd, ' ', 4)
+
+
 @aslist
 def _get_lsblk_info():
     """ Collect storage info from lsblk command """
     cmd = ['lsblk', '-pbnr', '--output', 'NAME,MAJ:MIN,RM,SIZE,RO,TYPE,MOUNTPOINT']
-    for entry in _get_cmd_output(cmd, ' ', 7):
+    entries = list(_get_cmd_output(cmd, ' ', 7))
+    # Get the names of all devices at once, spawning lsblk per device is
+    # expensive on systems with hundreds of devices (e.g. multipath)
+    names_info = {info[3]: info for info in _get_lsblk_names_info()} if entries else {}
+
+    for entry in entries:
         dev_path, maj_min, rm, bsize, ro, tp, mountpoint = entry
-        lsblk_cmd = ['lsblk', '-nr', '--output', 'NAME,KNAME,SIZE', dev_path]
-        lsblk_info_for_devpath = next(_get_cmd_output(lsblk_cmd, ' ', 3), None)
+        lsblk_info_for_devpath = names_info.get(maj_min)
+        if not lsblk_info_for_devpath:
+            # The device has appeared between the calls, ask for it separately
+            lsblk_info_for_devpath = next(_get_lsblk_names_info(dev_path), None)
         if not lsblk_info_for_devpath:
             return
 
-        name, kname, size = lsblk_info_for_devpath
+        name, kname, size = lsblk_info_for_devpath[:3]
         yield LsblkEntry(
             name=name,
             kname=kname,
@@ -187,10 +225,49 @@ def _get_lsblk_info():
             mountpoint=mountpoint)
 
 
+def _get_lvm_report():
+    """
+    Collect the info about PVs, VGs and LVs using a single lvm call
+
+    Each of the pvs, vgs and lvdisplay commands scans all the PV labels on all disks, which is slow
+    on systems with many LUNs or slow iSCSI paths, so get all the reports at once by `lvm fullreport`.
+
+    :returns: dictionary mapping 'pv', 'vg' and 'lv' to lists of rows in the format of the output
+              of the pvs, vgs and lvdisplay -C commands, or None if the report cannot be obtained
+    """
+    cmd = ['lvm', 'fullreport', '--reportformat', 'json']
+    for report, fields in LVM_REPORT_FIELDS:
+        cmd.extend(['--configreport', report, '-o', ','.join(fields)])
+    output = _get_raw_cmd_output(cmd)
+    if output is None:
+        return None
+
+    rows = {report: [] for report, dummy_fields in LVM_REPORT_FIELDS}
+    try:
+        # The full report contains a separate set of reports for each VG
+        for vg_reports in json.loads(output)['report']:
+            for report, fields in LVM_REPORT_FIELDS:
+                for row in vg_reports.get(report, []):
+                    rows[report].append([row.get(field, '') for field in fields])
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        api.current_logger().warning('Failed to parse the output of lvm fullreport: {}'.format(str(e)))
+        return None
+
+    # Keep the order of the pvs, vgs and lvdisplay commands
+    rows['pv'].sort(key=lambda row: row[0])
+    rows['vg'].sort(key=lambda row: row[0])
+    rows['lv'].sort(key=lambda row: (row[1], row[0]))
+    return rows
+
+
 @aslist
-def _get_pvs_info():
-    """ Collect storage info from pvs command """
-    for entry in _get_cmd_output(['pvs', '--noheadings', '--separator', r':'], ':', 6):
+def _get_pvs_info(lvm_report=None):
+    """ Collect storage info from pvs command (or the lvm report if provided) """
+    if lvm_report is not None:
+        entries = lvm_report['pv']
+    else:
+        entries = _get_cmd_output(['pvs', '--noheadings', '--separator', r':'], ':', 6)
+    for entry in entries:
         pv, vg, fmt, attr, psize, pfree = entry
         yield PvsEntry(
             pv=pv,
@@ -202,9 +279,13 @@ def _get_pvs_info():
 
 
 @aslist
-def _get_vgs_info():
-    """ Collect storage info from vgs command """
-    for entry in _get_cmd_output(['vgs', '--noheadings', '--separator', r':'], ':', 7):
+def _get_vgs_info(lvm_report=None):
+    """ Collect storage info from vgs command (or the lvm report if provided) """
+    if lvm_report is not None:
+        entries = lvm_report['vg']
+    else:
+        entries = _get_cmd_output(['vgs', '--noheadings', '--separator', r':'], ':', 7)
+    for entry in entries:
         vg, pv, lv, sn, attr, vsize, vfree = entry
         yield VgsEntry(
             vg=vg,
@@ -217,9 +298,13 @@ def _get_vgs_info():
 
 
 @aslist
-def _get_lvdisplay_info():
-    """ Collect storage info from lvdisplay command """
-    for entry in _get_cmd_output(['lvdisplay', '-C', '--noheadings', '--separator', r':'], ':', 12):
+def _get_lvdisplay_info(lvm_report=None):
+    """ Collect storage info from lvdisplay command (or the lvm report if provided) """
+    if lvm_report is not None:
+        entries = lvm_report['lv']
+    else:
+        entries = _get_cmd_output(['lvdisplay', '-C', '--noheadings', '--separator', r':'], ':', 12)
+    for entry in entries:
         lv, vg, attr, lsize, pool, origin, data, meta, move, log, cpy_sync, convert = entry
         yield LvdisplayEntry(
             lv=lv,
@@ -260,14 +345,41 @@ def _get_systemd_mount_info():
         )
 
 
+def _get_block_devices_inputs():
+    # NOTE: changes of LVM are recorded in the metadata backups and changes of
+    # block devices (e.g. new file systems or labels) in the udev database
+    return [
+        factscache.get_content_fingerprint('/proc/partitions'),
+        factscache.get_content_fingerprint('/proc/mounts'),
+        factscache.get_content_fingerprint('/proc/swaps'),
+        factscache.get_dir_fingerprint('/etc/lvm/backup'),
+        factscache.get_dir_fingerprint('/run/udev/data'),
+    ]
+
+
+def _scan_block_devices():
+    # Fall back to the separate pvs, vgs and lvdisplay commands when the lvm
+    # full report is not available
+    lvm_report = _get_lvm_report()
+    return [StorageInfo(
+        lsblk=_get_lsblk_info(),
+        pvs=_get_pvs_info(lvm_report),
+        vgs=_get_vgs_info(lvm_report),
+        lvdisplay=_get_lvdisplay_info(lvm_report),
+        systemdmount=_get_systemd_mount_info())]
+
+
 def get_storage_info():
     """ Collect multiple info about storage and return it """
+    # Only the info obtained by the (slow) tools can be reused from the previous
+    # run, files are always read as parsing of fstab can produce a report
+    block_devices = factscache.collect_cached('storage_scanner', _get_block_devices_inputs, _scan_block_devices)[0]
     return StorageInfo(
         partitions=_get_partitions_info('/proc/partitions'),
         fstab=_get_fstab_info('/etc/fstab'),
         mount=_get_mount_info('/proc/mounts'),
-        lsblk=_get_lsblk_info(),
-        pvs=_get_pvs_info(),
-        vgs=_get_vgs_info(),
-        lvdisplay=_get_lvdisplay_info(),
-        systemdmount=_get_systemd_mount_info())
+        lsblk=block_devices.lsblk,
+        pvs=block_devices.pvs,
+        vgs=block_devices.vgs,
+        lvdisplay=block_devices.lvdisplay,
+        systemdmount=block_devices.systemdmount)
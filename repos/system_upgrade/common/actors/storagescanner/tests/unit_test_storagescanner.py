@@ -1,6 +1,8 @@
 import functools
+import json
 import os
 
+import pytest
 import pyudev
 
 from leapp import reporting
@@ -251,93 +253,113 @@ def test_get_mount_info(monkeypatch):
     assert expected == storagescanner._get_mount_info(os.path.join(CUR_DIR, 'files/mounts'))
 
 
-def test_get_lsblk_info(monkeypatch):
-    bytes_per_gb = 1 << 30
+LSBLK_BYTES_PER_GB = 1 << 30
+LSBLK_NAMES_OUTPUT = [
+    ['vda', 'vda', '40G', '252:0'],
+    ['vda1', 'vda1', '1G', '252:1'],
+    ['vda2', 'vda2', '39G', '252:2'],
+    ['rhel_ibm--p8--kvm--03--guest--02-root', 'kname1', '38G', '253:0'],
+    ['rhel_ibm--p8--kvm--03--guest--02-swap', 'kname2', '1G', '253:1']
+]
 
-    def get_cmd_output_mocked(cmd, delim, expected_len):
+
+class LsblkCmdOutputMocked(object):
+    def __init__(self, names_output):
+        self.names_output = names_output
+        self.commands = []
+
+    def __call__(self, cmd, delim, expected_len):
+        self.commands.append(cmd)
         if cmd == ['lsblk', '-pbnr', '--output', 'NAME,MAJ:MIN,RM,SIZE,RO,TYPE,MOUNTPOINT']:
             output_lines_split_on_whitespace = [
-                ['vda', '252:0', '0', str(40 * bytes_per_gb), '0', 'disk', ''],
-                ['vda1', '252:1', '0', str(1 * bytes_per_gb), '0', 'part', '/boot'],
-                ['vda2', '252:2', '0', str(39 * bytes_per_gb), '0', 'part', ''],
-                ['rhel_ibm--p8--kvm--03--guest--02-root', '253:0', '0', str(38 * bytes_per_gb), '0', 'lvm', '/'],
-                ['rhel_ibm--p8--kvm--03--guest--02-swap', '253:1', '0', str(1 * bytes_per_gb), '0', 'lvm', '[SWAP]']
+                ['vda', '252:0', '0', str(40 * LSBLK_BYTES_PER_GB), '0', 'disk', ''],
+                ['vda1', '252:1', '0', str(1 * LSBLK_BYTES_PER_GB), '0', 'part', '/boot'],
+                ['vda2', '252:2', '0', str(39 * LSBLK_BYTES_PER_GB), '0', 'part', ''],
+                ['rhel_ibm--p8--kvm--03--guest--02-root', '253:0', '0', str(38 * LSBLK_BYTES_PER_GB), '0', 'lvm',
+                 '/'],
+                ['rhel_ibm--p8--kvm--03--guest--02-swap', '253:1', '0', str(1 * LSBLK_BYTES_PER_GB), '0', 'lvm',
+                 '[SWAP]']
             ]
-            for output_line_parts in output_lines_split_on_whitespace:
-                yield output_line_parts
-        elif len(cmd) == 5 and cmd[:4] == ['lsblk', '-nr', '--output', 'NAME,KNAME,SIZE']:
-            # We cannot have the output in a list, since the command is called per device. Therefore, we have to map
-            # each device path to its output.
-            output_lines_split_on_whitespace_per_device = {
-                'vda': ['vda', 'vda', '40G'],
-                'vda1': ['vda1', 'vda1', '1G'],
-                'vda2': ['vda2', 'vda2', '39G'],
-                'rhel_ibm--p8--kvm--03--guest--02-root': ['rhel_ibm--p8--kvm--03--guest--02-root', 'kname1', '38G'],
-                'rhel_ibm--p8--kvm--03--guest--02-swap': ['rhel_ibm--p8--kvm--03--guest--02-swap', 'kname2', '1G']
-            }
-            dev_path = cmd[4]
-            if dev_path not in output_lines_split_on_whitespace_per_device:
-                raise ValueError('Attempting to call lsblk on an unexpected device: {}'.format(dev_path))
-            yield output_lines_split_on_whitespace_per_device[dev_path]
+            return iter(output_lines_split_on_whitespace)
+        if cmd == ['lsblk', '-nr', '--output', 'NAME,KNAME,SIZE,MAJ:MIN']:
+            return iter(self.names_output)
+        if len(cmd) == 5 and cmd[:4] == ['lsblk', '-nr', '--output', 'NAME,KNAME,SIZE,MAJ:MIN']:
+            for output_line_parts in LSBLK_NAMES_OUTPUT:
+                if output_line_parts[0] == cmd[4]:
+                    return iter([output_line_parts])
+            raise ValueError('Attempting to call lsblk on an unexpected device: {}'.format(cmd[4]))
+        raise ValueError('Attempting to call unexpected command: {}'.format(cmd))
+
+
+EXPECTED_LSBLK_INFO = [
+    LsblkEntry(
+        name='vda',
+        kname='vda',
+        maj_min='252:0',
+        rm='0',
+        size='40G',
+        bsize=40 * LSBLK_BYTES_PER_GB,
+        ro='0',
+        tp='disk',
+        mountpoint=''),
+    LsblkEntry(
+        name='vda1',
+        kname='vda1',
+        maj_min='252:1',
+        rm='0',
+        size='1G',
+        bsize=1 * LSBLK_BYTES_PER_GB,
+        ro='0',
+        tp='part',
+        mountpoint='/boot'),
+    LsblkEntry(
+        name='vda2',
+        kname='vda2',
+        maj_min='252:2',
+        rm='0',
+        size='39G',
+        bsize=39 * LSBLK_BYTES_PER_GB,
+        ro='0',
+        tp='part',
+        mountpoint=''),
+    LsblkEntry(
+        name='rhel_ibm--p8--kvm--03--guest--02-root',
+        kname='kname1',
+        maj_min='253:0',
+        rm='0',
+        size='38G',
+        bsize=38 * LSBLK_BYTES_PER_GB,
+        ro='0',
+        tp='lvm',
+        mountpoint='/'),
+    LsblkEntry(
+        name='rhel_ibm--p8--kvm--03--guest--02-swap',
+        kname='kname2',
+        maj_min='253:1',
+        rm='0',
+        size='1G',
+        bsize=1 * LSBLK_BYTES_PER_GB,
+        ro='0',
+        tp='lvm',
+        mountpoint='[SWAP]')]
 
-        else:
-            raise ValueError('Attempting to call unexpected command: {}'.format(cmd))
 
-    monkeypatch.setattr(storagescanner, '_get_cmd_output', get_cmd_output_mocked)
-    expected = [
-        LsblkEntry(
-            name='vda',
-            kname='vda',
-            maj_min='252:0',
-            rm='0',
-            size='40G',
-            bsize=40 * bytes_per_gb,
-            ro='0',
-            tp='disk',
-            mountpoint=''),
-        LsblkEntry(
-            name='vda1',
-            kname='vda1',
-            maj_min='252:1',
-            rm='0',
-            size='1G',
-            bsize=1 * bytes_per_gb,
-            ro='0',
-            tp='part',
-            mountpoint='/boot'),
-        LsblkEntry(
-            name='vda2',
-            kname='vda2',
-            maj_min='252:2',
-            rm='0',
-            size='39G',
-            bsize=39 * bytes_per_gb,
-            ro='0',
-            tp='part',
-            mountpoint=''),
-        LsblkEntry(
-            name='rhel_ibm--p8--kvm--03--guest--02-root',
-            kname='kname1',
-            maj_min='253:0',
-            rm='0',
-            size='38G',
-            bsize=38 * bytes_per_gb,
-            ro='0',
-            tp='lvm',
-            mountpoint='/'),
-        LsblkEntry(
-            name='rhel_ibm--p8--kvm--03--guest--02-swap',
-            kname='kname2',
-            maj_min='253:1',
-            rm='0',
-            size='1G',
-            bsize=1 * bytes_per_gb,
-            ro='0',
-            tp='lvm',
-            mountpoint='[SWAP]')]
-
-    actual = storagescanner._get_lsblk_info()
-    assert expected == actual
+def test_get_lsblk_info(monkeypatch):
+    cmd_output_mocked = LsblkCmdOutputMocked(LSBLK_NAMES_OUTPUT)
+    monkeypatch.setattr(storagescanner, '_get_cmd_output', cmd_output_mocked)
+
+    assert EXPECTED_LSBLK_INFO == storagescanner._get_lsblk_info()
+    # lsblk is called just twice regardless the number of devices
+    assert len(cmd_output_mocked.commands) == 2
+
+
+def test_get_lsblk_info_devices_changed(monkeypatch):
+    # A device has appeared between the lsblk calls
+    cmd_output_mocked = LsblkCmdOutputMocked([LSBLK_NAMES_OUTPUT[0]] + LSBLK_NAMES_OUTPUT[2:])
+    monkeypatch.setattr(storagescanner, '_get_cmd_output', cmd_output_mocked)
+
+    assert EXPECTED_LSBLK_INFO == storagescanner._get_lsblk_info()
+    assert cmd_output_mocked.commands[2:] == [['lsblk', '-nr', '--output', 'NAME,KNAME,SIZE,MAJ:MIN', 'vda1']]
 
 
 def test_get_pvs_info(monkeypatch):
@@ -412,6 +434,69 @@ def test_get_lvdisplay_info(monkeypatch):
     assert expected == storagescanner._get_lvdisplay_info()
 
 
+LVM_FULLREPORT_OUTPUT = json.dumps({'report': [
+    {
+        'vg': [{'vg_name': 'rhel_ibm-p8-kvm-03-guest-02', 'pv_count': '1', 'lv_count': '2', 'snap_count': '0',
+                'vg_attr': 'wz--n-', 'vg_size': '<39.00g', 'vg_free': '4.00m'}],
+        'pv': [{'pv_name': '/dev/vda2', 'vg_name': 'rhel_ibm-p8-kvm-03-guest-02', 'pv_fmt': 'lvm2',
+                'pv_attr': 'a--', 'pv_size': '<39.00g', 'pv_free': '4.00m'}],
+        'lv': [
+            {'lv_name': 'swap', 'vg_name': 'rhel_ibm-p8-kvm-03-guest-02', 'lv_attr': '-wi-ao----',
+             'lv_size': '1.00g', 'pool_lv': '', 'origin': '', 'data_percent': '', 'metadata_percent': '',
+             'move_pv': '', 'mirror_log': '', 'copy_percent': '', 'convert_lv': ''},
+            {'lv_name': 'root', 'vg_name': 'rhel_ibm-p8-kvm-03-guest-02', 'lv_attr': '-wi-ao----',
+             'lv_size': '37.99g', 'pool_lv': '', 'origin': '', 'data_percent': '', 'metadata_percent': '',
+             'move_pv': '', 'mirror_log': '', 'copy_percent': '', 'convert_lv': ''}],
+        'pvseg': [],
+        'seg': [],
+    },
+    {
+        'vg': [],
+        'pv': [{'pv_name': '/dev/vdb', 'vg_name': '', 'pv_fmt': 'lvm2', 'pv_attr': '---', 'pv_size': '1.00g',
+                'pv_free': '1.00g'}],
+        'lv': [],
+    }
+]})
+
+
+def test_get_lvm_report(monkeypatch):
+    commands = []
+
+    def get_raw_cmd_output_mocked(cmd):
+        commands.append(cmd)
+        return LVM_FULLREPORT_OUTPUT
+
+    def get_cmd_output_mocked(cmd, delim, expected_len):
+        raise AssertionError('Unexpected call of {}'.format(cmd))
+
+    monkeypatch.setattr(storagescanner, '_get_raw_cmd_output', get_raw_cmd_output_mocked)
+    monkeypatch.setattr(storagescanner, '_get_cmd_output', get_cmd_output_mocked)
+
+    lvm_report = storagescanner._get_lvm_report()
+    assert len(commands) == 1
+    assert commands[0][:4] == ['lvm', 'fullreport', '--reportformat', 'json']
+
+    assert [pv.pv for pv in storagescanner._get_pvs_info(lvm_report)] == ['/dev/vda2', '/dev/vdb']
+    assert storagescanner._get_vgs_info(lvm_report) == [
+        VgsEntry(
+            vg='rhel_ibm-p8-kvm-03-guest-02',
+            pv='1',
+            lv='2',
+            sn='0',
+            attr='wz--n-',
+            vsize='<39.00g',
+            vfree='4.00m')]
+    lvdisplay = storagescanner._get_lvdisplay_info(lvm_report)
+    assert [(lv.lv, lv.lsize) for lv in lvdisplay] == [('root', '37.99g'), ('swap', '1.00g')]
+
+
+@pytest.mark.parametrize('output', (None, '', '{"report": 1}'))
+def test_get_lvm_report_unavailable(monkeypatch, output):
+    monkeypatch.setattr(storagescanner, '_get_raw_cmd_output', lambda cmd: output)
+    monkeypatch.setattr(api, 'current_logger', logger_mocked())
+    assert storagescanner._get_lvm_report() is None
+
+
 def test_get_systemd_mount_info(monkeypatch):
 
     class UdevDeviceMocked(object):
@@ -50,18 +50,22 @@ class SystemFactsActor(Actor):
     tags = (IPUWorkflowTag, FactsPhaseTag,)
 
     def process(self):
-        self.produce(systemfacts.get_sysctls_status())
-        self.produce(systemfacts.get_active_kernel_modules_status(self.log))
-        self.produce(systemfacts.get_system_users_status())
-        self.produce(systemfacts.get_system_groups_status())
-        self.produce(systemfacts.get_repositories_status())
-        self.produce(systemfacts.get_selinux_status())
-        self.produce(systemfacts.get_firewalls_status())
-        self.produce(systemfacts.get_firmware())
+        with systemfacts.CollectorPool() as pool:
+            pool.submit(systemfacts.get_sysctls_status)
+            pool.submit(systemfacts.get_active_kernel_modules_status, self.log)
+            pool.submit(systemfacts.get_system_users_status)
+            pool.submit(systemfacts.get_system_groups_status)
+            pool.submit(systemfacts.get_repositories_status)
+            pool.submit(systemfacts.get_firewalls_status)
+            pool.submit(systemfacts.get_firmware)
+            pool.submit(systemfacts.get_bios_grubcfg_details)
 
-        if not architecture.matches_architecture(architecture.ARCH_S390X):
-            self.produce(systemfacts.get_default_grub_conf())
+            # NOTE: these can produce reports, which has to be done in the main thread
+            pool.submit_in_main_thread(systemfacts.get_selinux_status)
+            if not architecture.matches_architecture(architecture.ARCH_S390X):
+                pool.submit_in_main_thread(systemfacts.get_default_grub_conf)
 
-        bios_grubcfg_details = systemfacts.get_bios_grubcfg_details()
-        if bios_grubcfg_details:
-            self.produce(bios_grubcfg_details)
+            for facts in pool.results():
+                # get_bios_grubcfg_details returns None when not relevant
+                if facts:
+                    self.produce(facts)
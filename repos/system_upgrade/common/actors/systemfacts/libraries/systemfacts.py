@@ -5,6 +5,7 @@ import logging
 import os
 import pwd
 import re
+from multiprocessing.pool import ThreadPool
 
 import six
 
@@ -33,6 +34,9 @@ from leapp.models import (
     UsersFacts
 )
 
+MAX_COLLECTOR_WORKERS = 4
+SYS_MODULE_PATH = '/sys/module'
+
 
 def aslist(f):
     """ Decorator used to convert generator to list """
@@ -58,6 +62,52 @@ def anyhasprefix(value, prefixes):
     return False
 
 
+class _CollectedResult(object):
+    """ Result of a collector executed in the main thread, compatible with results of the pool """
+    def __init__(self, value):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+
+class CollectorPool(object):
+    """
+    Run independent collectors of facts concurrently on a bounded pool of threads
+
+    The collectors mostly wait for subprocesses or file I/O, so running them concurrently
+    reduces the time of the scan to roughly the time of the slowest collector. The results
+    are returned in the order in which the collectors have been submitted.
+    """
+    def __init__(self, max_workers=MAX_COLLECTOR_WORKERS):
+        self._pool = ThreadPool(max_workers)
+        self._results = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._pool.terminate()
+        self._pool.join()
+
+    def submit(self, collector, *args):
+        """ Execute the collector in the pool """
+        self._results.append(self._pool.apply_async(collector, args))
+
+    def submit_in_main_thread(self, collector, *args):
+        """
+        Execute the collector in the main thread right away
+
+        Use for collectors that can produce messages (e.g. reports) on their own, as the messaging
+        is not thread-safe. The collectors submitted previously continue running in the pool meanwhile.
+        """
+        self._results.append(_CollectedResult(collector(*args)))
+
+    def results(self):
+        """ Wait for all the collectors and return their results in the order of submission """
+        return [result.get() for result in self._results]
+
+
 @aslist
 def _get_system_users():
     for p in pwd.getpwall():
@@ -89,59 +139,106 @@ def get_system_groups_status():
     return GroupsFacts(groups=_get_system_groups())
 
 
-@aslist
-def _get_active_kernel_modules(logger):
-    lines = run(['lsmod'], split=True)['stdout']
-    for l in lines[1:]:
-        name = l.split(' ')[0]
-
-        # Read parameters of the given module as exposed by the
-        # `/sys` VFS, if there are no parameters exposed we just
-        # take the name of the module
-        base_path = '/sys/module/{module}'.format(module=name)
-        parameters_path = os.path.join(base_path, 'parameters')
-        if not os.path.exists(parameters_path):
-            yield ActiveKernelModule(filename=name, parameters=[])
+def _normalize_module_name(name):
+    # Dashes and underscores in names of kernel modules are interchangeable
+    return name.replace('-', '_')
+
+
+def _get_kernel_modules_signatures(names):
+    """
+    Get signatures of the given kernel modules using a single `modinfo` call
+
+    The output of `modinfo` for multiple modules is a sequence of records, each of them
+    starting with the `filename` field, with the values of multi-line fields (such as
+    the signature) continued on lines indented by whitespace.
+
+    :returns: dictionary mapping names of signed modules to their signatures without whitespace
+    """
+    if not names:
+        return {}
+
+    modules = {_normalize_module_name(name): name for name in names}
+    # modinfo prints info about all the found modules even if some of them are not found
+    lines = run(['modinfo'] + list(names), split=True, checked=False)['stdout']
+
+    signatures = {}
+    module = None
+    field = None
+    for line in lines:
+        if line[:1].isspace():
+            if field == 'signature' and module in signatures:
+                signatures[module] += line
             continue
 
-        # Use `modinfo` to probe for signature information
-        parameter_dict = {}
+        field, dummy_sep, value = line.partition(':')
+        value = value.strip()
+        if field == 'filename':
+            # e.g. /lib/modules/<kernel>/kernel/fs/xfs/xfs.ko.xz
+            module = modules.get(_normalize_module_name(os.path.basename(value).split('.ko')[0]))
+        elif field == 'name':
+            module = modules.get(_normalize_module_name(value), module)
+        elif field == 'signature' and module:
+            signatures[module] = value
+
+    # Remove whitspace from the signature strings
+    return {
+        name: re.sub(r"\s+", "", signature, flags=re.UNICODE)
+        for name, signature in signatures.items()
+        if signature.strip()
+    }
+
+
+def _get_kernel_module_parameters(name, parameters_path, logger):
+    # Since we're using the `/sys` VFS we need to use `os.listdir()` to get
+    # all the property names and then just read from all the listed paths
+    parameter_dict = {}
+    for param in sorted(os.listdir(parameters_path)):
         try:
-            signature = run(['modinfo', '-F', 'signature', name], split=False)['stdout']
-        except CalledProcessError:
-            signature = None
+            with open(os.path.join(parameters_path, param), mode='r') as fp:
+                parameter_dict[param] = fp.read().strip()
+        except IOError as exc:
+            # Some parameters are write-only, in that case we just log the name of parameter
+            # and the module and continue
+            if exc.errno in (errno.EACCES, errno.EPERM):
+                msg = 'Unable to read parameter "{param}" of kernel module "{name}"'
+                logger.warning(msg.format(param=param, name=name))
+            else:
+                raise exc
+
+    # Project the dictionary as a list of key values
+    return [
+        KernelModuleParameter(name=k, value=v)
+        for (k, v) in six.iteritems(parameter_dict)
+    ]
 
-        signature_string = None
-        if signature:
-            # Remove whitspace from the signature string
-            signature_string = re.sub(r"\s+", "", signature, flags=re.UNICODE)
 
-        # Since we're using the `/sys` VFS we need to use `os.listdir()` to get
-        # all the property names and then just read from all the listed paths
-        parameters = sorted(os.listdir(parameters_path))
-        for param in parameters:
-            try:
-                with open(os.path.join(parameters_path, param), mode='r') as fp:
-                    parameter_dict[param] = fp.read().strip()
-            except IOError as exc:
-                # Some parameters are write-only, in that case we just log the name of parameter
-                # and the module and continue
-                if exc.errno in (errno.EACCES, errno.EPERM):
-                    msg = 'Unable to read parameter "{param}" of kernel module "{name}"'
-                    logger.warning(msg.format(param=param, name=name))
-                else:
-                    raise exc
-
-        # Project the dictionary as a list of key values
-        items = [
-            KernelModuleParameter(name=k, value=v)
-            for (k, v) in six.iteritems(parameter_dict)
-        ]
+@aslist
+def _get_active_kernel_modules(logger):
+    lines = run(['lsmod'], split=True)['stdout']
+    names = [l.split(' ')[0] for l in lines[1:]]
+
+    # Read parameters of the given module as exposed by the
+    # `/sys` VFS, if there are no parameters exposed we just
+    # take the name of the module
+    parameters_paths = {}
+    for name in names:
+        parameters_path = os.path.join(SYS_MODULE_PATH, name, 'parameters')
+        if os.path.exists(parameters_path):
+            parameters_paths[name] = parameters_path
+
+    # Use a single `modinfo` call to probe for signature information,
+    # spawning a process per module is expensive with many modules loaded
+    signatures = _get_kernel_modules_signatures([name for name in names if name in parameters_paths])
+
+    for name in names:
+        if name not in parameters_paths:
+            yield ActiveKernelModule(filename=name, parameters=[])
+            continue
 
         yield ActiveKernelModule(
             filename=name,
-            parameters=items,
-            signature=signature_string
+            parameters=_get_kernel_module_parameters(name, parameters_paths[name], logger),
+            signature=signatures.get(name)
         )
 
 
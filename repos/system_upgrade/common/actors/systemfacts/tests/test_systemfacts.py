@@ -1,4 +1,8 @@
-from leapp.libraries.actor.systemfacts import anyhasprefix, anyendswith, aslist
+import time
+
+import pytest
+
+from leapp.libraries.actor.systemfacts import anyhasprefix, anyendswith, aslist, CollectorPool
 from leapp.snactor.fixture import current_actor_libraries
 
 
@@ -33,3 +37,26 @@ def test_aslist(current_actor_libraries):
     r = local()
 
     assert isinstance(r, list) and r[0] and r[2] and not r[1]
+
+
+def test_collector_pool_keeps_order(current_actor_libraries):
+    def collect(value, delay):
+        time.sleep(delay)
+        return value
+
+    with CollectorPool(max_workers=2) as pool:
+        pool.submit(collect, 'slow', 0.2)
+        pool.submit(collect, 'fast', 0)
+        pool.submit_in_main_thread(collect, 'main', 0)
+        pool.submit(collect, 'last', 0.1)
+        assert pool.results() == ['slow', 'fast', 'main', 'last']
+
+
+def test_collector_pool_raises(current_actor_libraries):
+    def collect():
+        raise ValueError('collector failed')
+
+    with CollectorPool() as pool:
+        pool.submit(collect)
+        with pytest.raises(ValueError):
+            pool.results()
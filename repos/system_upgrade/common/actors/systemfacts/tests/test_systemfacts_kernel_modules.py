@@ -0,0 +1,64 @@
+from leapp.libraries.actor import systemfacts
+from leapp.libraries.common.testutils import logger_mocked
+
+LSMOD_OUTPUT = [
+    'Module                  Size  Used by',
+    'xfs                   978944  2',
+    'snd_hda_intel          57344  0',
+    'dummy                  16384  0',
+]
+
+MODINFO_OUTPUT = [
+    'filename:       /lib/modules/4.18.0-305.el8.x86_64/kernel/fs/xfs/xfs.ko.xz',
+    'license:        GPL',
+    'sig_hashalgo:   sha256',
+    'signature:      30:65:02:31:00:AB:CD',
+    '\t\tEF:01:23',
+    'parm:           xfs_debug:int',
+    'filename:       /lib/modules/4.18.0-305.el8.x86_64/kernel/sound/pci/hda/snd-hda-intel.ko.xz',
+    'license:        GPL',
+    'parm:           enable:bool',
+]
+
+
+class RunMocked(object):
+    def __init__(self):
+        self.commands = []
+
+    def __call__(self, cmd, split=False, checked=True):
+        self.commands.append(cmd)
+        return {'stdout': LSMOD_OUTPUT if cmd[0] == 'lsmod' else MODINFO_OUTPUT}
+
+
+def test_get_kernel_modules_signatures(monkeypatch):
+    run_mocked = RunMocked()
+    monkeypatch.setattr(systemfacts, 'run', run_mocked)
+
+    assert systemfacts._get_kernel_modules_signatures([]) == {}
+    assert not run_mocked.commands
+
+    signatures = systemfacts._get_kernel_modules_signatures(['xfs', 'snd_hda_intel', 'missing'])
+    assert signatures == {'xfs': '30:65:02:31:00:AB:CDEF:01:23'}
+    assert run_mocked.commands == [['modinfo', 'xfs', 'snd_hda_intel', 'missing']]
+
+
+def test_get_active_kernel_modules(monkeypatch, tmpdir):
+    sys_module = tmpdir.mkdir('module')
+    xfs_params = sys_module.mkdir('xfs').mkdir('parameters')
+    xfs_params.join('xfs_debug').write('0\n')
+    sys_module.mkdir('snd_hda_intel').mkdir('parameters').join('enable').write('Y\n')
+    sys_module.mkdir('dummy')
+
+    run_mocked = RunMocked()
+    monkeypatch.setattr(systemfacts, 'run', run_mocked)
+    monkeypatch.setattr(systemfacts, 'SYS_MODULE_PATH', sys_module.strpath)
+
+    modules = {module.filename: module for module in systemfacts._get_active_kernel_modules(logger_mocked())}
+
+    assert [cmd[0] for cmd in run_mocked.commands] == ['lsmod', 'modinfo']
+    assert run_mocked.commands[1] == ['modinfo', 'xfs', 'snd_hda_intel']
+    assert modules['xfs'].signature == '30:65:02:31:00:AB:CDEF:01:23'
+    assert [(p.name, p.value) for p in modules['xfs'].parameters] == [('xfs_debug', '0')]
+    assert modules['snd_hda_intel'].signature is None
+    assert [(p.name, p.value) for p in modules['snd_hda_intel'].parameters] == [('enable', 'Y')]
+    assert modules['dummy'].parameters == []
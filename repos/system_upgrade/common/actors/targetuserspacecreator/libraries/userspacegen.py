@@ -1,10 +1,12 @@
+import hashlib
 import itertools
+import json
 import os
 
 from leapp import reporting
 from leapp.exceptions import StopActorExecution, StopActorExecutionError
 from leapp.libraries.actor import constants
-from leapp.libraries.common import dnfplugin, mounting, overlaygen, repofileutils, rhsm, rhui, utils
+from leapp.libraries.common import dnfplugin, mounting, overlaygen, pkgcache, repofileutils, rhsm, rhui, utils
 from leapp.libraries.common.config import get_env, get_product_type
 from leapp.libraries.common.config.version import get_target_major_version
 from leapp.libraries.stdlib import api, CalledProcessError, config, run
@@ -50,6 +52,7 @@ from leapp.utils.deprecation import suppress_deprecation
 
 PROD_CERTS_FOLDER = 'prod-certs'
 PERSISTENT_PACKAGE_CACHE_DIR = '/var/lib/leapp/persistent_package_cache'
+_USERSPACE_STAMP_FORMAT = 2
 
 
 def _check_deprecated_rhsm_skip():
@@ -119,7 +122,7 @@ def _restore_persistent_package_cache(userspace_dir):
     if get_env('LEAPP_DEVEL_USE_PERSISTENT_PACKAGE_CACHE', None) == '1':
         if os.path.exists(PERSISTENT_PACKAGE_CACHE_DIR):
             with mounting.NspawnActions(base_dir=userspace_dir) as target_context:
-                target_context.copytree_to(PERSISTENT_PACKAGE_CACHE_DIR, '/var/cache/dnf')
+                target_context.movetree_to(PERSISTENT_PACKAGE_CACHE_DIR, '/var/cache/dnf')
     # We always want to remove the persistent cache here to unclutter the system
     run(['rm', '-rf', PERSISTENT_PACKAGE_CACHE_DIR])
 
@@ -130,46 +133,173 @@ def _backup_to_persistent_package_cache(userspace_dir):
         run(['rm', '-rf', PERSISTENT_PACKAGE_CACHE_DIR])
         if os.path.exists(os.path.join(userspace_dir, 'var', 'cache', 'dnf')):
             with mounting.NspawnActions(base_dir=userspace_dir) as target_context:
-                target_context.copytree_from('/var/cache/dnf', PERSISTENT_PACKAGE_CACHE_DIR)
+                target_context.movetree_from('/var/cache/dnf', PERSISTENT_PACKAGE_CACHE_DIR)
+
+
+def _get_userspace_stamp_path(userspace_dir):
+    return '{}.json'.format(userspace_dir.rstrip('/'))
+
+
+def _get_repofiles_digest(context):
+    """
+    Return the digest of the repository files used to create the target userspace.
+    """
+    repos_dir = context.full_path('/etc/yum.repos.d')
+    digest = hashlib.sha256()
+    for fname in sorted(os.listdir(repos_dir)) if os.path.isdir(repos_dir) else []:
+        path = os.path.join(repos_dir, fname)
+        if not os.path.isfile(path):
+            continue
+        digest.update(fname.encode('utf-8'))
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _get_userspace_build_inputs(context, enabled_repos):
+    """
+    Return the inputs which require the full rebuild of the target userspace when changed.
+    """
+    return {
+        'format': _USERSPACE_STAMP_FORMAT,
+        'release': api.current_actor().configuration.version.target,
+        'repos': sorted(enabled_repos),
+        'skip_rhsm': rhsm.skip_rhsm(),
+        'repofiles': _get_repofiles_digest(context),
+    }
+
+
+def _get_installed_packages(userspace_dir):
+    """
+    Return the sorted list of packages (NEVRA) installed in the target userspace or None when it cannot be obtained.
+    """
+    queryformat = r'%{NAME}-%{EPOCHNUM}:%{VERSION}-%{RELEASE}.%{ARCH}\n'
+    try:
+        with mounting.NspawnActions(base_dir=userspace_dir) as target_context:
+            result = target_context.call(['rpm', '-qa', '--queryformat', queryformat], split=True)
+    except CalledProcessError as e:
+        api.current_logger().warning('Cannot get packages installed in the target userspace: {}'.format(str(e)))
+        return None
+    return sorted(result['stdout'])
+
+
+def _can_reuse_target_userspace(userspace_dir, build_inputs, packages):
+    """
+    Check whether the target userspace created by a previous run can be updated instead of created from scratch.
+
+    That's possible only if the reuse is enabled, the userspace has been created successfully with the same inputs,
+    all the packages required by the previous run are still required and no packages have been installed
+    or removed since then (e.g. by actors preparing the upgrade initramfs).
+
+    Files written into the userspace by this actor after the packages are installed (repository access, copied
+    files, the DNF plugin) are written again on each run.
+    """
+    if get_env('LEAPP_REUSE_TARGET_USERSPACE', '0') != '1' or not os.path.isdir(userspace_dir):
+        return False
+    try:
+        with open(_get_userspace_stamp_path(userspace_dir)) as f:
+            stamp = json.load(f)
+    except (IOError, OSError, ValueError):
+        return False
+    if not isinstance(stamp, dict) or stamp.get('inputs') != build_inputs:
+        api.current_logger().info('The inputs of the target userspace have changed, creating the userspace again.')
+        return False
+    if not set(stamp.get('packages', [])).issubset(packages):
+        api.current_logger().info('Some installed packages are not required anymore, creating the userspace again.')
+        return False
+    installed = _get_installed_packages(userspace_dir)
+    if installed is None or stamp.get('installed') != installed:
+        api.current_logger().info('The target userspace has been modified since it was created, creating it again.')
+        return False
+    return True
+
+
+def _store_userspace_stamp(userspace_dir, build_inputs, packages):
+    installed = _get_installed_packages(userspace_dir)
+    if installed is None:
+        return
+    try:
+        with open(_get_userspace_stamp_path(userspace_dir), 'w') as f:
+            json.dump({'inputs': build_inputs, 'packages': sorted(set(packages)), 'installed': installed}, f)
+    except (IOError, OSError) as e:
+        api.current_logger().warning('Cannot store the target userspace stamp: {}'.format(str(e)))
+
+
+def _remove_userspace_stamp(userspace_dir):
+    try:
+        os.unlink(_get_userspace_stamp_path(userspace_dir))
+    except OSError:
+        pass
+
+
+def _call_userspace_dnf(context, dnf_command, enabled_repos, packages):
+    target_major_version = get_target_major_version()
+    repos_opt = [['--enablerepo', repo] for repo in enabled_repos]
+    repos_opt = list(itertools.chain(*repos_opt))
+    cmd = ['dnf',
+           dnf_command,
+           '-y',
+           '--nogpgcheck',
+           '--setopt=module_platform_id=platform:el{}'.format(target_major_version),
+           '--setopt=keepcache=1',
+           '--releasever', api.current_actor().configuration.version.target,
+           '--installroot', '/el{}target'.format(target_major_version),
+           '--disablerepo', '*'
+           ] + repos_opt + packages
+    if config.is_verbose():
+        cmd.append('-v')
+    if rhsm.skip_rhsm():
+        cmd += ['--disableplugin', 'subscription-manager']
+    try:
+        context.call(cmd, callback_raw=utils.logging_handler)
+    except CalledProcessError as exc:
+        raise StopActorExecutionError(
+            message='Unable to install RHEL {} userspace packages.'.format(target_major_version),
+            details={'details': str(exc), 'stderr': exc.stderr}
+        )
 
 
 def prepare_target_userspace(context, userspace_dir, enabled_repos, packages):
     """
     Implement the creation of the target userspace.
-    """
-    _backup_to_persistent_package_cache(userspace_dir)
 
+    When LEAPP_REUSE_TARGET_USERSPACE=1 is set and the target userspace created by a previous run
+    has the same inputs (target release, repositories, ...), the userspace is just updated: installed
+    packages are upgraded and missing packages are installed, instead of installing all packages from scratch.
+
+    Packages stored in the package cache are not downloaded again and the downloaded packages are stored
+    there for the next run (see the pkgcache library).
+    """
     target_major_version = get_target_major_version()
-    run(['rm', '-rf', userspace_dir])
-    _create_target_userspace_directories(userspace_dir)
+    build_inputs = _get_userspace_build_inputs(context, enabled_repos)
+    reuse = _can_reuse_target_userspace(userspace_dir, build_inputs, packages)
+    # The stamp is stored again only when the userspace is prepared successfully
+    _remove_userspace_stamp(userspace_dir)
+
+    if reuse:
+        api.current_logger().info('Updating the target userspace created by a previous run.')
+    else:
+        _backup_to_persistent_package_cache(userspace_dir)
+        run(['rm', '-rf', userspace_dir])
+        _create_target_userspace_directories(userspace_dir)
     with mounting.BindMount(
         source=userspace_dir, target=os.path.join(context.base_dir, 'el{}target'.format(target_major_version))
     ):
-        _restore_persistent_package_cache(userspace_dir)
-
-        repos_opt = [['--enablerepo', repo] for repo in enabled_repos]
-        repos_opt = list(itertools.chain(*repos_opt))
-        cmd = ['dnf',
-               'install',
-               '-y',
-               '--nogpgcheck',
-               '--setopt=module_platform_id=platform:el{}'.format(target_major_version),
-               '--setopt=keepcache=1',
-               '--releasever', api.current_actor().configuration.version.target,
-               '--installroot', '/el{}target'.format(target_major_version),
-               '--disablerepo', '*'
-               ] + repos_opt + packages
-        if config.is_verbose():
-            cmd.append('-v')
-        if rhsm.skip_rhsm():
-            cmd += ['--disableplugin', 'subscription-manager']
+        if not reuse:
+            _restore_persistent_package_cache(userspace_dir)
+        dnf_cache_dir = os.path.join(userspace_dir, 'var', 'cache', 'dnf')
+        if pkgcache.is_enabled():
+            # Download the repository metadata first, so the cached packages can be matched with them
+            _call_userspace_dnf(context, 'makecache', enabled_repos, [])
+            pkgcache.restore_packages(dnf_cache_dir)
         try:
-            context.call(cmd, callback_raw=utils.logging_handler)
-        except CalledProcessError as exc:
-            raise StopActorExecutionError(
-                message='Unable to install RHEL {} userspace packages.'.format(target_major_version),
-                details={'details': str(exc), 'stderr': exc.stderr}
-            )
+            if reuse:
+                _call_userspace_dnf(context, 'upgrade', enabled_repos, [])
+            _call_userspace_dnf(context, 'install', enabled_repos, packages)
+        finally:
+            pkgcache.store_packages(dnf_cache_dir)
+
+    _store_userspace_stamp(userspace_dir, build_inputs, packages)
 
 
 def _get_all_rhui_pkgs():
@@ -193,6 +323,31 @@ def _get_all_rhui_pkgs():
     return pkgs
 
 
+def _get_files_owners(context, paths):
+    """
+    Return the dict mapping the given paths to the list of packages (NVRA) owning them.
+
+    All the paths are queried by a single rpm call, so the rpm DB is opened just once.
+    Paths not owned by any package are not present in the dict.
+    """
+    if not paths:
+        return {}
+    # List all files of the owning packages, so the output lines can be mapped back
+    # to the queried paths (a file can be owned by multiple packages). The single value
+    # tags have to be prefixed by '=' inside the array iterator, otherwise rpm fails for
+    # packages with more than one file ("array iterator used with different sized arrays")
+    queryformat = r'[%{FILENAMES}\t%{=NAME}-%{=VERSION}-%{=RELEASE}.%{=ARCH}\n]'
+    # rpm exits with a non-zero code when any of the files is not owned by any package
+    result = context.call(['rpm', '-qf', '--queryformat', queryformat] + paths, split=True, checked=False)
+    queried_paths = set(paths)
+    owners = {}
+    for line in result['stdout']:
+        path, dummy_sep, pkg = line.partition('\t')
+        if path in queried_paths and pkg not in owners.setdefault(path, []):
+            owners[path].append(pkg)
+    return owners
+
+
 def _get_files_owned_by_rpms(context, dirpath, pkgs=None):
     """
     Return the list of file names inside dirpath owned by RPMs.
@@ -203,14 +358,15 @@ def _get_files_owned_by_rpms(context, dirpath, pkgs=None):
     In case the pkgs param is None or empty, do not filter any specific rpms.
     Otherwise return filenames that are owned by any pkg in the given list.
     """
+    fnames = sorted(os.listdir(context.full_path(dirpath)))
+    owners = _get_files_owners(context, [os.path.join(dirpath, fname) for fname in fnames])
     files_owned_by_rpms = []
-    for fname in os.listdir(context.full_path(dirpath)):
-        try:
-            result = context.call(['rpm', '-qf', os.path.join(dirpath, fname)])
-        except CalledProcessError:
+    for fname in fnames:
+        fname_owners = owners.get(os.path.join(dirpath, fname))
+        if not fname_owners:
             api.current_logger().debug('SKIP the {} file: not owned by any rpm'.format(fname))
             continue
-        if pkgs and not [pkg for pkg in pkgs if pkg in result['stdout']]:
+        if pkgs and not [pkg for pkg in pkgs if any(pkg in owner for owner in fname_owners)]:
             api.current_logger().debug('SKIP the {} file: not owned by any searched rpm:'.format(fname))
             continue
         api.current_logger().debug('Found the file owned by an rpm: {}.'.format(fname))
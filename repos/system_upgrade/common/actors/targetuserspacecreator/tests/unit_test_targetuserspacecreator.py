@@ -1,4 +1,5 @@
 import os
+import re
 from collections import namedtuple
 
 import pytest
@@ -375,3 +376,122 @@ def test_perform_ok(monkeypatch):
     assert userspacegen.api.produce.model_instances[1] == msg_target_repos
     # this one is full of contants, so it's safe to check just the instance
     assert isinstance(userspacegen.api.produce.model_instances[2], models.TargetUserSpaceInfo)
+
+
+def test_get_files_owned_by_rpms(monkeypatch, tmpdir):
+    class MockedContext(object):
+        def __init__(self):
+            self.called = []
+
+        def full_path(self, path):
+            return tmpdir.join(path).strpath
+
+        def call(self, cmd, *args, **kwargs):
+            self.called.append(cmd)
+            return {'stdout': [
+                '/etc/yum.repos.d/rhui-client.repo\trh-amazon-rhui-client-3.0.40-1.el7.noarch',
+                '/etc/pki/rhui/ca.crt\trh-amazon-rhui-client-3.0.40-1.el7.noarch',
+                '/etc/yum.repos.d/redhat.repo\tsubscription-manager-1.24.45-1.el7.x86_64',
+                'file /etc/yum.repos.d/custom.repo is not owned by any package',
+            ]}
+
+    repos_dir = tmpdir.mkdir('etc').mkdir('yum.repos.d')
+    for fname in ('rhui-client.repo', 'redhat.repo', 'custom.repo'):
+        repos_dir.join(fname).write('')
+    monkeypatch.setattr(userspacegen.api, 'current_logger', logger_mocked())
+
+    context = MockedContext()
+    assert userspacegen._get_files_owned_by_rpms(context, '/etc/yum.repos.d') == ['redhat.repo', 'rhui-client.repo']
+    assert userspacegen._get_files_owned_by_rpms(
+        context, '/etc/yum.repos.d', ['rh-amazon-rhui-client']) == ['rhui-client.repo']
+    # all the files are queried by a single rpm call
+    assert len(context.called) == 2
+    assert context.called[0][-3:] == [
+        '/etc/yum.repos.d/custom.repo', '/etc/yum.repos.d/redhat.repo', '/etc/yum.repos.d/rhui-client.repo'
+    ]
+
+
+def _rpm_query_files(queryformat, pkgs):
+    """
+    Emulate the output of rpm -qf with the queryformat iterating over the files of the given packages
+
+    :param pkgs: List of tuples (NVRA, list of files)
+    """
+    array_format = re.match(r'^\[(.*)\]$', queryformat).group(1)
+    tags = re.findall(r'%{(=?)([A-Z]+)}', array_format)
+    stdout = []
+    for nvra, files in pkgs:
+        name, version, release_arch = nvra.rsplit('-', 2)
+        release, arch = release_arch.rsplit('.', 1)
+        values = {'FILENAMES': files, 'NAME': name, 'VERSION': version, 'RELEASE': release, 'ARCH': arch}
+        # Only the tags prefixed by '=' can be used with arrays of a different size
+        if len(files) > 1 and any(not prefix and tag != 'FILENAMES' for prefix, tag in tags):
+            return {'stdout': [], 'stderr': 'error: array iterator used with different sized arrays'}
+        for index, path in enumerate(files):
+            line = array_format.replace(r'\t', '\t').replace(r'\n', '')
+            for prefix, tag in tags:
+                value = values[tag][index] if tag == 'FILENAMES' else values[tag]
+                line = line.replace('%{{{}{}}}'.format(prefix, tag), value)
+            stdout.append(line)
+    return {'stdout': stdout, 'stderr': ''}
+
+
+def test_get_files_owners_multiple_files():
+    class MockedContext(object):
+        def call(self, cmd, *args, **kwargs):
+            return _rpm_query_files(cmd[cmd.index('--queryformat') + 1], [
+                ('redhat-release-8.6-0.1.el8.x86_64', ['/etc/os-release', '/etc/yum.repos.d/redhat.repo']),
+                ('rh-amazon-rhui-client-3.0.40-1.el8.noarch', ['/etc/pki/rhui/ca.crt', '/etc/yum.repos.d/rhui.repo']),
+            ])
+
+    owners = userspacegen._get_files_owners(
+        MockedContext(), ['/etc/yum.repos.d/redhat.repo', '/etc/yum.repos.d/rhui.repo', '/etc/yum.repos.d/custom.repo']
+    )
+    assert owners == {
+        '/etc/yum.repos.d/redhat.repo': ['redhat-release-8.6-0.1.el8.x86_64'],
+        '/etc/yum.repos.d/rhui.repo': ['rh-amazon-rhui-client-3.0.40-1.el8.noarch'],
+    }
+
+
+@pytest.mark.parametrize('reuse_enabled', (True, False))
+def test_prepare_target_userspace_reuse(monkeypatch, tmpdir, reuse_enabled):
+    class MockedContext(object):
+        base_dir = tmpdir.mkdir('overlay').strpath
+
+        def full_path(self, path):
+            return os.path.join(self.base_dir, path.lstrip('/'))
+
+    dnf_calls = []
+    envars = {'LEAPP_REUSE_TARGET_USERSPACE': '1'} if reuse_enabled else {}
+    monkeypatch.setattr(userspacegen.api, 'current_actor', CurrentActorMocked(envars=envars))
+    monkeypatch.setattr(userspacegen.api, 'current_logger', logger_mocked())
+    monkeypatch.setattr(userspacegen, 'get_target_major_version', lambda: '8')
+    monkeypatch.setattr(userspacegen, 'run', lambda cmd: None)
+    monkeypatch.setattr(userspacegen.mounting, 'BindMount', MockedMountingBase)
+    monkeypatch.setattr(userspacegen, '_call_userspace_dnf',
+                        lambda context, cmd, repos, pkgs: dnf_calls.append((cmd, pkgs)))
+    installed = ['dnf-0:4.7.0-4.el8.noarch']
+    monkeypatch.setattr(userspacegen, '_get_installed_packages', lambda userspace_dir: list(installed))
+
+    userspace_dir = tmpdir.mkdir('userspace').strpath
+    context = MockedContext()
+    userspacegen.prepare_target_userspace(context, userspace_dir, ['repo'], ['dnf', 'pkg'])
+    assert dnf_calls == [('install', ['dnf', 'pkg'])]
+
+    del dnf_calls[:]
+    userspacegen.prepare_target_userspace(context, userspace_dir, ['repo'], ['dnf', 'pkg', 'new-pkg'])
+    if reuse_enabled:
+        assert dnf_calls == [('upgrade', []), ('install', ['dnf', 'pkg', 'new-pkg'])]
+    else:
+        assert dnf_calls == [('install', ['dnf', 'pkg', 'new-pkg'])]
+
+    # The userspace has to be created again when the inputs change
+    del dnf_calls[:]
+    userspacegen.prepare_target_userspace(context, userspace_dir, ['another-repo'], ['dnf', 'pkg', 'new-pkg'])
+    assert dnf_calls == [('install', ['dnf', 'pkg', 'new-pkg'])]
+
+    # The userspace has to be created again when packages are installed into it later, e.g. by other actors
+    installed.append('dracut-network-0:049-191.git20210920.el8.x86_64')
+    del dnf_calls[:]
+    userspacegen.prepare_target_userspace(context, userspace_dir, ['another-repo'], ['dnf', 'pkg', 'new-pkg'])
+    assert dnf_calls == [('install', ['dnf', 'pkg', 'new-pkg'])]
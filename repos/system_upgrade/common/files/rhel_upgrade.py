@@ -97,6 +97,29 @@ class RhelUpgradeCommand(dnf.cli.Command):
             raise dnf.exceptions.RepoError("RHUI repository %s does not have an url" % repo.name)
         return repo
 
+    def _save_space_estimates(self):
+        """
+        Store the estimates of the space the transaction needs on the mountpoints (in MiB) to the plugin data
+
+        The install size of every package is split among the mountpoints by the number of its files placed there.
+        """
+        disk_space = self.plugin_data.get('disk_space')
+        if not disk_space:
+            return
+        # Sorted from the longest path, so every file is counted for the most nested mountpoint
+        mountpoints = sorted(disk_space['mountpoints'], key=len, reverse=True)
+        estimates = dict.fromkeys(mountpoints, 0)
+        for pkg in self.base.transaction.install_set:
+            files = pkg.files or ['/']
+            for path in files:
+                for mountpoint in mountpoints:
+                    if path == mountpoint or path.startswith(mountpoint.rstrip('/') + '/'):
+                        estimates[mountpoint] += pkg.installsize / len(files)
+                        break
+        disk_space['estimates'] = {mp: int(size // (1024 * 1024)) + 1 for mp, size in estimates.items()}
+        with open(self.opts.filename, 'w+') as fo:
+            json.dump(self.plugin_data, fo, sort_keys=True, indent=2)
+
     def pre_configure(self):
         with open(self.opts.filename) as fo:
             self.plugin_data = json.load(fo)
@@ -205,6 +228,7 @@ class RhelUpgradeCommand(dnf.cli.Command):
                 print('Transaction check: ', file=sys.stderr)
                 print(str(e), file=sys.stderr)
                 raise
+            self._save_space_estimates()
 
             # We are doing this to avoid downloading the packages in the check phase
             self.base.download_packages = _do_not_download_packages
@@ -5,7 +5,7 @@ import os
 import shutil
 
 from leapp.exceptions import StopActorExecutionError
-from leapp.libraries.common import dnfconfig, guards, mounting, overlaygen, rhsm, utils
+from leapp.libraries.common import dnfconfig, guards, mounting, overlaygen, pkgcache, rhsm, utils
 from leapp.libraries.common.config.version import get_target_major_version, get_target_version
 from leapp.libraries.stdlib import api, CalledProcessError, config
 from leapp.models import DNFWorkaround
@@ -74,9 +74,11 @@ def _rebuild_rpm_db(context, root=None):
     context.call(cmd)
 
 
-def build_plugin_data(target_repoids, debug, test, tasks, on_aws):
+def build_plugin_data(target_repoids, debug, test, tasks, on_aws, mountpoints=()):
     """
     Generates a dictionary with the DNF plugin data.
+
+    The plugin estimates the space the transaction needs on the given mountpoints (see get_space_estimates).
     """
     # get list of repo IDs of target repositories that should be used for upgrade
     data = {
@@ -104,23 +106,47 @@ def build_plugin_data(target_repoids, debug, test, tasks, on_aws):
               'on_aws': on_aws,
               'region': None,
             }
+        },
+        'disk_space': {
+            'mountpoints': list(mountpoints),
         }
     }
     return data
 
 
-def create_config(context, target_repoids, debug, test, tasks, on_aws=False):
+def create_config(context, target_repoids, debug, test, tasks, on_aws=False, mountpoints=()):
     """
     Creates the configuration data file for our DNF plugin.
     """
     context.makedirs(os.path.dirname(DNF_PLUGIN_DATA_PATH), exists_ok=True)
     with context.open(DNF_PLUGIN_DATA_PATH, 'w+') as f:
         config_data = build_plugin_data(
-            target_repoids=target_repoids, debug=debug, test=test, tasks=tasks, on_aws=on_aws
+            target_repoids=target_repoids, debug=debug, test=test, tasks=tasks, on_aws=on_aws,
+            mountpoints=mountpoints
         )
         json.dump(config_data, f, sort_keys=True, indent=2)
 
 
+def get_space_estimates(context):
+    """
+    Get the estimates of the space the DNF transaction needs on the mountpoints.
+
+    The estimates are stored into the plugin data by the check stage of the plugin.
+
+    :returns: Dictionary mapping the mountpoints to the needed space in MiB, empty if it is not available
+    """
+    try:
+        with context.open(DNF_PLUGIN_DATA_PATH) as f:
+            return json.load(f).get('disk_space', {}).get('estimates', {})
+    except (IOError, OSError, ValueError) as e:
+        api.current_logger().warning('Cannot read the space estimates of the DNF transaction: {}'.format(str(e)))
+        return {}
+
+
+def _get_mountpoints(storage_info):
+    return sorted({entry.fs_file for entry in storage_info.fstab if os.path.isdir(entry.fs_file)})
+
+
 def backup_config(context):
     """
     Backs up the configuration data used for the plugin.
@@ -141,7 +167,8 @@ def backup_debug_data(context):
             api.current_logger().warning('Failed to copy debugdata. Message: {}'.format(str(e)), exc_info=True)
 
 
-def _transaction(context, stage, target_repoids, tasks, plugin_info, test=False, cmd_prefix=None, on_aws=False):
+def _transaction(context, stage, target_repoids, tasks, plugin_info, test=False, cmd_prefix=None, on_aws=False,
+                 mountpoints=()):
     """
     Perform the actual DNF rpm download via our DNF plugin
     """
@@ -153,7 +180,8 @@ def _transaction(context, stage, target_repoids, tasks, plugin_info, test=False,
             target_repoids=target_repoids,
             debug=config.is_debug(),
             test=test, tasks=tasks,
-            on_aws=on_aws
+            on_aws=on_aws,
+            mountpoints=mountpoints
         )
     backup_config(context=context)
 
@@ -361,22 +389,33 @@ def perform_transaction_check(target_userspace_info, used_repos, tasks, xfs_info
         apply_workarounds(overlay.nspawn())
         dnfconfig.exclude_leapp_rpms(context)
         _transaction(
-            context=context, stage='check', target_repoids=target_repoids, plugin_info=plugin_info, tasks=tasks
+            context=context, stage='check', target_repoids=target_repoids, plugin_info=plugin_info, tasks=tasks,
+            mountpoints=_get_mountpoints(storage_info)
         )
+        # The disk images of the following overlays are sized by the estimates
+        overlaygen.store_space_estimates(target_userspace_info.scratch, get_space_estimates(context))
 
 
 def perform_rpm_download(target_userspace_info, used_repos, tasks, xfs_info, storage_info, plugin_info, on_aws=False):
     """
     Perform RPM download including the transaction test using dnf with our plugin
+
+    Packages stored in the package cache are not downloaded again and the downloaded packages are stored
+    there, even when the transaction test fails, so they are not downloaded again in the next run.
     """
     with _prepare_perform(used_repos=used_repos, target_userspace_info=target_userspace_info, xfs_info=xfs_info,
                           storage_info=storage_info) as (context, overlay, target_repoids):
         apply_workarounds(overlay.nspawn())
         dnfconfig.exclude_leapp_rpms(context)
-        _transaction(
-            context=context, stage='download', target_repoids=target_repoids, plugin_info=plugin_info, tasks=tasks,
-            test=True, on_aws=on_aws
-        )
+        dnf_cache_dir = context.full_path('/var/cache/dnf')
+        pkgcache.restore_packages(dnf_cache_dir)
+        try:
+            _transaction(
+                context=context, stage='download', target_repoids=target_repoids, plugin_info=plugin_info,
+                tasks=tasks, test=True, on_aws=on_aws
+            )
+        finally:
+            pkgcache.store_packages(dnf_cache_dir)
 
 
 def perform_dry_run(target_userspace_info, used_repos, tasks, xfs_info, storage_info, plugin_info, on_aws=False):
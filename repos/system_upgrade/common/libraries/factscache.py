@@ -0,0 +1,197 @@
+import hashlib
+import json
+import os
+import sys
+import types
+import warnings
+
+from leapp import models
+from leapp.libraries.common.config import get_env
+from leapp.libraries.stdlib import api
+
+try:
+    import rpm
+except ImportError:
+    rpm = None
+    warnings.warn('Could not import the `rpm` python module.', ImportWarning)
+
+FACTS_CACHE_DIR = '/var/lib/leapp/facts-cache'
+RPMDB_DIR = '/var/lib/rpm'
+_FACTS_CACHE_FORMAT = 1
+
+
+def is_enabled():
+    """
+    Return True if the persistent facts cache is enabled.
+
+    The facts cache is opt-in - it is enabled when the LEAPP_DEVEL_USE_FACTS_CACHE environment variable is set to '1'.
+    """
+    return get_env('LEAPP_DEVEL_USE_FACTS_CACHE', '0') == '1'
+
+
+def get_file_fingerprint(path):
+    """
+    Get the fingerprint of the file identified by its modification time and size.
+
+    Suitable for regular files. Use get_content_fingerprint for /proc entries, which do not have meaningful
+    modification times.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ['file', path, None]
+    return ['file', path, stat.st_mtime, stat.st_size]
+
+
+def get_dir_fingerprint(path):
+    """Get the fingerprint of the directory including the fingerprints of files inside (not recursive)."""
+    try:
+        names = sorted(os.listdir(path))
+    except OSError:
+        return ['dir', path, None]
+    return ['dir', path, [get_file_fingerprint(os.path.join(path, name)) for name in names]]
+
+
+def get_content_fingerprint(path):
+    """Get the fingerprint of the file identified by its content, e.g. for the /proc entries."""
+    try:
+        with open(path, 'rb') as f:
+            return ['content', path, hashlib.sha256(f.read()).hexdigest()]
+    except (IOError, OSError):
+        return ['content', path, None]
+
+
+def get_rpmdb_fingerprint():
+    """
+    Get the fingerprint of the RPM database.
+
+    The cookie of the RPM database is used when provided by rpm, otherwise the files of the database are checked.
+    """
+    if rpm is not None and hasattr(rpm.TransactionSet, 'dbCookie'):
+        try:
+            return ['rpmdb', rpm.TransactionSet().dbCookie()]
+        except rpm.error:
+            pass
+    return ['rpmdb', get_dir_fingerprint(RPMDB_DIR)]
+
+
+def _get_source_digest(module_name):
+    """Get the digest of the source code of the given module, so stored data are dropped when the code changes."""
+    try:
+        with open(sys.modules[module_name].__file__, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except (AttributeError, KeyError, IOError, OSError):
+        return None
+
+
+def _get_used_libraries(module_name):
+    """
+    Get names of the leapp libraries used by the given module, including the module itself.
+
+    The libraries are looked up recursively by the modules, functions and classes imported into the modules.
+    """
+    found = set()
+    pending = [module_name]
+    while pending:
+        name = pending.pop()
+        if name in found or name not in sys.modules:
+            continue
+        found.add(name)
+        for value in vars(sys.modules[name]).values():
+            if isinstance(value, types.ModuleType):
+                used_name = value.__name__
+            else:
+                used_name = getattr(value, '__module__', None)
+            if isinstance(used_name, str) and used_name.startswith('leapp.libraries.'):
+                pending.append(used_name)
+    return sorted(found)
+
+
+def _get_cache_path(name):
+    return os.path.join(FACTS_CACHE_DIR, '{}.json'.format(name))
+
+
+def _get_cache_key(name, inputs, collect):
+    # NOTE: the collected data depend on the code of the common libraries used by the scanner as well,
+    # e.g. rpms or module for rpmscanner
+    used_libraries = _get_used_libraries(collect.__module__)
+    sources = [[module_name, _get_source_digest(module_name)] for module_name in used_libraries]
+    key_data = [_FACTS_CACHE_FORMAT, name, sources, inputs]
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _load_cached_messages(name, key):
+    """
+    Load the messages stored for the scanner by the previous run.
+
+    :returns: List of messages or None if nothing valid is stored for the given key.
+    """
+    try:
+        with open(_get_cache_path(name)) as f:
+            data = json.load(f)
+        if data['key'] != key:
+            return None
+        return [getattr(models, msg['model']).create(msg['data']) for msg in data['messages']]
+    except (IOError, OSError):
+        return None
+    except (ValueError, KeyError, TypeError, AttributeError) as err:
+        api.current_logger().debug('Ignoring invalid facts cache of {}: {}'.format(name, str(err)))
+        return None
+
+
+def _store_messages(name, key, messages):
+    data = {
+        'key': key,
+        'messages': [{'model': type(msg).__name__, 'data': msg.dump()} for msg in messages],
+    }
+    path = _get_cache_path(name)
+    tmp_path = '{}.tmp'.format(path)
+    try:
+        if not os.path.isdir(FACTS_CACHE_DIR):
+            os.makedirs(FACTS_CACHE_DIR)
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.rename(tmp_path, path)
+    except (IOError, OSError) as err:
+        api.current_logger().warning('Could not store the facts cache of {}: {}'.format(name, str(err)))
+
+
+def collect_cached(name, get_inputs, collect):
+    """
+    Get the messages collected by the scanner, reusing the messages of the previous run if possible.
+
+    When the facts cache is disabled, the messages returned by collect() are just returned. Otherwise the messages
+    are stored together with the fingerprint of the inputs of the scanner and when the fingerprint is unchanged
+    in the next leapp run, the stored messages are returned instead of scanning the system again. That is handy
+    e.g. when the preupgrade is executed repeatedly while fixing inhibitors.
+
+    Note that only the returned messages are cached, so reports and other messages produced directly by collect()
+    are not produced at all when the stored messages are reused.
+
+    :param name: Unique name of the cached data, e.g. the name of the actor
+    :param get_inputs: Function returning a JSON serializable fingerprint of all the inputs of the scanner,
+                       e.g. a list of values returned by the get_*_fingerprint functions.
+    :param collect: Function returning the list of messages. The source code of the module defining the function
+                    and of the leapp libraries used by the module is part of the fingerprint as well.
+    """
+    if not is_enabled():
+        return collect()
+
+    key = _get_cache_key(name, get_inputs(), collect)
+    messages = _load_cached_messages(name, key)
+    if messages is None:
+        messages = collect()
+        _store_messages(name, key, messages)
+    else:
+        api.current_logger().info('Inputs of {} have not changed, reusing the facts of the previous run.'.format(name))
+    return messages
+
+
+def produce_cached(name, get_inputs, collect):
+    """
+    Produce the messages collected by the scanner, reusing the messages of the previous run if possible.
+
+    See collect_cached for details.
+    """
+    for msg in collect_cached(name, get_inputs, collect):
+        api.produce(msg)
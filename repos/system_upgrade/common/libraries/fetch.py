@@ -80,6 +80,51 @@ def read_or_fetch(filename, directory="/etc/leapp/files", service=None, allow_em
         except Exception as e:
             raise e
 
+    return _fetch(filename, local_path, service=service, allow_empty=allow_empty, encoding=encoding)
+
+
+def open_or_fetch(filename, directory="/etc/leapp/files", service=None, allow_empty=False, encoding='utf-8'):
+    """
+    Open a text file or fetch its contents from an online service if the file does not exist.
+
+    Unlike read_or_fetch, the contents of a local file are not read into memory at once, so the caller
+    can process large files incrementally.
+
+    :param str filename: The name of the file to open or fetch.
+    :param str directory: Directory that should contain the file.
+    :param str service: URL to the service providing the data if the file is missing.
+    :param bool allow_empty: Raise an error if the resulting data are empty.
+    :param str encoding: Encoding to use when decoding the raw binary data.
+    :returns: Text file object providing the contents of the file. The caller is responsible for closing it.
+    """
+    logger = api.current_logger()
+    local_path = os.path.join(directory, filename)
+
+    # try to get the data locally
+    if not os.path.exists(local_path):
+        logger.warning("File {lp} does not exist, falling back to online service".format(lp=local_path))
+    else:
+        try:
+            size = os.path.getsize(local_path)
+            if not allow_empty and not size:
+                _raise_error(local_path, "File {lp} exists but is empty".format(lp=local_path))
+            f = io.open(local_path, encoding=encoding)
+            logger.warning("File {lp} successfully opened ({l} bytes)".format(lp=local_path, l=size))
+            return f
+        except EnvironmentError:
+            _raise_error(local_path, "File {lp} exists but couldn't be read".format(lp=local_path))
+
+    return io.StringIO(_fetch(filename, local_path, service=service, allow_empty=allow_empty, encoding=encoding))
+
+
+def _fetch(filename, local_path, service=None, allow_empty=False, encoding='utf-8'):
+    """
+    Fetch the contents of a text file from an online service.
+
+    :returns: Text contents of the file. Text is decoded using the provided encoding.
+    """
+    logger = api.current_logger()
+
     # if the data is not present locally, fetch it from the online service
     service = service or get_env("LEAPP_SERVICE_HOST", default=SERVICE_HOST_DEFAULT)
     service_path = "{s}/api/pes/{f}".format(s=service, f=filename)
@@ -0,0 +1,150 @@
+import json
+import re
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _JSONStreamReader(object):
+    """
+    Read JSON values from a text file object without loading the whole file into memory.
+
+    Only the part of the file needed to decode the currently processed value is kept in the buffer.
+    """
+
+    def __init__(self, fp, chunk_size):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def _read_more(self, size=None):
+        """
+        Append the next chunk of the file to the buffer, dropping the already processed data.
+
+        :returns: False if there are no more data to read, True otherwise.
+        """
+        if self._eof:
+            return False
+
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+
+        chunk = self._fp.read(size or self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer += chunk
+        return True
+
+    def error(self, msg):
+        return ValueError('{0}: near "{1}"'.format(msg, self._buffer[self._pos:self._pos + 20]))
+
+    def peek(self):
+        """
+        Skip whitespace and return the next character without consuming it.
+
+        :returns: The next character or an empty string if the end of the file has been reached.
+        """
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read_more():
+                return ''
+
+    def consume(self, expected_chars):
+        """
+        Skip whitespace and consume the next character, which has to be one of the expected characters.
+
+        :returns: The consumed character.
+        """
+        char = self.peek()
+        if not char or char not in expected_chars:
+            raise self.error('Expecting one of {0}'.format(', '.join(repr(c) for c in expected_chars)))
+        self._pos += 1
+        return char
+
+    def decode_value(self):
+        """Skip whitespace and decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except ValueError:
+                # The value might just not be complete yet - read more data (at least as much as we already have,
+                # so decoding of large values does not take quadratic time) and try again
+                if self._read_more(max(self._chunk_size, len(self._buffer))):
+                    continue
+                raise
+
+            if end == len(self._buffer) and self._read_more():
+                # A value ending exactly at the end of the buffer, such as a number, might continue in the next chunk
+                continue
+
+            self._pos = end
+            return value
+
+
+def _iter_array_items(reader):
+    reader.consume('[')
+    if reader.peek() == ']':
+        reader.consume(']')
+        return
+
+    while True:
+        yield reader.decode_value()
+        if reader.consume(',]') == ']':
+            return
+
+
+def _iter_object_members(reader, streamed_keys):
+    if reader.peek() == '}':
+        reader.consume('}')
+    else:
+        while True:
+            if reader.peek() != '"':
+                raise reader.error('Expecting property name enclosed in double quotes')
+            key = reader.decode_value()
+            reader.consume(':')
+
+            if key in streamed_keys:
+                if reader.peek() != '[':
+                    raise reader.error('Expecting an array as the value of "{0}"'.format(key))
+                items = _iter_array_items(reader)
+                yield key, items
+                # Skip the items the caller did not consume, so we can continue with the next member
+                for dummy_item in items:
+                    pass
+            else:
+                yield key, reader.decode_value()
+
+            if reader.consume(',}') == '}':
+                break
+
+    if reader.peek():
+        raise reader.error('Extra data')
+
+
+def iter_object_members(fp, streamed_keys=(), chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Iterate over the members of the JSON object stored in the given file, decoding them incrementally.
+
+    Values of the members are decoded one by one, so only a single member has to be kept in memory at a time.
+    Values of the members listed in streamed_keys have to be arrays - instead of decoding the whole array, an iterator
+    yielding the items of the array one by one is provided. Such an iterator has to be consumed before continuing with
+    the next member - the items left unconsumed are skipped.
+
+    :param fp: A text file object containing a JSON object.
+    :param streamed_keys: Keys of the members with array values that should be streamed.
+    :param chunk_size: Number of characters to read from the file at once.
+    :returns: Iterator over (key, value) pairs of the object members.
+    :raises ValueError: If the file does not contain a valid JSON object. The error is raised immediately in case
+                        the file does not start with a JSON object, otherwise it is raised during the iteration.
+    """
+    reader = _JSONStreamReader(fp, chunk_size)
+    reader.consume('{')
+    return _iter_object_members(reader, frozenset(streamed_keys))
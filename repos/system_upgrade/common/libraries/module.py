@@ -16,33 +16,80 @@ except ImportError:
     warnings.warn('Could not import the `hawkey` python module.', ImportWarning)
 
 
-def _create_or_get_dnf_base(base=None):
-    if not base:
-        # The DNF command reads /etc/yum/vars/releasever, but the DNF library does not. It parses redhat-release
-        # package to retrieve system's major version which it then uses as $releasever. However, some systems might
-        # have repositories only for the exact system version (including the minor number). In a case when
-        # /etc/yum/vars/releasever is present, read its contents so that we can access repositores on such systems.
-        conf = dnf.conf.Conf()
-        pkg_manager = 'yum' if get_source_major_version() == '7' else 'dnf'
-        releasever_path = '/etc/{0}/vars/releasever'.format(pkg_manager)
-        if os.path.exists(releasever_path):
-            with open(releasever_path) as releasever_file:
-                releasever = releasever_file.read().strip()
-                conf.substitutions['releasever'] = releasever
-        else:
-            conf.substitutions['releasever'] = get_source_major_version()
-
-        base = dnf.Base(conf=conf)
-        base.init_plugins()
-        base.read_all_repos()
-        # configure plugins after the repositories are loaded
-        # e.g. the amazon-id plugin requires loaded repositories
-        # for the proper configuration.
-        base.configure_plugins()
-        base.fill_sack()
+def _create_dnf_base():
+    # The DNF command reads /etc/yum/vars/releasever, but the DNF library does not. It parses redhat-release
+    # package to retrieve system's major version which it then uses as $releasever. However, some systems might
+    # have repositories only for the exact system version (including the minor number). In a case when
+    # /etc/yum/vars/releasever is present, read its contents so that we can access repositores on such systems.
+    conf = dnf.conf.Conf()
+    pkg_manager = 'yum' if get_source_major_version() == '7' else 'dnf'
+    releasever_path = '/etc/{0}/vars/releasever'.format(pkg_manager)
+    if os.path.exists(releasever_path):
+        with open(releasever_path) as releasever_file:
+            releasever = releasever_file.read().strip()
+            conf.substitutions['releasever'] = releasever
+    else:
+        conf.substitutions['releasever'] = get_source_major_version()
+
+    base = dnf.Base(conf=conf)
+    base.init_plugins()
+    base.read_all_repos()
+    # configure plugins after the repositories are loaded
+    # e.g. the amazon-id plugin requires loaded repositories
+    # for the proper configuration.
+    base.configure_plugins()
+    base.fill_sack()
     return base
 
 
+class _DNFBaseProvider(object):
+    """
+    Lazily created DNF base shared by all its users within the current process.
+
+    Loading of the repository metadata when filling the sack is expensive, so it should be done just once.
+    """
+
+    def __init__(self):
+        self._base = None
+
+    def get(self):
+        if self._base is None:
+            self._base = _create_dnf_base()
+        return self._base
+
+    def invalidate(self):
+        if self._base is not None:
+            self._base.close()
+        self._base = None
+
+
+_dnf_base_provider = _DNFBaseProvider()
+
+
+def get_dnf_base():
+    """
+    Return the DNF base with the filled sack shared within the current process.
+
+    The base is created on the first call, with plugins loaded and all system repositories enabled. Its sack
+    contains both the installed and the available packages.
+
+    Do not modify the returned base (e.g. by resolving a transaction) and call invalidate_dnf_base() when
+    the system repositories or installed packages change.
+    """
+    return _dnf_base_provider.get()
+
+
+def invalidate_dnf_base():
+    """
+    Drop the shared DNF base, so the next call of get_dnf_base() creates a new one.
+    """
+    _dnf_base_provider.invalidate()
+
+
+def _create_or_get_dnf_base(base=None):
+    return base or get_dnf_base()
+
+
 def get_modules(base=None):
     """
     Return info about all module streams as a list of libdnf.module.ModulePackage objects.
@@ -1,8 +1,10 @@
 import errno
+import fcntl
 import itertools
 import os
 import shutil
 from collections import namedtuple
+from multiprocessing.pool import ThreadPool
 
 from leapp.libraries.stdlib import run, CalledProcessError, api
 from leapp.libraries.common.config import get_all_envs
@@ -16,6 +18,11 @@ ALWAYS_BIND = []
 
 ErrorData = namedtuple('ErrorData', ['summary', 'details'])
 
+# ioctl request cloning the content of a file on filesystems supporting reflinks (e.g. XFS, btrfs)
+FICLONE = 0x40049409
+COPY_BUFSIZE = 1024 * 1024
+COPY_WORKERS = 4
+
 
 class MountingMode(object):
     """
@@ -42,6 +49,95 @@ def _makedirs(path, mode=0o777, exists_ok=True):
             raise
 
 
+def _copy_file_content(fsrc, fdst):
+    """
+    Copy the content of the file without passing the data through the user space if possible.
+
+    The content is cloned by a reflink if supported by the filesystem, otherwise copied in kernel
+    by copy_file_range (when available) and by a buffered copy as the last resort.
+    """
+    try:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return
+    except (IOError, OSError):
+        pass
+
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while os.copy_file_range(fsrc.fileno(), fdst.fileno(), COPY_BUFSIZE * 64):
+                pass
+            return
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+            # nothing has been copied in case of these errors
+    shutil.copyfileobj(fsrc, fdst, COPY_BUFSIZE)
+
+
+def _copy_file(src, dst):
+    """ Copy the file including its metadata, in the same way as shutil.copy2 does """
+    with open(src, 'rb') as fsrc:
+        with open(dst, 'wb') as fdst:
+            _copy_file_content(fsrc, fdst)
+    shutil.copystat(src, dst)
+
+
+def _copy_files(files):
+    """ Copy the given (src, dst) pairs of files, in parallel if there are more of them """
+    if len(files) < 2:
+        for src, dst in files:
+            _copy_file(src, dst)
+        return
+
+    pool = ThreadPool(COPY_WORKERS)
+    try:
+        pool.map(lambda paths: _copy_file(*paths), files)
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _copytree(src, dst):
+    """
+    Recursively copy the directory tree as shutil.copytree does (symlinks are followed).
+
+    The destination directory must not exist; it is created as well as missing parent directories.
+    File contents are cloned by reflinks when the filesystem supports it, otherwise
+    the files are copied in parallel.
+    """
+    files = []
+    dirs = []
+    for root, dummy_dirnames, filenames in os.walk(src, followlinks=True):
+        dst_root = dst if root == src else os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(dst_root)
+        dirs.append((root, dst_root))
+        files.extend((os.path.join(root, fname), os.path.join(dst_root, fname)) for fname in filenames)
+
+    _copy_files(files)
+    # copy the metadata of directories after their content has been created
+    for src_dir, dst_dir in reversed(dirs):
+        shutil.copystat(src_dir, dst_dir)
+
+
+def _movetree(src, dst):
+    """
+    Move the directory tree rooted at src to dst.
+
+    The destination directory must not exist; missing parent directories are created. The tree is just
+    renamed when both directories are on the same filesystem, otherwise it is copied and removed.
+    """
+    if os.path.lexists(dst):
+        raise OSError(errno.EEXIST, os.strerror(errno.EEXIST), dst)
+    _makedirs(os.path.dirname(dst.rstrip('/')))
+    try:
+        os.rename(src, dst)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        _copytree(src, dst)
+        shutil.rmtree(src)
+
+
 class MountError(Exception):
     """ Exception that is thrown when a mount related operation failed """
 
@@ -208,7 +304,7 @@ class IsolatedActions(object):
         The destination directory is considered to be in the isolated environment.
         The source directory is considered to be on the current system root.
         """
-        shutil.copytree(src, self.full_path(dst))
+        _copytree(src, self.full_path(dst))
 
     def copytree_from(self, src, dst):
         """
@@ -218,7 +314,31 @@ class IsolatedActions(object):
         The destination directory is considered to be on the current system root.
         The source directory is considered to be in the isolated environment.
         """
-        shutil.copytree(self.full_path(src), dst)
+        _copytree(self.full_path(src), dst)
+
+    def movetree_to(self, src, dst):
+        """
+        Move an entire directory tree rooted at src. The destination directory, named by dst,
+        must not already exist; missing parent directories will be created.
+
+        The tree is just renamed when possible, so moving is cheap on the same filesystem.
+
+        The destination directory is considered to be in the isolated environment.
+        The source directory is considered to be on the current system root.
+        """
+        _movetree(src, self.full_path(dst))
+
+    def movetree_from(self, src, dst):
+        """
+        Move an entire directory tree rooted at src. The destination directory, named by dst,
+        must not already exist; missing parent directories will be created.
+
+        The tree is just renamed when possible, so moving is cheap on the same filesystem.
+
+        The destination directory is considered to be on the current system root.
+        The source directory is considered to be in the isolated environment.
+        """
+        _movetree(self.full_path(src), dst)
 
     def copy_to(self, src, dst):
         """
@@ -1,14 +1,20 @@
 import contextlib
+import json
 import os
 import shutil
 from collections import namedtuple
+from multiprocessing.pool import ThreadPool
 
 from leapp.exceptions import StopActorExecutionError
-from leapp.libraries.common import mounting, utils
+from leapp.libraries.common import mounting, pkgcache, utils
 from leapp.libraries.stdlib import CalledProcessError, api, run
 
 
 OVERLAY_DO_NOT_MOUNT = ('tmpfs', 'devpts', 'sysfs', 'proc', 'cramfs', 'sysv', 'vfat')
+DISK_IMAGE_WORKERS = 4
+SPACE_ESTIMATES_FILE = 'diskimages-space-estimates.json'
+# Space added to the estimate for the filesystem metadata and files copied up to the overlay (e.g. the RPM DB), MiB
+DISK_IMAGE_RESERVE = 256
 
 
 MountPoints = namedtuple('MountPoints', ['fs_file', 'fs_vfstype'])
@@ -53,13 +59,11 @@ def _prepare_required_mounts(scratch_dir, mounts_dir, mount_points, xfs_info):
     if not xfs_info.mountpoints_without_ftype:
         return result
 
-    space_needed = _overlay_disk_size() * len(xfs_info.mountpoints_without_ftype)
     disk_images_directory = os.path.join(scratch_dir, 'diskimages')
 
     # Ensure we cleanup old disk images before we check for space contraints.
     run(['rm', '-rf', disk_images_directory])
     _create_diskimages_dir(scratch_dir, disk_images_directory)
-    _ensure_enough_diskimage_space(space_needed, scratch_dir)
 
     mount_names = [mount_point.fs_file for mount_point in mount_points]
 
@@ -72,29 +76,97 @@ def _prepare_required_mounts(scratch_dir, mounts_dir, mount_points, xfs_info):
     # it could fit for now until we provide the complete solution around XFS
     # workarounds (including management of required spaces for virtual FSs per
     # mountpoints - without that, we cannot fix this properly)
-    for mountpoint in set(xfs_info.mountpoints_without_ftype + ['/']):
-        if mountpoint in mount_names:
-            image = _create_mount_disk_image(disk_images_directory, mountpoint)
-            result[mountpoint] = mounting.LoopMount(source=image, target=_mount_dir(mounts_dir, mountpoint))
+    mountpoints = [mp for mp in set(xfs_info.mountpoints_without_ftype + ['/']) if mp in mount_names]
+    estimates = _load_space_estimates(scratch_dir)
+    sizes = {mp: _get_disk_image_size(estimates.get(mp)) for mp in mountpoints}
+    # The disk images are sparse, but their full size is reserved anyway, so the filesystems inside
+    # cannot run out of space in the scratch directory when the images are being filled.
+    # The same holds for the package cache, which can grow during the upgrade as well.
+    # Without the estimate, the image of / created just because of the hotfix above is not counted,
+    # the same as before the images were sized by the estimates.
+    reserved = [mp for mp in mountpoints if mp in estimates or mp in xfs_info.mountpoints_without_ftype]
+    space_needed = sum(sizes[mp] for mp in reserved) + pkgcache.get_space_to_reserve(scratch_dir)
+    _ensure_enough_diskimage_space(space_needed, scratch_dir)
+    images = _create_mount_disk_images(disk_images_directory, sizes)
+    for mountpoint, image in images.items():
+        result[mountpoint] = mounting.LoopMount(source=image, target=_mount_dir(mounts_dir, mountpoint))
     return result
 
 
+class _MountStack(object):
+    """
+    Stack of entered mounts, which are unmounted in the reverse order when the stack is closed
+
+    Used instead of nested with statements, so any number of mounts can be handled without recursion.
+    """
+
+    def __init__(self):
+        self._mounts = []
+
+    def enter(self, mount):
+        entered = mount.__enter__()
+        self._mounts.append(mount)
+        return entered
+
+    def close(self):
+        while self._mounts:
+            self._mounts.pop().__exit__(None, None, None)
+
+
 @contextlib.contextmanager
 def _build_overlay_mount(root_mount, mounts):
     if not root_mount:
         raise StopActorExecutionError('Root mount point has not been prepared for overlayfs.')
-    if not mounts:
+    stack = _MountStack()
+    try:
+        # Sorted, so the parent mountpoints are bind mounted before the nested ones
+        for current in sorted(mounts):
+            current_mount = stack.enter(mounts[current])
+            overlay = stack.enter(
+                mounting.OverlayMount(name=_mount_name(current), source=current, workdir=current_mount.target)
+            )
+            stack.enter(
+                mounting.BindMount(source=overlay.target, target=os.path.join(root_mount.target, current.lstrip('/')))
+            )
         yield root_mount
-    else:
-        current = list(mounts.keys())[0]
-        current_mount = mounts.pop(current)
-        name = _mount_name(current)
-        with current_mount:
-            with mounting.OverlayMount(name=name, source=current, workdir=current_mount.target) as overlay:
-                with mounting.BindMount(source=overlay.target,
-                                        target=os.path.join(root_mount.target, current.lstrip('/'))):
-                    with _build_overlay_mount(root_mount, mounts) as mount:
-                        yield mount
+    finally:
+        stack.close()
+
+
+def store_space_estimates(scratch_dir, estimates):
+    """
+    Store the estimates of the space the upgrade transaction needs on the mountpoints
+
+    The disk images of the overlays created later are sized by the estimates.
+
+    :param estimates: Dictionary mapping the mountpoints to the needed space in MiB
+    """
+    path = os.path.join(scratch_dir, SPACE_ESTIMATES_FILE)
+    try:
+        with open(path, 'w') as f:
+            json.dump(estimates, f)
+    except (IOError, OSError) as e:
+        api.current_logger().warning('Cannot store the space estimates to {}: {}'.format(path, str(e)))
+
+
+def _load_space_estimates(scratch_dir):
+    try:
+        with open(os.path.join(scratch_dir, SPACE_ESTIMATES_FILE)) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return {}
+
+
+def _get_disk_image_size(estimate):
+    """
+    Get the size of the disk image in MiB for a mountpoint with the given estimate of the needed space
+
+    Without the estimate (e.g. the transaction has not been calculated yet) or when the LEAPP_OVL_SIZE
+    environment variable is set, the size is given by LEAPP_OVL_SIZE.
+    """
+    if estimate is None or os.getenv('LEAPP_OVL_SIZE'):
+        return _overlay_disk_size()
+    return estimate + estimate // 4 + DISK_IMAGE_RESERVE
 
 
 def _overlay_disk_size():
@@ -129,19 +201,23 @@ def cleanup_scratch(scratch_dir, mounts_dir):
     api.current_logger().debug('Recursively removed scratch directory %s.', scratch_dir)
 
 
-def _create_mount_disk_image(disk_images_directory, path):
+def _create_mount_disk_image(disk_images_directory, path, disk_size):
     """
-    Creates the mount disk image, for cases when we hit XFS with ftype=0
+    Creates the mount disk image of the given size in MiB, for cases when we hit XFS with ftype=0
     """
     diskimage_path = os.path.join(disk_images_directory, _mount_name(path))
-    disk_size = _overlay_disk_size()
 
     api.current_logger().debug('Attempting to create disk image with size %d MiB at %s', disk_size, diskimage_path)
-    utils.call_with_failure_hint(
-        cmd=['/bin/dd', 'if=/dev/zero', 'of={}'.format(diskimage_path), 'bs=1M', 'count={}'.format(disk_size)],
-        hint='Please ensure that there is enough diskspace in {} at least {} MiB are needed'.format(
-            diskimage_path, disk_size)
-    )
+    # Create a sparse file, so only the blocks really written to the image take the disk space
+    try:
+        with open(diskimage_path, 'w') as f:
+            f.truncate(disk_size * 1024 * 1024)
+    except (IOError, OSError) as e:
+        raise StopActorExecutionError(
+            message='Failed to create the disk image {}: {}'.format(diskimage_path, str(e)),
+            details={'hint': 'Please ensure that there is enough diskspace in {} at least {} MiB are needed'.format(
+                diskimage_path, disk_size)}
+        )
 
     api.current_logger().debug('Creating ext4 filesystem in disk image at %s', diskimage_path)
     try:
@@ -155,6 +231,30 @@ def _create_mount_disk_image(disk_images_directory, path):
     return diskimage_path
 
 
+def _create_mount_disk_images(disk_images_directory, sizes):
+    """
+    Creates the mount disk images for the given mountpoints in parallel
+
+    :param sizes: Dict mapping the mountpoints to the sizes of their disk images in MiB
+    :returns: Dict mapping the mountpoints to the paths of their disk images
+    """
+    mountpoints = sorted(sizes)
+
+    def create(mountpoint):
+        return _create_mount_disk_image(disk_images_directory, mountpoint, sizes[mountpoint])
+
+    if len(mountpoints) < 2:
+        return {mountpoint: create(mountpoint) for mountpoint in mountpoints}
+
+    pool = ThreadPool(min(DISK_IMAGE_WORKERS, len(mountpoints)))
+    try:
+        images = pool.map(create, mountpoints)
+    finally:
+        pool.terminate()
+        pool.join()
+    return dict(zip(mountpoints, images))
+
+
 def _create_diskimages_dir(scratch_dir, diskimages_dir):
     """
     Prepares directories for disk images
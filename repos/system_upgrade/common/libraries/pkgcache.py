@@ -0,0 +1,299 @@
+import bz2
+import errno
+import gzip
+import hashlib
+import os
+import shutil
+import warnings
+import xml.etree.ElementTree as ElementTree
+
+from leapp.libraries.common import utils
+from leapp.libraries.common.config import get_env
+from leapp.libraries.stdlib import api
+
+try:
+    import lzma
+except ImportError:
+    lzma = None
+    warnings.warn('Could not import the `lzma` python module.', ImportWarning)
+
+PACKAGE_CACHE_DIR = '/var/lib/leapp/package-cache'
+DEFAULT_PACKAGE_CACHE_SIZE = 0  # MiB, disabled
+
+_REPO_NS = '{http://linux.duke.edu/metadata/repo}'
+_COMMON_NS = '{http://linux.duke.edu/metadata/common}'
+_HASH_BUFSIZE = 1024 * 1024
+
+
+def get_cache_size_limit():
+    """
+    Return the maximal size of the package cache in bytes.
+
+    The package cache is opt-in - it is enabled by setting the LEAPP_PACKAGE_CACHE_SIZE environment variable
+    to the limit in MiB.
+    """
+    value = get_env('LEAPP_PACKAGE_CACHE_SIZE', None)
+    try:
+        size = int(value) if value is not None else DEFAULT_PACKAGE_CACHE_SIZE
+    except ValueError:
+        api.current_logger().warning(
+            'Invalid value of LEAPP_PACKAGE_CACHE_SIZE: {}. The package cache is disabled.'.format(value)
+        )
+        size = 0
+    return max(size, 0) * 1024 * 1024
+
+
+def is_enabled():
+    """Return True if the persistent package cache is enabled."""
+    return get_cache_size_limit() > 0
+
+
+def _open_metadata(path):
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rb')
+    if path.endswith('.bz2'):
+        return bz2.BZ2File(path, 'rb')
+    if path.endswith('.xz'):
+        if lzma is None:
+            raise IOError(errno.ENOTSUP, 'Cannot decompress the xz compressed metadata', path)
+        return lzma.open(path, 'rb')
+    return open(path, 'rb')
+
+
+def _get_primary_path(repo_dir):
+    """Return the path to the primary metadata of the repository cached by dnf, or None if there are none."""
+    try:
+        tree = ElementTree.parse(os.path.join(repo_dir, 'repodata', 'repomd.xml'))
+    except (IOError, OSError, ElementTree.ParseError):
+        return None
+    for data in tree.getroot().iter('{}data'.format(_REPO_NS)):
+        location = data.find('{}location'.format(_REPO_NS))
+        if data.get('type') == 'primary' and location is not None:
+            return os.path.join(repo_dir, 'repodata', os.path.basename(location.get('href')))
+    return None
+
+
+def _parse_primary(path):
+    """Return the dict mapping file names of packages in the repository to their checksums (type, digest)."""
+    checksums = {}
+    with _open_metadata(path) as f:
+        for dummy_event, elem in ElementTree.iterparse(f):
+            if elem.tag != '{}package'.format(_COMMON_NS):
+                continue
+            checksum = elem.find('{}checksum'.format(_COMMON_NS))
+            location = elem.find('{}location'.format(_COMMON_NS))
+            if checksum is not None and location is not None:
+                checksum_type = checksum.get('type')
+                if checksum_type == 'sha':
+                    # The type used by old createrepo versions
+                    checksum_type = 'sha1'
+                checksums[os.path.basename(location.get('href'))] = (checksum_type, checksum.text.strip())
+            elem.clear()
+    return checksums
+
+
+class _PrimaryMetadataCache(object):
+    """Parsed primary metadata, so the metadata are parsed once per actor even when the cache is accessed twice."""
+
+    def __init__(self):
+        self._data = {}
+
+    def get_checksums(self, repo_dir):
+        path = _get_primary_path(repo_dir)
+        if not path:
+            return {}
+        try:
+            stat = os.stat(path)
+            key = (path, stat.st_mtime, stat.st_size)
+            if key not in self._data:
+                self._data[key] = _parse_primary(path)
+            return self._data[key]
+        except (IOError, OSError, ElementTree.ParseError) as err:
+            api.current_logger().warning('Cannot read the metadata of the {} repository: {}'.format(repo_dir, err))
+            return {}
+
+
+_primary_metadata_cache = _PrimaryMetadataCache()
+
+
+def _iter_repo_dirs(dnf_cache_dir):
+    try:
+        names = sorted(os.listdir(dnf_cache_dir))
+    except OSError:
+        return
+    for name in names:
+        repo_dir = os.path.join(dnf_cache_dir, name)
+        if os.path.isdir(os.path.join(repo_dir, 'repodata')):
+            yield repo_dir
+
+
+def _get_cache_path(checksum):
+    return os.path.join(PACKAGE_CACHE_DIR, '{}-{}.rpm'.format(*checksum))
+
+
+def _get_file_checksum(path, checksum_type):
+    digest = hashlib.new(checksum_type)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_BUFSIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _link_or_copy(src, dst):
+    """Hard link the file if possible, so cached packages do not take the space twice, copy it otherwise."""
+    tmp_dst = '{}.tmp'.format(dst)
+    try:
+        os.link(src, tmp_dst)
+    except OSError:
+        shutil.copyfile(src, tmp_dst)
+    os.rename(tmp_dst, dst)
+
+
+def _touch(path):
+    # The modification time is used for the LRU eviction as the access time is usually not updated (noatime)
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def restore_packages(dnf_cache_dir):
+    """
+    Provide dnf with the packages stored in the package cache.
+
+    The packages of the repositories with metadata available in the given dnf cache directory which are stored
+    in the package cache are placed to the directory of the repository, so dnf does not download them again.
+    dnf verifies the checksums of the packages found in its cache, so a broken package is just downloaded again.
+
+    :param dnf_cache_dir: Path to the dnf cache directory on the host, e.g. /var/lib/leapp/el8userspace/var/cache/dnf
+    :returns: Number of the restored packages
+    """
+    if not is_enabled() or not os.path.isdir(PACKAGE_CACHE_DIR):
+        return 0
+    restored = 0
+    for repo_dir in _iter_repo_dirs(dnf_cache_dir):
+        packages_dir = os.path.join(repo_dir, 'packages')
+        for filename, checksum in _primary_metadata_cache.get_checksums(repo_dir).items():
+            cached_path = _get_cache_path(checksum)
+            dst = os.path.join(packages_dir, filename)
+            if not os.path.exists(cached_path) or os.path.exists(dst):
+                continue
+            try:
+                if not os.path.isdir(packages_dir):
+                    os.makedirs(packages_dir)
+                _link_or_copy(cached_path, dst)
+            except (IOError, OSError) as err:
+                api.current_logger().warning('Cannot restore the cached package {}: {}'.format(filename, err))
+                continue
+            _touch(cached_path)
+            restored += 1
+    api.current_logger().info('Restored {} packages from the package cache.'.format(restored))
+    return restored
+
+
+def _list_cache_entries():
+    """Return a list of tuples (mtime, size, path) of the packages stored in the package cache."""
+    entries = []
+    for name in os.listdir(PACKAGE_CACHE_DIR):
+        path = os.path.join(PACKAGE_CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+
+def _evict(size_limit):
+    """Remove the least recently used packages from the package cache until its size fits the limit."""
+    entries = _list_cache_entries()
+    total_size = sum(size for dummy_mtime, size, dummy_path in entries)
+    for dummy_mtime, size, path in sorted(entries):
+        if total_size <= size_limit:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        total_size -= size
+    return total_size
+
+
+def get_space_to_reserve(directory):
+    """
+    Return the space in MiB the package cache can still take on the filesystem of the given directory.
+
+    To be counted in the disk space checks of /var/lib/leapp, as the cache can grow up to its size limit
+    during the upgrade. The space already taken by the cache is not free anymore, so it is not included.
+    """
+    size_limit = get_cache_size_limit()
+    if not size_limit:
+        return 0
+    cache_dir = PACKAGE_CACHE_DIR
+    while not os.path.exists(cache_dir):
+        cache_dir = os.path.dirname(cache_dir)
+    if os.stat(cache_dir).st_dev != os.stat(directory).st_dev:
+        return 0
+    cached_size = 0
+    if cache_dir == PACKAGE_CACHE_DIR:
+        cached_size = sum(size for dummy_mtime, size, dummy_path in _list_cache_entries())
+    return max(size_limit - cached_size, 0) // (1024 * 1024)
+
+
+def remove_cache():
+    """Remove the package cache with all the stored packages, e.g. when the upgrade is finished."""
+    if not os.path.exists(PACKAGE_CACHE_DIR):
+        return
+    api.current_logger().info('Removing the package cache {}.'.format(PACKAGE_CACHE_DIR))
+    shutil.rmtree(PACKAGE_CACHE_DIR, onerror=utils.report_and_ignore_shutil_rmtree_error)
+
+
+def store_packages(dnf_cache_dir):
+    """
+    Store the packages downloaded by dnf to the package cache.
+
+    Packages are stored under the checksums from the repository metadata, so the same package is never downloaded
+    again, even when it is provided by a different repository. The checksum of each newly stored package is verified.
+    The least recently used packages are removed when the size of the package cache exceeds the limit.
+
+    :param dnf_cache_dir: Path to the dnf cache directory on the host, e.g. /var/lib/leapp/el8userspace/var/cache/dnf
+    """
+    size_limit = get_cache_size_limit()
+    if not size_limit:
+        return
+    try:
+        if not os.path.isdir(PACKAGE_CACHE_DIR):
+            os.makedirs(PACKAGE_CACHE_DIR)
+    except OSError as err:
+        api.current_logger().warning('Cannot create the package cache: {}'.format(err))
+        return
+
+    stored = 0
+    for repo_dir in _iter_repo_dirs(dnf_cache_dir):
+        packages_dir = os.path.join(repo_dir, 'packages')
+        if not os.path.isdir(packages_dir):
+            continue
+        checksums = _primary_metadata_cache.get_checksums(repo_dir)
+        for filename in os.listdir(packages_dir):
+            checksum = checksums.get(filename)
+            if not checksum:
+                continue
+            cached_path = _get_cache_path(checksum)
+            if os.path.exists(cached_path):
+                _touch(cached_path)
+                continue
+            path = os.path.join(packages_dir, filename)
+            try:
+                if _get_file_checksum(path, checksum[0]) != checksum[1]:
+                    api.current_logger().debug('Not caching {}: checksum mismatch'.format(filename))
+                    continue
+                _link_or_copy(path, cached_path)
+            except (IOError, OSError, ValueError) as err:
+                api.current_logger().warning('Cannot store the package {} to the package cache: {}'.format(
+                    filename, err))
+                continue
+            stored += 1
+
+    total_size = _evict(size_limit)
+    api.current_logger().info('Stored {} packages to the package cache (size: {} MiB).'.format(
+        stored, total_size // (1024 * 1024)))
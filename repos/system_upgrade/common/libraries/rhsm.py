@@ -156,10 +156,11 @@ def get_available_repo_ids(context):
     :return: Repositories that are available to the current system through the subscription-manager
     :rtype: List(string)
     """
-    # Regenerated redhat.repo file ...
-    # FIXME: try to come up with something less invasive than yum clean all
-    # but still safe to call..
-    cmd = ['yum', 'clean', 'all']
+    # The redhat.repo file is regenerated by the subscription-manager plugin
+    # on any yum invocation. Only mark the metadata as expired instead of
+    # removing them: yum then just revalidates the cached metadata by the
+    # checksums in repomd.xml and downloads only what has changed.
+    cmd = ['yum', 'clean', 'expire-cache']
     try:
         context.call(cmd)
     except CalledProcessError as exc:
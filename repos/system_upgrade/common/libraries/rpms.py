@@ -1,5 +1,22 @@
+import os
+import re
+import warnings
+from collections import defaultdict
+
 from leapp.libraries import stdlib
-from leapp.models import InstalledRPM
+from leapp.models import InstalledRedHatSignedRPM, InstalledRPM, InstalledRPMTable, RPM
+
+try:
+    import rpm
+except ImportError:
+    rpm = None
+    warnings.warn('Could not import the `rpm` python module.', ImportWarning)
+
+# Fields of an installed package separated by '|': NAME|VERSION|RELEASE|EPOCH|PACKAGER|ARCH|PGPSIG
+_INSTALLED_RPM_QUERYFORMAT = (
+    r'%{NAME}|%{VERSION}|%{RELEASE}|%|EPOCH?{%{EPOCH}}:{0}||%|PACKAGER?{%{PACKAGER}}:{(none)}||%|'
+    r'ARCH?{%{ARCH}}:{}||%|DSAHEADER?{%{DSAHEADER:pgpsig}}:{%|RSAHEADER?{%{RSAHEADER:pgpsig}}:{(none)}|}|'
+)
 
 
 def get_installed_rpms():
@@ -7,8 +24,7 @@ def get_installed_rpms():
         '/bin/rpm',
         '-qa',
         '--queryformat',
-        r'%{NAME}|%{VERSION}|%{RELEASE}|%|EPOCH?{%{EPOCH}}:{0}||%|PACKAGER?{%{PACKAGER}}:{(none)}||%|'
-        r'ARCH?{%{ARCH}}:{}||%|DSAHEADER?{%{DSAHEADER:pgpsig}}:{%|RSAHEADER?{%{RSAHEADER:pgpsig}}:{(none)}|}|\n'
+        _INSTALLED_RPM_QUERYFORMAT + r'\n'
     ]
     try:
         return stdlib.run(rpm_cmd, split=True)['stdout']
@@ -19,6 +35,43 @@ def get_installed_rpms():
         return []
 
 
+def _read_installed_rpms_from_rpmdb():
+    # NOTE: the database is opened immediately, so any failure is raised here
+    # and not later during the iteration
+    headers = rpm.TransactionSet().dbMatch()
+    return (hdr.format(_INSTALLED_RPM_QUERYFORMAT) for hdr in headers)
+
+
+def iter_installed_rpms():
+    """
+    Iterate over the installed packages in a single pass through the RPM database.
+
+    The RPM database headers are read directly through the rpm Python bindings, so no rpm process is spawned
+    and the packages are provided as they are read. In case the bindings are not available or the database
+    cannot be read by them, the output of get_installed_rpms() is used instead.
+
+    :returns: Iterator over tuples (name, version, release, epoch, packager, arch, pgpsig) of installed packages
+    """
+    entries = None
+    if rpm:
+        try:
+            entries = _read_installed_rpms_from_rpmdb()
+        except rpm.error as err:
+            stdlib.api.current_logger().warning(
+                'Cannot read the RPM database using the rpm python module, falling back to the rpm tool: {}'
+                .format(err)
+            )
+
+    if entries is None:
+        entries = get_installed_rpms()
+
+    for entry in entries:
+        entry = entry.strip()
+        if not entry:
+            continue
+        yield tuple(entry.split('|'))
+
+
 def create_lookup(model, field, keys, context=stdlib.api):
     """
     Create a lookup set from one of the model fields.
@@ -39,9 +92,227 @@ def create_lookup(model, field, keys, context=stdlib.api):
         return set()
 
 
+def get_pgpsig_key_id(pgpsig):
+    """
+    Get the ID of the key the package has been signed with.
+
+    :param pgpsig: The signature of the package as provided by the RPM model,
+                   e.g. 'RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 199e2f91fd431d51'
+    :returns: The key ID in lower case or None if the package is not signed.
+    """
+    key_id_pos = pgpsig.rfind('Key ID ') if pgpsig else -1
+    if key_id_pos == -1:
+        return None
+    return pgpsig[key_id_pos + len('Key ID '):].strip().lower() or None
+
+
+# Pairs of the RPM model attributes and the corresponding columns of the InstalledRPMTable model
+RPM_TABLE_COLUMNS = (
+    ('name', 'names'),
+    ('epoch', 'epochs'),
+    ('packager', 'packagers'),
+    ('version', 'versions'),
+    ('release', 'releases'),
+    ('arch', 'arches'),
+    ('pgpsig', 'pgpsigs'),
+    ('repository', 'repositories'),
+    ('module', 'modules'),
+    ('stream', 'streams'),
+)
+
+
+def _column_property(column):
+    return property(lambda self: getattr(self._table, column)[self._index])
+
+
+class RPMRow(object):
+    """
+    Lightweight read-only view of a single package stored in an InstalledRPMTable message.
+
+    Provides the same attributes as the RPM model, the values are read from the columns of the message on access.
+    """
+
+    __slots__ = ('_table', '_index')
+
+    name = _column_property('names')
+    epoch = _column_property('epochs')
+    packager = _column_property('packagers')
+    version = _column_property('versions')
+    release = _column_property('releases')
+    arch = _column_property('arches')
+    pgpsig = _column_property('pgpsigs')
+    repository = _column_property('repositories')
+    module = _column_property('modules')
+    stream = _column_property('streams')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __repr__(self):
+        return 'RPMRow({}-{}-{}.{})'.format(self.name, self.version, self.release, self.arch)
+
+    def to_model(self):
+        """Create the RPM model of the package."""
+        return RPM(**{attr: getattr(self, attr) for attr, dummy_column in RPM_TABLE_COLUMNS})
+
+
+def iter_rpm_rows(table):
+    """
+    Iterate over the packages stored in the given InstalledRPMTable message (or a model derived from it).
+
+    The columns are checked to have the same length first, as they could have been modified after the message
+    has been created.
+
+    :raises ModelViolationError: if the lengths of the columns differ
+    :rtype: Iterator[RPMRow]
+    """
+    table.check_columns()
+    return (RPMRow(table, index) for index in range(len(table.names)))
+
+
+def create_rpm_table(model, pkgs):
+    """
+    Create the message of the given table model (e.g. InstalledRPMTable) containing the given packages.
+
+    :param model: InstalledRPMTable or a model derived from it
+    :param pkgs: RPM models or RPMRow views of the packages
+    """
+    pkgs = list(pkgs)
+    return model(**{column: [getattr(pkg, attr) for pkg in pkgs] for attr, column in RPM_TABLE_COLUMNS})
+
+
+class InstalledRPMIndex(object):
+    """
+    Index over installed packages (RPM models or RPMRow views) providing constant time lookups.
+    """
+
+    def __init__(self, rpms):
+        self._rpms = list(rpms)
+        self._by_name = defaultdict(list)
+        self._by_name_arch = defaultdict(list)
+        self._by_packager = defaultdict(list)
+        self._by_key_id = defaultdict(list)
+        self._by_modulestream = defaultdict(list)
+
+        for rpm in self._rpms:
+            self._by_name[rpm.name].append(rpm)
+            self._by_name_arch[(rpm.name, rpm.arch)].append(rpm)
+            self._by_packager[rpm.packager].append(rpm)
+            self._by_key_id[get_pgpsig_key_id(rpm.pgpsig)].append(rpm)
+            if rpm.module and rpm.stream:
+                self._by_modulestream[(rpm.module, rpm.stream)].append(rpm)
+
+    def __iter__(self):
+        return iter(self._rpms)
+
+    def __len__(self):
+        return len(self._rpms)
+
+    def has_package(self, name, arch=None):
+        """
+        Check whether a package with the given name (and architecture) is installed.
+
+        :param name: name of the package
+        :param arch: filter by architecture. None means all arches.
+        """
+        return (name, arch) in self._by_name_arch if arch else name in self._by_name
+
+    def get_packages(self, name, arch=None):
+        """
+        Get all installed packages with the given name (and architecture).
+
+        :param name: name of the package
+        :param arch: filter by architecture. None means all arches.
+        :rtype: List[RPM]
+        """
+        if arch:
+            return list(self._by_name_arch.get((name, arch), []))
+        return list(self._by_name.get(name, []))
+
+    def get_packages_by_packager(self, packager):
+        """
+        Get all installed packages built by the given packager.
+
+        :rtype: List[RPM]
+        """
+        return list(self._by_packager.get(packager, []))
+
+    def get_packages_by_key_id(self, key_id):
+        """
+        Get all installed packages signed by the key with the given ID (see get_pgpsig_key_id).
+
+        :param key_id: ID of the signing key. None means unsigned packages.
+        :rtype: List[RPM]
+        """
+        return list(self._by_key_id.get(key_id.lower() if key_id else None, []))
+
+    def get_packages_by_modulestream(self, module, stream):
+        """
+        Get all installed packages coming from the given module stream.
+
+        :rtype: List[RPM]
+        """
+        return list(self._by_modulestream.get((module, stream), []))
+
+
+class _ActorRunCache(object):
+    """
+    Storage for data that are valid only during the current actor run.
+
+    E.g. consuming the messages with installed packages means deserialization of thousands of RPM models, so it
+    should be done just once per actor run. However, the consumed messages differ for every actor run, so the data
+    built for a previous run are dropped.
+    """
+
+    def __init__(self):
+        self._actor = None
+        self._data = {}
+
+    def get(self, key, default_factory):
+        """
+        Get the data stored under the given key, storing default_factory() under the key if it is not present.
+        """
+        actor = stdlib.api.current_actor()
+        if actor is not self._actor:
+            self._actor = actor
+            self._data = {}
+        if key not in self._data:
+            self._data[key] = default_factory()
+        return self._data[key]
+
+
+_actor_run_cache = _ActorRunCache()
+
+
+def _create_installed_rpm_index(model, context):
+    if issubclass(model, InstalledRPMTable):
+        return InstalledRPMIndex(iter_rpm_rows(next((m for m in context.consume(model)), model())))
+    return InstalledRPMIndex(next((m for m in context.consume(model)), model()).items or [])
+
+
+def get_installed_rpm_index(model, context=stdlib.api):
+    """
+    Get the index over the installed packages provided by the given model.
+
+    The message is consumed only once per actor run and the created index is reused by all subsequent calls,
+    so it is cheap to ask many questions about the installed packages. Indexes built for other contexts than
+    the API of the current actor are not cached.
+
+    :param model: model class, expected InstalledRPMTable or a model derived from it (the index contains RPMRow
+                  views then), InstalledRedHatSignedRPM or the deprecated InstalledRPM and models derived from it
+    :param context: context of the execution
+    :rtype: InstalledRPMIndex
+    """
+    if context is not stdlib.api:
+        return _create_installed_rpm_index(model, context)
+    return _actor_run_cache.get(('installed_rpm_index', model), lambda: _create_installed_rpm_index(model, context))
+
+
 def has_package(model, package_name, arch=None, context=stdlib.api):
     """
-    Expects a model InstalledRedHatSignedRPM or InstalledUnsignedRPM.
+    Expects a model InstalledRPMTable, InstalledRedHatSignedRPMTable or InstalledUnsignedRPMTable,
+    or InstalledRedHatSignedRPM.
     Can be useful in cases like a quick item presence check, ex. check in actor that
     a certain package is installed.
 
@@ -49,25 +320,99 @@ def has_package(model, package_name, arch=None, context=stdlib.api):
     :param package_name: package to be checked
     :param arch: filter by architecture. None means all arches.
     """
-    if not (isinstance(model, type) and issubclass(model, InstalledRPM)):
+    rpm_models = (InstalledRPM, InstalledRedHatSignedRPM, InstalledRPMTable)
+    if not (isinstance(model, type) and issubclass(model, rpm_models)):
         return False
-    keys = ('name',) if not arch else ('name', 'arch')
-    rpm_lookup = create_lookup(model, field='items', keys=keys, context=context)
-    return (package_name, arch) in rpm_lookup if arch else (package_name,) in rpm_lookup
+    return get_installed_rpm_index(model, context=context).has_package(package_name, arch=arch)
 
 
-def _read_rpm_modifications(config):
+_VERIFIED_FILE_RE = re.compile(r'^(?:[.?SM5DLUGTP]{8,9}|missing)\s+(?:[acdglr]\s+)?(/.*)$')
+_NOT_OWNED_FILE_RE = re.compile(r'^file (/.*) is not owned by any package$')
+
+
+def _parse_rpm_verify_output(lines):
     """
-    Ask RPM database whether the configuration file was modified.
+    Parse the output of the rpm verify command.
 
-    :param config: a config file to check
+    :returns: Dictionary mapping paths of the reported files to the output lines. For files not owned by any package
+              the value is None.
+    """
+    verified = {}
+    for line in lines:
+        line = line.rstrip()
+        not_owned = _NOT_OWNED_FILE_RE.match(line)
+        if not_owned:
+            verified[not_owned.group(1)] = None
+            continue
+        verified_file = _VERIFIED_FILE_RE.match(line)
+        if verified_file:
+            verified[verified_file.group(1)] = line
+        # Ignore anything else, e.g. unsatisfied dependencies or errors
+    return verified
+
+
+def _verify_files_uncached(paths):
+    """
+    Verify the packages owning the given files by a single rpm invocation.
+
+    Modification times are ignored. As whole owning packages are verified, the result contains also other files
+    of the packages that differ from the RPM database.
+
+    :returns: Dictionary in the format returned by _parse_rpm_verify_output. Paths that are not reported by rpm
+              are mapped to an empty string (not modified) or to a 'missing' line if the file does not exist,
+              as "rpm -Vf" reports only an error for such files.
     """
     try:
-        return stdlib.run(['rpm', '-Vf', config], split=True, checked=False)['stdout']
+        output = stdlib.run(['rpm', '-Vf', '--nomtime'] + list(paths), split=True, checked=False)['stdout']
     except OSError as err:
-        error = 'Failed to check the modification status of the file {}: {}'.format(config, str(err))
+        error = 'Failed to check the modification status of the files {}: {}'.format(', '.join(paths), str(err))
         stdlib.api.current_logger().error(error)
-        return []
+        return {}
+
+    verified = _parse_rpm_verify_output(output)
+    for path in paths:
+        if path not in verified:
+            verified[path] = '' if os.path.lexists(path) else 'missing     {}'.format(path)
+    return verified
+
+
+def _get_rpm_verification(paths):
+    """
+    Get the output lines of rpm verify for the given files, verifying the files not cached yet in one batch.
+    """
+    cache = _actor_run_cache.get('rpm_verification', dict)
+    unverified_paths = sorted({path for path in paths if path not in cache})
+    if unverified_paths:
+        cache.update(_verify_files_uncached(unverified_paths))
+    return {path: cache[path] for path in paths if path in cache}
+
+
+def verify_files(paths):
+    """
+    Verify the given files against the RPM database.
+
+    All the files that have not been verified yet during the current actor run are verified by one rpm invocation,
+    so the RPM database is opened just once. The results are cached for the rest of the actor run - including the
+    results for other files of the verified packages. Modification times of files are ignored.
+
+    :param paths: Paths to the files to verify
+    :returns: Dictionary mapping the given paths to the verification flags reported by rpm, e.g. 'S.5......'
+              for a file with changed size and digest, 'missing' for a missing file, an empty string for an unmodified
+              file or None for a file not owned by any package. Paths that could not be verified are omitted.
+    """
+    verification = _get_rpm_verification(paths)
+    return {path: line.split(' ', 1)[0] if line else line for path, line in verification.items()}
+
+
+def _read_rpm_modifications(config):
+    """
+    Ask RPM database whether the configuration file was modified.
+
+    :param config: a config file to check
+    :returns: the output lines of rpm verify related to the config file
+    """
+    line = _get_rpm_verification([config]).get(config)
+    return [line] if line else []
 
 
 def _parse_config_modification(data, config):
@@ -0,0 +1,59 @@
+import hashlib
+import zlib
+
+from leapp.models import SELinuxModuleContent
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class ModuleContents(object):
+    """
+    Compressed content-addressed storage of SELinux module contents
+
+    Contents are stored under their sha256 digest, so identical modules
+    (e.g. the same module installed on multiple priorities) are stored once.
+    """
+
+    def __init__(self, contents=()):
+        """
+        :param contents: SELinuxModuleContent objects, e.g. SELinuxModules.contents
+        """
+        self._contents = {content.digest: content for content in contents}
+
+    def add(self, content):
+        """
+        Store the given cil content
+
+        :returns: The digest to be set in SELinuxModule.digest
+        """
+        data = content if isinstance(content, bytes) else content.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if digest not in self._contents:
+            self._contents[digest] = SELinuxModuleContent(digest=digest, data=zlib.compress(data, 9))
+        return digest
+
+    def to_list(self):
+        """Return the stored contents to be set in SELinuxModules.contents"""
+        return [self._contents[digest] for digest in sorted(self._contents)]
+
+    def write(self, module, path):
+        """
+        Write the cil content of the given SELinuxModule to the file
+
+        The content is decompressed to the file in chunks, so it is never
+        held in memory uncompressed. Modules with the content stored
+        directly in SELinuxModule.content are supported as well.
+
+        :raises KeyError: The content of the module is not stored
+        """
+        if module.digest is None:
+            with open(path, 'w') as cil_file:
+                cil_file.write(module.content)
+            return
+
+        data = self._contents[module.digest].data
+        decompressor = zlib.decompressobj()
+        with open(path, 'wb') as cil_file:
+            for offset in range(0, len(data), _CHUNK_SIZE):
+                cil_file.write(decompressor.decompress(data[offset:offset + _CHUNK_SIZE]))
+            cil_file.write(decompressor.flush())
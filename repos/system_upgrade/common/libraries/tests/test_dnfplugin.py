@@ -1,3 +1,4 @@
+import json
 from collections import namedtuple
 
 import pytest
@@ -5,6 +6,8 @@ import pytest
 import leapp.models
 from leapp.libraries.common import dnfplugin
 from leapp.libraries.common.config.version import get_major_version
+from leapp.libraries.common.testutils import logger_mocked
+from leapp.libraries.stdlib import api
 from leapp.models.fields import Boolean
 from leapp.topics import Topic
 
@@ -79,11 +82,17 @@ class DATADnfPluginDataRHUI(leapp.models.Model):
     aws = fields.Model(DATADnfPluginDataRHUIAWS)
 
 
+class DATADnfPluginDataDiskSpace(leapp.models.Model):
+    topic = DATADnfPluginDataTopic
+    mountpoints = fields.List(fields.String())
+
+
 class DATADnfPluginData(leapp.models.Model):
     topic = DATADnfPluginDataTopic
     pkgs_info = fields.Model(DATADnfPluginDataPkgsInfo)
     dnf_conf = fields.Model(DATADnfPluginDataDnfConf)
     rhui = fields.Model(DATADnfPluginDataRHUI)
+    disk_space = fields.Model(DATADnfPluginDataDiskSpace)
 
 
 # Delete those models from leapp.models to 'unpolute' the module
@@ -91,6 +100,7 @@ del leapp.models.DATADnfPluginDataPkgsInfo
 del leapp.models.DATADnfPluginDataDnfConf
 del leapp.models.DATADnfPluginDataRHUI
 del leapp.models.DATADnfPluginDataRHUIAWS
+del leapp.models.DATADnfPluginDataDiskSpace
 del leapp.models.DATADnfPluginData
 
 
@@ -175,12 +185,14 @@ def test_build_plugin_data(monkeypatch):
                 to_remove=TEST_REMOVE_PACKAGES.initdata,
                 to_upgrade=TEST_UPGRADE_PACKAGES.initdata,
                 modules_to_enable=TEST_ENABLE_MODULES.initdata
-                )
+                ),
+            mountpoints=['/', '/var']
             )
     )
     assert created.dnf_conf.debugsolver is True
     assert created.dnf_conf.test_flag is True
     assert created.rhui.aws.on_aws is False
+    assert created.disk_space.mountpoints == ['/', '/var']
 
     with pytest.raises(fields.ModelViolationError):
         DATADnfPluginData.create(
@@ -202,3 +214,29 @@ def test_build_plugin_data(monkeypatch):
                 )
             )
         )
+
+
+class _ContextMocked(object):
+    def __init__(self, path):
+        self.path = path
+
+    def open(self, path, *args, **kwargs):
+        assert path == dnfplugin.DNF_PLUGIN_DATA_PATH
+        return open(self.path, *args, **kwargs)
+
+
+def test_get_space_estimates(monkeypatch, tmpdir):
+    monkeypatch.setattr(api, 'current_logger', logger_mocked())
+    data = tmpdir.join('data.json')
+    context = _ContextMocked(data.strpath)
+
+    # The plugin data file is missing
+    assert dnfplugin.get_space_estimates(context) == {}
+    assert api.current_logger.warnmsg
+
+    # The check stage has not stored the estimates
+    data.write(json.dumps({'disk_space': {'mountpoints': ['/', '/var']}}))
+    assert dnfplugin.get_space_estimates(context) == {}
+
+    data.write(json.dumps({'disk_space': {'mountpoints': ['/', '/var'], 'estimates': {'/': 100, '/var': 5}}}))
+    assert dnfplugin.get_space_estimates(context) == {'/': 100, '/var': 5}
@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+from leapp.libraries.common import factscache
+from leapp.libraries.common.config import get_env
+from leapp.libraries.common.testutils import CurrentActorMocked, produce_mocked
+from leapp.libraries.stdlib import api
+from leapp.models import InstalledRedHatSignedRPM, RPM
+
+
+class CollectorMocked(object):
+    def __init__(self):
+        self.called = 0
+
+    def __call__(self):
+        self.called += 1
+        return [InstalledRedHatSignedRPM(items=[RPM(name='pkg', version='0.1', release='1.el8', epoch='0',
+                                                    packager='Red Hat, Inc.', arch='noarch', pgpsig='(none)')])]
+
+
+@pytest.mark.parametrize('enabled', (True, False))
+def test_produce_cached(monkeypatch, tmpdir, enabled):
+    envars = {'LEAPP_DEVEL_USE_FACTS_CACHE': '1'} if enabled else {}
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked(envars=envars))
+    monkeypatch.setattr(factscache, 'FACTS_CACHE_DIR', tmpdir.join('cache').strpath)
+    input_file = tmpdir.join('input')
+    input_file.write('foo')
+
+    collect = CollectorMocked()
+    for dummy_run in range(2):
+        monkeypatch.setattr(api, 'produce', produce_mocked())
+        factscache.produce_cached('scanner', lambda: [factscache.get_content_fingerprint(input_file.strpath)], collect)
+        assert len(api.produce.model_instances) == 1
+        assert api.produce.model_instances[0].items[0].name == 'pkg'
+    assert collect.called == (1 if enabled else 2)
+    assert os.path.exists(tmpdir.join('cache', 'scanner.json').strpath) == enabled
+
+    # A change of the inputs means the facts are collected again
+    input_file.write('bar')
+    factscache.produce_cached('scanner', lambda: [factscache.get_content_fingerprint(input_file.strpath)], collect)
+    assert collect.called == (2 if enabled else 3)
+
+
+def test_fingerprints(tmpdir):
+    path = tmpdir.join('file')
+    assert factscache.get_file_fingerprint(path.strpath) == ['file', path.strpath, None]
+    assert factscache.get_content_fingerprint(path.strpath) == ['content', path.strpath, None]
+
+    path.write('foo')
+    fingerprint = factscache.get_dir_fingerprint(tmpdir.strpath)
+    assert fingerprint == ['dir', tmpdir.strpath, [factscache.get_file_fingerprint(path.strpath)]]
+    path.write('foobar')
+    assert factscache.get_dir_fingerprint(tmpdir.strpath) != fingerprint
+
+
+def test_cache_key_includes_used_libraries(monkeypatch):
+    used_libraries = factscache._get_used_libraries(factscache.__name__)
+    assert factscache.__name__ in used_libraries
+    assert get_env.__module__ in used_libraries
+
+    # A change of any library used by the scanner means the facts are collected again
+    monkeypatch.setattr(factscache, '_get_source_digest', lambda module_name: 'digest')
+    key = factscache._get_cache_key('scanner', [], factscache.is_enabled)
+    monkeypatch.setattr(factscache, '_get_source_digest',
+                        lambda module_name: 'changed' if module_name == get_env.__module__ else 'digest')
+    assert factscache._get_cache_key('scanner', [], factscache.is_enabled) != key
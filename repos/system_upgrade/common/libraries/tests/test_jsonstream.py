@@ -0,0 +1,56 @@
+import io
+import json
+
+import pytest
+
+from leapp.libraries.common import jsonstream
+
+
+def _members(json_data, streamed_keys=(), chunk_size=3):
+    members = []
+    fp = io.StringIO(json_data)
+    for key, value in jsonstream.iter_object_members(fp, streamed_keys=streamed_keys, chunk_size=chunk_size):
+        if key in streamed_keys:
+            value = list(value)
+        members.append((key, value))
+    return members
+
+
+@pytest.mark.parametrize('json_data', (
+    u'{}',
+    u'  { "a" : 1 , "b": [1, 2.5, -3e2], "c": {"d": [true, false, null]}, "e": "x\\"y\\u0041" }  ',
+    u'{"number": 123456789, "items": [], "nested": [[1], [2, [3]]], "text": "' + u'long' * 100 + u'"}',
+))
+@pytest.mark.parametrize('chunk_size', (1, 3, 7, jsonstream.DEFAULT_CHUNK_SIZE))
+def test_iter_object_members(json_data, chunk_size):
+    expected = json.loads(json_data)
+    assert dict(_members(json_data, chunk_size=chunk_size)) == expected
+    assert dict(_members(json_data, streamed_keys=('items', 'nested'), chunk_size=chunk_size)) == expected
+
+
+def test_streamed_items_are_decoded_lazily():
+    fp = io.StringIO(u'{"items": [1, 2, 3], "after": "value"}')
+    members = jsonstream.iter_object_members(fp, streamed_keys=('items',), chunk_size=1)
+
+    key, items = next(members)
+    assert key == 'items'
+    assert next(items) == 1
+
+    # Unconsumed items are skipped when continuing with the next member
+    assert next(members) == ('after', 'value')
+
+
+@pytest.mark.parametrize('json_data', (
+    u'',
+    u'[]',
+    u'{',
+    u'{"a": 1,}',
+    u'{"a" 1}',
+    u'{1: 2}',
+    u'{"a": [1, 2}',
+    u'{"items": {}}',
+    u'{"a": 1} trailing',
+))
+def test_invalid_json(json_data):
+    with pytest.raises(ValueError):
+        _members(json_data, streamed_keys=('items',))
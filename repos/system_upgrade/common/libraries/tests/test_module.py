@@ -0,0 +1,36 @@
+from leapp.libraries.common import module
+
+
+class DNFBaseMocked(object):
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_dnf_base_is_shared(monkeypatch):
+    created_bases = []
+
+    def create_dnf_base_mocked():
+        created_bases.append(DNFBaseMocked())
+        return created_bases[-1]
+
+    monkeypatch.setattr(module, '_create_dnf_base', create_dnf_base_mocked)
+    monkeypatch.setattr(module, '_dnf_base_provider', module._DNFBaseProvider())
+
+    base = module.get_dnf_base()
+    assert module.get_dnf_base() is base
+    assert module._create_or_get_dnf_base() is base
+    assert len(created_bases) == 1
+
+    module.invalidate_dnf_base()
+    assert base.closed
+
+    new_base = module.get_dnf_base()
+    assert new_base is not base
+    assert len(created_bases) == 2
+
+    # An explicitly provided base takes precedence over the shared one
+    explicit_base = DNFBaseMocked()
+    assert module._create_or_get_dnf_base(explicit_base) is explicit_base
@@ -0,0 +1,62 @@
+import errno
+import os
+
+import pytest
+
+from leapp.libraries.common import mounting
+
+
+def _create_tree(root):
+    root.join('file').write('content')
+    root.mkdir('dir').join('nested').write('nested content')
+    root.join('dir').mkdir('empty')
+    for i in range(10):
+        root.join('dir', 'file{}'.format(i)).write(str(i) * 1000)
+
+
+def _read_tree(root):
+    tree = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        for dirname in dirnames:
+            tree[os.path.relpath(os.path.join(dirpath, dirname), root)] = None
+        for filename in filenames:
+            with open(os.path.join(dirpath, filename)) as f:
+                tree[os.path.relpath(os.path.join(dirpath, filename), root)] = f.read()
+    return tree
+
+
+def test_copytree_to(tmpdir):
+    src = tmpdir.mkdir('src')
+    _create_tree(src)
+    os.chmod(src.join('file').strpath, 0o600)
+
+    context = mounting.NotIsolatedActions(base_dir=tmpdir.mkdir('base').strpath)
+    context.copytree_to(src.strpath, '/var/cache/dnf')
+
+    dst = tmpdir.join('base', 'var', 'cache', 'dnf')
+    assert _read_tree(dst.strpath) == _read_tree(src.strpath)
+    assert os.stat(dst.join('file').strpath).st_mode & 0o777 == 0o600
+
+    with pytest.raises(OSError):
+        context.copytree_to(src.strpath, '/var/cache/dnf')
+
+
+@pytest.mark.parametrize('rename_error', (None, errno.EXDEV))
+def test_movetree_from(monkeypatch, tmpdir, rename_error):
+    def rename_mocked(src, dst):
+        raise OSError(rename_error, os.strerror(rename_error))
+
+    if rename_error:
+        # Simulate a move between filesystems
+        monkeypatch.setattr(mounting.os, 'rename', rename_mocked)
+
+    src = tmpdir.mkdir('base').mkdir('var').mkdir('cache').mkdir('dnf')
+    _create_tree(src)
+    expected_tree = _read_tree(src.strpath)
+
+    context = mounting.NotIsolatedActions(base_dir=tmpdir.join('base').strpath)
+    dst = tmpdir.join('persistent', 'cache')
+    context.movetree_from('/var/cache/dnf', dst.strpath)
+
+    assert _read_tree(dst.strpath) == expected_tree
+    assert not src.check()
@@ -0,0 +1,104 @@
+import os
+from collections import namedtuple
+
+from leapp.libraries.common import overlaygen
+from leapp.libraries.common.testutils import logger_mocked
+from leapp.libraries.stdlib import api
+
+
+class MountMocked(object):
+    def __init__(self, log, source, target):
+        self.log = log
+        self.source = source
+        self.target = target
+
+    def __enter__(self):
+        self.log.append(('mount', self.source, self.target))
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.log.append(('umount', self.source, self.target))
+
+
+def test_build_overlay_mount(monkeypatch):
+    log = []
+    monkeypatch.setattr(overlaygen.mounting, 'OverlayMount',
+                        lambda name, source, workdir: MountMocked(log, source, os.path.join(workdir, name)))
+    monkeypatch.setattr(overlaygen.mounting, 'BindMount', lambda source, target: MountMocked(log, source, target))
+
+    # Many mountpoints must not hit the recursion limit
+    mountpoints = ['/var', '/var/lib'] + ['/mnt/{}'.format(i) for i in range(500)]
+    mounts = {mp: MountMocked(log, mp, '/mounts/{}'.format(overlaygen._mount_name(mp))) for mp in mountpoints}
+    root_mount = MountMocked(log, '/', '/root')
+
+    with overlaygen._build_overlay_mount(root_mount, mounts) as mount:
+        assert mount is root_mount
+        assert len(log) == 3 * len(mountpoints)
+        binds = [entry[2] for entry in log if entry[2].startswith('/root/')]
+        assert binds.index('/root/var') < binds.index('/root/var/lib')
+
+    assert len(log) == 6 * len(mountpoints)
+    # Everything is unmounted in the reverse order
+    assert [entry[1:] for entry in log[len(log) // 2:]] == [entry[1:] for entry in reversed(log[:len(log) // 2])]
+
+
+def test_create_mount_disk_images(monkeypatch, tmpdir):
+    mkfs_calls = []
+    monkeypatch.setattr(api, 'current_logger', logger_mocked())
+    monkeypatch.setattr(overlaygen.utils, 'call_with_oserror_handled', lambda cmd: mkfs_calls.append(cmd))
+
+    images = overlaygen._create_mount_disk_images(tmpdir.strpath, {'/': 16, '/var': 8, '/home': 4})
+
+    assert sorted(images) == ['/', '/home', '/var']
+    for mountpoint, image in images.items():
+        assert image == tmpdir.join(overlaygen._mount_name(mountpoint)).strpath
+    for mountpoint, size in (('/', 16), ('/var', 8), ('/home', 4)):
+        assert os.path.getsize(images[mountpoint]) == size * 1024 * 1024
+        # The disk image is created as a sparse file
+        assert os.stat(images[mountpoint]).st_blocks * 512 < size * 1024 * 1024
+    assert sorted(cmd[-1] for cmd in mkfs_calls) == sorted(images.values())
+
+
+def _prepare_required_mounts(monkeypatch, tmpdir):
+    checked = []
+    created = {}
+    monkeypatch.setattr(api, 'current_logger', logger_mocked())
+    monkeypatch.setattr(overlaygen, 'run', lambda cmd: None)
+    monkeypatch.setattr(overlaygen, '_ensure_enough_diskimage_space', lambda size, path: checked.append((size, path)))
+    monkeypatch.setattr(overlaygen.pkgcache, 'get_space_to_reserve', lambda path: 8)
+    monkeypatch.setattr(overlaygen, '_create_mount_disk_images',
+                        lambda directory, sizes: created.update(sizes) or {mp: 'img' for mp in sizes})
+    monkeypatch.setattr(overlaygen.mounting, 'LoopMount', lambda source, target: (source, target))
+    monkeypatch.setattr(overlaygen.mounting, 'NullMount', lambda target: target)
+
+    mount_points = [overlaygen.MountPoints(mp, 'xfs') for mp in ('/', '/var', '/home')]
+    xfs_info = namedtuple('XFSPresence', ['mountpoints_without_ftype'])(['/var', '/home'])
+    overlaygen._prepare_required_mounts(tmpdir.strpath, tmpdir.join('mounts').strpath, mount_points, xfs_info)
+    return checked, created
+
+
+def test_prepare_required_mounts_without_estimates(monkeypatch, tmpdir):
+    monkeypatch.setenv('LEAPP_OVL_SIZE', '16')
+    checked, created = _prepare_required_mounts(monkeypatch, tmpdir)
+
+    assert created == {'/': 16, '/var': 16, '/home': 16}
+    # The full size of the images is reserved even though the images are sparse, together with the space
+    # the package cache can still take. The image of / is not counted as / has ftype
+    assert checked == [(2 * 16 + 8, tmpdir.strpath)]
+
+
+def test_prepare_required_mounts_with_estimates(monkeypatch, tmpdir):
+    monkeypatch.delenv('LEAPP_OVL_SIZE', raising=False)
+    overlaygen.store_space_estimates(tmpdir.strpath, {'/': 800, '/var': 0, '/boot': 40})
+    checked, created = _prepare_required_mounts(monkeypatch, tmpdir)
+
+    reserve = overlaygen.DISK_IMAGE_RESERVE
+    # /home is not covered by the estimates, so the default size is used
+    assert created == {'/': 1000 + reserve, '/var': reserve, '/home': 2048}
+    assert checked == [(1000 + 2 * reserve + 2048 + 8, tmpdir.strpath)]
+
+    # LEAPP_OVL_SIZE overrides the estimates
+    monkeypatch.setenv('LEAPP_OVL_SIZE', '16')
+    checked, created = _prepare_required_mounts(monkeypatch, tmpdir)
+    assert created == {'/': 16, '/var': 16, '/home': 16}
+    assert checked == [(3 * 16 + 8, tmpdir.strpath)]
@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import os
+
+import pytest
+
+from leapp.libraries.common import pkgcache
+from leapp.libraries.common.testutils import CurrentActorMocked, logger_mocked
+from leapp.libraries.stdlib import api
+
+REPOMD = """<?xml version="1.0" encoding="UTF-8"?>
+<repomd xmlns="http://linux.duke.edu/metadata/repo" xmlns:rpm="http://linux.duke.edu/metadata/rpm">
+  <data type="primary">
+    <location href="repodata/abcd-primary.xml.gz"/>
+  </data>
+</repomd>
+"""
+
+PRIMARY_PACKAGE = """
+  <package type="rpm">
+    <name>{name}</name>
+    <checksum type="sha256" pkgid="YES">{checksum}</checksum>
+    <location href="Packages/{name}-1.0-1.el8.noarch.rpm"/>
+  </package>"""
+
+PACKAGES = {'foo': b'foo rpm content', 'bar': b'bar rpm content', 'baz': b'baz rpm content'}
+
+
+def _create_repo_cache(dnf_cache_dir, repoid, content):
+    repo_dir = dnf_cache_dir.ensure('{}-0123456789abcdef'.format(repoid), dir=True)
+    repodata = repo_dir.mkdir('repodata')
+    repodata.join('repomd.xml').write(REPOMD)
+    primary = '<metadata xmlns="http://linux.duke.edu/metadata/common" packages="{}">{}\n</metadata>'.format(
+        len(PACKAGES),
+        ''.join(PRIMARY_PACKAGE.format(name=name, checksum=hashlib.sha256(data).hexdigest())
+                for name, data in sorted(PACKAGES.items()))
+    )
+    with gzip.open(repodata.join('abcd-primary.xml.gz').strpath, 'wb') as f:
+        f.write(primary.encode('utf-8'))
+
+    packages_dir = repo_dir.mkdir('packages')
+    for name in content:
+        packages_dir.join('{}-1.0-1.el8.noarch.rpm'.format(name)).write_binary(content[name])
+    return packages_dir
+
+
+def _mock_environment(monkeypatch, tmpdir, size='4096'):
+    envars = {'LEAPP_PACKAGE_CACHE_SIZE': size} if size is not None else {}
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked(envars=envars))
+    monkeypatch.setattr(api, 'current_logger', logger_mocked())
+    monkeypatch.setattr(pkgcache, 'PACKAGE_CACHE_DIR', tmpdir.join('package-cache').strpath)
+
+
+def test_store_and_restore_packages(monkeypatch, tmpdir):
+    _mock_environment(monkeypatch, tmpdir)
+    # The baz package is broken, so it must not be cached
+    stored = {'foo': PACKAGES['foo'], 'bar': PACKAGES['bar'], 'baz': b'broken'}
+    _create_repo_cache(tmpdir.mkdir('userspace'), 'baseos', stored)
+    pkgcache.store_packages(tmpdir.join('userspace').strpath)
+    assert len(os.listdir(pkgcache.PACKAGE_CACHE_DIR)) == 2
+
+    # The packages are provided to the same repository in another dnf cache (e.g. the next run)
+    # as well as to any other repository containing the same packages
+    dnf_cache_dir = tmpdir.mkdir('next-userspace')
+    baseos_packages = _create_repo_cache(dnf_cache_dir, 'baseos', {})
+    appstream_packages = _create_repo_cache(dnf_cache_dir, 'appstream', {'foo': PACKAGES['foo']})
+    assert pkgcache.restore_packages(dnf_cache_dir.strpath) == 3
+    assert sorted(os.listdir(baseos_packages.strpath)) == ['bar-1.0-1.el8.noarch.rpm', 'foo-1.0-1.el8.noarch.rpm']
+    assert sorted(os.listdir(appstream_packages.strpath)) == ['bar-1.0-1.el8.noarch.rpm', 'foo-1.0-1.el8.noarch.rpm']
+    assert baseos_packages.join('bar-1.0-1.el8.noarch.rpm').read_binary() == PACKAGES['bar']
+
+
+def test_evict_least_recently_used(monkeypatch, tmpdir):
+    _mock_environment(monkeypatch, tmpdir)
+    _create_repo_cache(tmpdir.mkdir('userspace'), 'baseos', PACKAGES)
+    pkgcache.store_packages(tmpdir.join('userspace').strpath)
+
+    mtime = 1000000000
+    for name in ('foo', 'baz', 'bar'):
+        path = pkgcache._get_cache_path(('sha256', hashlib.sha256(PACKAGES[name]).hexdigest()))
+        os.utime(path, (mtime, mtime))
+        mtime += 100
+
+    assert pkgcache._evict(len(PACKAGES['bar']) + len(PACKAGES['baz'])) == len(PACKAGES['bar'] + PACKAGES['baz'])
+    cached = os.listdir(pkgcache.PACKAGE_CACHE_DIR)
+    assert sorted(cached) == sorted(
+        'sha256-{}.rpm'.format(hashlib.sha256(PACKAGES[name]).hexdigest()) for name in ('bar', 'baz')
+    )
+
+
+@pytest.mark.parametrize('size', (None, '0', 'invalid'))
+def test_cache_disabled(monkeypatch, tmpdir, size):
+    # The package cache is opt-in
+    _mock_environment(monkeypatch, tmpdir, size=size)
+    _create_repo_cache(tmpdir.mkdir('userspace'), 'baseos', PACKAGES)
+    pkgcache.store_packages(tmpdir.join('userspace').strpath)
+    assert not os.path.exists(pkgcache.PACKAGE_CACHE_DIR)
+    assert pkgcache.restore_packages(tmpdir.join('userspace').strpath) == 0
+
+
+def test_get_space_to_reserve(monkeypatch, tmpdir):
+    _mock_environment(monkeypatch, tmpdir, size='16')
+    _create_repo_cache(tmpdir.mkdir('userspace'), 'baseos', PACKAGES)
+    # Nothing is stored yet, so the whole limit can still be taken
+    assert pkgcache.get_space_to_reserve(tmpdir.strpath) == 16
+
+    pkgcache.store_packages(tmpdir.join('userspace').strpath)
+    cached_size = sum(len(data) for data in PACKAGES.values())
+    assert pkgcache.get_space_to_reserve(tmpdir.strpath) == (16 * 1024 * 1024 - cached_size) // (1024 * 1024)
+
+    _mock_environment(monkeypatch, tmpdir, size=None)
+    assert pkgcache.get_space_to_reserve(tmpdir.strpath) == 0
+
+
+def test_remove_cache(monkeypatch, tmpdir):
+    _mock_environment(monkeypatch, tmpdir)
+    _create_repo_cache(tmpdir.mkdir('userspace'), 'baseos', PACKAGES)
+    pkgcache.store_packages(tmpdir.join('userspace').strpath)
+    assert os.path.isdir(pkgcache.PACKAGE_CACHE_DIR)
+
+    pkgcache.remove_cache()
+    assert not os.path.exists(pkgcache.PACKAGE_CACHE_DIR)
+    # Nothing happens when there is no cache
+    pkgcache.remove_cache()
@@ -149,7 +149,7 @@ def test_get_available_repo_ids(monkeypatch, other_repofiles, rhsm_repofile):
     result = rhsm.get_available_repo_ids(context_mocked)
 
     rhsm_repos.sort()
-    assert context_mocked.commands_called == [['yum', 'clean', 'all']]
+    assert context_mocked.commands_called == [['yum', 'clean', 'expire-cache']]
     assert result == rhsm_repos
     if result:
         msg = (
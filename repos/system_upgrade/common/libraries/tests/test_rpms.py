@@ -1,4 +1,22 @@
-from leapp.libraries.common.rpms import _parse_config_modification
+import pytest
+
+from leapp.libraries.common import rpms
+from leapp.libraries.common.rpms import (
+    _parse_config_modification,
+    create_rpm_table,
+    get_installed_rpm_index,
+    get_pgpsig_key_id,
+    has_package,
+    InstalledRPMIndex,
+    iter_rpm_rows,
+    verify_files
+)
+from leapp.libraries.common.testutils import CurrentActorMocked, logger_mocked
+from leapp.libraries.stdlib import api
+from leapp.models import InstalledRedHatSignedRPM, InstalledRedHatSignedRPMTable, RPM
+from leapp.models.fields import ModelViolationError
+
+RH_PGPSIG = 'RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 199e2f91fd431d51'
 
 
 def test_parse_config_modification():
@@ -30,3 +48,210 @@ def test_parse_config_modification():
         "S.5....T.  c /etc/ssh/sshd_config",
     ]
     assert _parse_config_modification(data, "/etc/ssh/sshd_config")
+
+
+RPM_VERIFY_OUTPUT = [
+    'S.5....T.  c /etc/ssh/sshd_config',
+    'missing   c /etc/ssh/ssh_config',
+    '.M.......    /usr/bin/ssh',
+    'file /etc/custom.conf is not owned by any package',
+    'Unsatisfied dependencies for openssh-8.0p1-5.el8.x86_64:',
+]
+
+
+def test_verify_files(monkeypatch):
+    calls = []
+
+    def run_mocked(cmd, **dummy_kwargs):
+        calls.append(cmd)
+        return {'stdout': RPM_VERIFY_OUTPUT}
+
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked())
+    monkeypatch.setattr(rpms.stdlib, 'run', run_mocked)
+    monkeypatch.setattr(rpms.os.path, 'lexists', lambda path: True)
+
+    paths = ['/etc/ssh/sshd_config', '/etc/ssh/ssh_config', '/etc/custom.conf', '/etc/ssh/moduli']
+    assert verify_files(paths) == {
+        '/etc/ssh/sshd_config': 'S.5....T.',
+        '/etc/ssh/ssh_config': 'missing',
+        '/etc/custom.conf': None,
+        '/etc/ssh/moduli': '',
+    }
+    assert calls == [['rpm', '-Vf', '--nomtime'] + sorted(paths)]
+
+    # Results of the whole verified packages are cached for the rest of the actor run
+    assert verify_files(['/usr/bin/ssh', '/etc/ssh/sshd_config']) == {
+        '/usr/bin/ssh': '.M.......',
+        '/etc/ssh/sshd_config': 'S.5....T.',
+    }
+    assert rpms.check_file_modification('/etc/ssh/sshd_config')
+    assert not rpms.check_file_modification('/etc/ssh/moduli')
+    assert len(calls) == 1
+
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked())
+    verify_files(['/etc/ssh/sshd_config'])
+    assert len(calls) == 2
+
+
+def test_verify_files_deleted(monkeypatch, tmpdir):
+    # "rpm -Vf" reports just an error for a deleted file
+    def run_mocked(cmd, **dummy_kwargs):
+        return {'stdout': [], 'stderr': ['error: file {}: No such file or directory'.format(cmd[-1])]}
+
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked())
+    monkeypatch.setattr(rpms.stdlib, 'run', run_mocked)
+
+    existing = tmpdir.join('chrony.conf')
+    existing.write('')
+    deleted = tmpdir.join('memcached').strpath
+    assert verify_files([existing.strpath, deleted]) == {existing.strpath: '', deleted: 'missing'}
+    assert not rpms.check_file_modification(deleted)
+
+
+def _make_rpm(name, arch='noarch', module=None, stream=None, pgpsig=RH_PGPSIG, packager='Red Hat, Inc.'):
+    return RPM(name=name, version='0.1', release='1.el8', epoch='0', packager=packager, arch=arch, pgpsig=pgpsig,
+               module=module, stream=stream)
+
+
+def test_get_pgpsig_key_id():
+    assert get_pgpsig_key_id(RH_PGPSIG) == '199e2f91fd431d51'
+    assert get_pgpsig_key_id('RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 199E2F91FD431D51') == \
+        '199e2f91fd431d51'
+    assert get_pgpsig_key_id('(none)') is None
+    assert get_pgpsig_key_id('') is None
+
+
+def test_installed_rpm_index():
+    index = InstalledRPMIndex([
+        _make_rpm('pkg-a', arch='x86_64'),
+        _make_rpm('pkg-a', arch='i686'),
+        _make_rpm('pkg-b', module='mod', stream='1.0', packager='Fedora Project'),
+        _make_rpm('pkg-c', pgpsig='(none)'),
+    ])
+
+    assert len(index) == 4
+    assert index.has_package('pkg-a')
+    assert index.has_package('pkg-a', arch='i686')
+    assert not index.has_package('pkg-a', arch='noarch')
+    assert not index.has_package('pkg-d')
+
+    assert {rpm.arch for rpm in index.get_packages('pkg-a')} == {'x86_64', 'i686'}
+    assert [rpm.arch for rpm in index.get_packages('pkg-a', arch='x86_64')] == ['x86_64']
+    assert not index.get_packages('pkg-d')
+
+    assert [rpm.name for rpm in index.get_packages_by_packager('Fedora Project')] == ['pkg-b']
+    assert [rpm.name for rpm in index.get_packages_by_modulestream('mod', '1.0')] == ['pkg-b']
+    assert not index.get_packages_by_modulestream('mod', '2.0')
+    assert len(index.get_packages_by_key_id('199E2F91FD431D51')) == 3
+    assert [rpm.name for rpm in index.get_packages_by_key_id(None)] == ['pkg-c']
+
+
+def test_installed_rpm_index_is_cached_per_actor(monkeypatch):
+    class CurrentActorCountingMocked(CurrentActorMocked):
+        def __init__(self, *args, **kwargs):
+            super(CurrentActorCountingMocked, self).__init__(*args, **kwargs)
+            self.consumed = 0
+
+        def consume(self, model):
+            self.consumed += 1
+            return super(CurrentActorCountingMocked, self).consume(model)
+
+    actor = CurrentActorCountingMocked(msgs=[InstalledRedHatSignedRPM(items=[_make_rpm('pkg-a')])])
+    monkeypatch.setattr(api, 'current_actor', actor)
+
+    assert has_package(InstalledRedHatSignedRPM, 'pkg-a')
+    assert not has_package(InstalledRedHatSignedRPM, 'pkg-b')
+    assert get_installed_rpm_index(InstalledRedHatSignedRPM).has_package('pkg-a')
+    assert actor.consumed == 1
+
+    # Another actor run has to consume its own messages
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked(
+        msgs=[InstalledRedHatSignedRPM(items=[_make_rpm('pkg-b')])]
+    ))
+    assert not has_package(InstalledRedHatSignedRPM, 'pkg-a')
+    assert has_package(InstalledRedHatSignedRPM, 'pkg-b')
+
+
+def test_rpm_table(monkeypatch):
+    pkgs = [
+        _make_rpm('pkg-a', arch='x86_64'),
+        _make_rpm('pkg-b', module='mod', stream='1.0', packager='Fedora Project'),
+    ]
+    table = create_rpm_table(InstalledRedHatSignedRPMTable, pkgs)
+
+    assert table.names == ['pkg-a', 'pkg-b']
+    assert table.modules == [None, 'mod']
+    rows = list(iter_rpm_rows(table))
+    assert [row.arch for row in rows] == [pkg.arch for pkg in pkgs]
+    assert [row.to_model() for row in rows] == pkgs
+
+    # The rows are indexed the same way as the RPM models
+    monkeypatch.setattr(api, 'current_actor', CurrentActorMocked(msgs=[InstalledRedHatSignedRPM(), table]))
+    assert has_package(InstalledRedHatSignedRPMTable, 'pkg-a', arch='x86_64')
+    assert not has_package(InstalledRedHatSignedRPM, 'pkg-a')
+    index = get_installed_rpm_index(InstalledRedHatSignedRPMTable)
+    assert [rpm.name for rpm in index.get_packages_by_modulestream('mod', '1.0')] == ['pkg-b']
+
+
+def test_rpm_table_columns_length():
+    with pytest.raises(ModelViolationError):
+        InstalledRedHatSignedRPMTable(names=['pkg-a', 'pkg-b'], versions=['1.0'])
+
+    # The columns can be modified after the message has been created
+    table = create_rpm_table(InstalledRedHatSignedRPMTable, [_make_rpm('pkg-a')])
+    table.names.append('pkg-b')
+    with pytest.raises(ModelViolationError):
+        list(iter_rpm_rows(table))
+
+
+class RPMModuleMocked(object):
+    class error(Exception):
+        pass
+
+    def __init__(self, headers=None, db_error=False):
+        self._headers = headers or []
+        self._db_error = db_error
+
+    def TransactionSet(self):
+        return self
+
+    def dbMatch(self):
+        if self._db_error:
+            raise self.error('cannot open Packages database')
+        return iter(self._headers)
+
+
+class HeaderMocked(object):
+    def __init__(self, entry):
+        self.entry = entry
+
+    def format(self, queryformat):
+        return self.entry
+
+
+RPM_ENTRIES = [
+    'tcpdump|4.9.3|2.el8|14|Red Hat, Inc.|x86_64|{}'.format(RH_PGPSIG),
+    'gpg-pubkey|fd431d51|4ae0493b|0|(none)||(none)',
+]
+
+
+def test_iter_installed_rpms_from_rpmdb(monkeypatch):
+    def get_installed_rpms_mocked():
+        raise AssertionError('The rpm tool should not be executed')
+
+    monkeypatch.setattr(rpms, 'rpm', RPMModuleMocked(headers=[HeaderMocked(entry) for entry in RPM_ENTRIES]))
+    monkeypatch.setattr(rpms, 'get_installed_rpms', get_installed_rpms_mocked)
+
+    assert list(rpms.iter_installed_rpms()) == [
+        ('tcpdump', '4.9.3', '2.el8', '14', 'Red Hat, Inc.', 'x86_64', RH_PGPSIG),
+        ('gpg-pubkey', 'fd431d51', '4ae0493b', '0', '(none)', '', '(none)'),
+    ]
+
+
+@pytest.mark.parametrize('rpm_module', (None, RPMModuleMocked(db_error=True)))
+def test_iter_installed_rpms_fallback(monkeypatch, rpm_module):
+    monkeypatch.setattr(rpms, 'rpm', rpm_module)
+    monkeypatch.setattr(rpms, 'get_installed_rpms', lambda: RPM_ENTRIES + [''])
+    monkeypatch.setattr(api, 'current_logger', logger_mocked())
+
+    assert [entry[0] for entry in rpms.iter_installed_rpms()] == ['tcpdump', 'gpg-pubkey']
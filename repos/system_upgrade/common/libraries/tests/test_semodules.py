@@ -0,0 +1,34 @@
+from leapp.libraries.common.semodules import ModuleContents
+from leapp.models import SELinuxModule
+
+CONTENT = '(type mock_type_t)\n' + '(allow mock_type_t proc_type (file (getattr open read)))\n' * 10000
+
+
+def test_module_contents(tmpdir):
+    contents = ModuleContents()
+    modules = [
+        SELinuxModule(name='mock1', priority=400, digest=contents.add(CONTENT), removed=[]),
+        SELinuxModule(name='mock1', priority=300, digest=contents.add(CONTENT), removed=[]),
+        SELinuxModule(name='mock2', priority=400, digest=contents.add('(type mock2_t)\n'), removed=[]),
+    ]
+
+    # the same content is stored only once and compressed
+    stored = contents.to_list()
+    assert len(stored) == 2
+    assert modules[0].digest == modules[1].digest
+    assert sum(len(content.data) for content in stored) < len(CONTENT) // 10
+
+    # contents are read back from the message
+    contents = ModuleContents(stored)
+    for module, expected in zip(modules, (CONTENT, CONTENT, '(type mock2_t)\n')):
+        cil_file = tmpdir.join('{}_{}.cil'.format(module.name, module.priority))
+        contents.write(module, cil_file.strpath)
+        assert cil_file.read() == expected
+
+
+def test_module_contents_inline(tmpdir):
+    # modules with the content stored directly in the model
+    module = SELinuxModule(name='mock1', priority=400, content=CONTENT, removed=[])
+    cil_file = tmpdir.join('mock1.cil')
+    ModuleContents().write(module, cil_file.strpath)
+    assert cil_file.read() == CONTENT
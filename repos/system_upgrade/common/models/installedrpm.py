@@ -1,5 +1,6 @@
 from leapp.models import Model, fields
 from leapp.topics import SystemInfoTopic
+from leapp.utils.deprecation import deprecated
 
 
 class RPM(Model):
@@ -16,14 +17,80 @@ class RPM(Model):
     stream = fields.Nullable(fields.String())
 
 
+@deprecated(since='2026-10-18', message='Replaced by InstalledRPMTable.')
 class InstalledRPM(Model):
+    """
+    List of installed packages.
+
+    The list of all installed packages is provided by the InstalledRPMTable message instead.
+    """
     topic = SystemInfoTopic
     items = fields.List(fields.Model(RPM), default=[])
 
 
-class InstalledRedHatSignedRPM(InstalledRPM):
-    pass
+class InstalledRedHatSignedRPM(Model):
+    """
+    List of installed packages signed by Red Hat.
+
+    The model has the same fields as InstalledRPM, but it is not derived from it as it is not deprecated.
+    """
+    topic = SystemInfoTopic
+    items = fields.List(fields.Model(RPM), default=[])
 
 
+@deprecated(since='2026-10-18', message='Replaced by InstalledUnsignedRPMTable.')
 class InstalledUnsignedRPM(InstalledRPM):
     pass
+
+
+# Columns of the InstalledRPMTable model
+_COLUMNS = ('names', 'epochs', 'packagers', 'versions', 'releases', 'arches', 'pgpsigs', 'repositories', 'modules',
+            'streams')
+
+
+class InstalledRPMTable(Model):
+    """
+    Compact columnar variant of the InstalledRPM message.
+
+    The i-th item of every list belongs to the i-th package, so the message is much smaller than the list of RPM
+    models and consumers needing e.g. just names of packages do not have to create thousands of model instances.
+    Use the iter_rpm_rows function of the rpms library to iterate over views of packages with the RPM attributes.
+    All the columns must have the same length, otherwise ModelViolationError is raised.
+    """
+    topic = SystemInfoTopic
+    names = fields.List(fields.String(), default=[])
+    epochs = fields.List(fields.String(), default=[])
+    packagers = fields.List(fields.String(), default=[])
+    versions = fields.List(fields.String(), default=[])
+    releases = fields.List(fields.String(), default=[])
+    arches = fields.List(fields.String(), default=[])
+    pgpsigs = fields.List(fields.String(), default=[])
+    repositories = fields.List(fields.Nullable(fields.String()), default=[])
+    modules = fields.List(fields.Nullable(fields.String()), default=[])
+    streams = fields.List(fields.Nullable(fields.String()), default=[])
+
+    def __init__(self, *args, **kwargs):
+        super(InstalledRPMTable, self).__init__(*args, **kwargs)
+        self.check_columns()
+
+    def check_columns(self):
+        """
+        Check that all the columns have the same length, so every package has a value in every column.
+
+        :raises ModelViolationError: if the lengths of the columns differ
+        """
+        lengths = {column: len(getattr(self, column)) for column in _COLUMNS}
+        if len(set(lengths.values())) > 1:
+            raise fields.ModelViolationError(
+                'The columns of {} differ in length: {}'.format(
+                    type(self).__name__, ', '.join('{}={}'.format(*item) for item in sorted(lengths.items()))
+                )
+            )
+
+
+class InstalledRedHatSignedRPMTable(InstalledRPMTable):
+    pass
+
+
+class InstalledUnsignedRPMTable(InstalledRPMTable):
+    pass
@@ -2,12 +2,26 @@ from leapp.models import fields, Model
 from leapp.topics import SystemInfoTopic, TransactionTopic
 
 
+class SELinuxModuleContent(Model):
+    """
+    Content of SELinux module in cil, compressed by zlib
+
+    digest - sha256 digest of the uncompressed content
+    data - the compressed content
+    """
+    topic = SystemInfoTopic
+    digest = fields.String()
+    data = fields.Blob()
+
+
 class SELinuxModule(Model):
     """SELinux module in cil including priority"""
     topic = SystemInfoTopic
     name = fields.String()
     priority = fields.Integer()
-    content = fields.String()
+    # empty when the content is stored in SELinuxModules.contents under the digest
+    content = fields.String(default='')
+    digest = fields.Nullable(fields.String(), default=None)
     # lines removed due to content invalid on RHEL 8
     removed = fields.List(fields.String())
 
@@ -18,10 +32,12 @@ class SELinuxModules(Model):
 
     modules - list of custom policy modules (priority != 100,200)
     templates - List of installed udica templates
+    contents - compressed contents of the modules, each stored only once (see SELinuxModule.digest)
     """
     topic = SystemInfoTopic
     modules = fields.List(fields.Model(SELinuxModule))
     templates = fields.List(fields.Model(SELinuxModule))
+    contents = fields.List(fields.Model(SELinuxModuleContent), default=[])
 
 
 class SELinuxCustom(Model):
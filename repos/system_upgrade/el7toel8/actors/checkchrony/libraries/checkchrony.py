@@ -1,5 +1,6 @@
 from leapp import reporting
-from leapp.libraries.stdlib import api, run
+from leapp.libraries.common.rpms import verify_files
+from leapp.libraries.stdlib import api
 
 
 related = [
@@ -11,12 +12,7 @@ related = [
 
 def is_config_default():
     """Check if the chrony config file was not modified since installation."""
-    try:
-        result = run(['rpm', '-V', '--nomtime', 'chrony'], checked=False)
-        return '/etc/chrony.conf' not in result['stdout']
-    except OSError as e:
-        api.current_logger().warning("rpm verification failed: %s", str(e))
-        return True
+    return not verify_files(['/etc/chrony.conf']).get('/etc/chrony.conf')
 
 
 def check_chrony(chrony_installed):
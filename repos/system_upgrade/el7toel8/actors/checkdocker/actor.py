@@ -1,7 +1,7 @@
 from leapp import reporting
 from leapp.actors import Actor
 from leapp.libraries.common.rpms import has_package
-from leapp.models import InstalledRPM
+from leapp.models import InstalledRPMTable
 from leapp.reporting import create_report, Report
 from leapp.tags import ChecksPhaseTag, IPUWorkflowTag
 
@@ -12,12 +12,12 @@ class CheckDocker(Actor):
     """
 
     name = 'check_docker'
-    consumes = (InstalledRPM,)
+    consumes = (InstalledRPMTable,)
     produces = (Report,)
     tags = (ChecksPhaseTag, IPUWorkflowTag)
 
     def process(self):
-        if has_package(InstalledRPM, 'docker'):
+        if has_package(InstalledRPMTable, 'docker'):
             create_report([
                 reporting.Title('Transition from Docker to Podman in RHEL8'),
                 reporting.Summary('Docker has been deprecated in favour of Podman in Red Hat Enterprise Linux 8. The '
@@ -1,4 +1,5 @@
-from leapp.models import InstalledRPM, RPM
+from leapp.libraries.common.rpms import create_rpm_table
+from leapp.models import InstalledRPMTable, RPM
 from leapp.reporting import Report
 from leapp.snactor.fixture import current_actor_context
 
@@ -27,7 +28,7 @@ def test_actor_with_docker_package(current_actor_context):
                 stream=None)
             ]
 
-    current_actor_context.feed(InstalledRPM(items=with_docker))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, with_docker))
     current_actor_context.run()
     assert current_actor_context.consume(Report)
 
@@ -56,6 +57,6 @@ def test_actor_without_docker_package(current_actor_context):
                 stream=None)
             ]
 
-    current_actor_context.feed(InstalledRPM(items=without_docker))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, without_docker))
     current_actor_context.run()
     assert not current_actor_context.consume(Report)
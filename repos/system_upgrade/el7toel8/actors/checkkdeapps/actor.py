@@ -1,6 +1,6 @@
 from leapp.actors import Actor
 from leapp.tags import FactsPhaseTag, IPUWorkflowTag
-from leapp.models import InstalledKdeAppsFacts, InstalledRPM
+from leapp.models import InstalledKdeAppsFacts, InstalledRPMTable
 from leapp.libraries.actor.checkkdeapps import get_kde_apps_info
 
 
@@ -10,7 +10,7 @@ class CheckKdeApps(Actor):
     """
 
     name = 'check_kde_apps'
-    consumes = (InstalledRPM,)
+    consumes = (InstalledRPMTable,)
     produces = (InstalledKdeAppsFacts,)
     tags = (FactsPhaseTag, IPUWorkflowTag)
 
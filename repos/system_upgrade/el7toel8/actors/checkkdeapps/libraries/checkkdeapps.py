@@ -1,6 +1,6 @@
 from leapp.libraries.stdlib import api
 from leapp.libraries.common.rpms import has_package
-from leapp.models import InstalledRPM
+from leapp.models import InstalledRPMTable
 
 
 def get_kde_apps_info():
@@ -17,7 +17,7 @@ def get_kde_apps_info():
 
     api.current_logger().info("  Detecting installed KDE apps  ")
     api.current_logger().info("================================")
-    for app in [application for application in base_kde_apps if has_package(InstalledRPM, application)]:
+    for app in [application for application in base_kde_apps if has_package(InstalledRPMTable, application)]:
         api.current_logger().info("Application {0} is installed.".format(app))
         installed.append(app)
     api.current_logger().info("----------------------------------")
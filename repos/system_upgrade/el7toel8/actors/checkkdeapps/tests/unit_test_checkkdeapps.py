@@ -1,5 +1,6 @@
 from leapp.snactor.fixture import current_actor_context
-from leapp.models import InstalledRPM, RPM, InstalledKdeAppsFacts
+from leapp.libraries.common.rpms import create_rpm_table
+from leapp.models import InstalledRPMTable, RPM, InstalledKdeAppsFacts
 
 
 RH_PACKAGER = 'Red Hat, Inc. <http://bugzilla.redhat.com/bugzilla>'
@@ -20,28 +21,30 @@ polari_RPM = RPM(name='polari', version='0.1', release='1.sm01', epoch='1', pack
 
 
 def test_no_app_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, []))
     current_actor_context.run()
     message = current_actor_context.consume(InstalledKdeAppsFacts)[0]
     assert not message.installed_apps
 
 
 def test_no_KDE_app_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[epiphany_PRM, polari_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [epiphany_PRM, polari_RPM]))
     current_actor_context.run()
     message = current_actor_context.consume(InstalledKdeAppsFacts)[0]
     assert not message.installed_apps
 
 
 def test_only_KDE_apps_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[okular_RPM, kdenetwork_RPM, kate_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [okular_RPM, kdenetwork_RPM, kate_RPM]))
     current_actor_context.run()
     message = current_actor_context.consume(InstalledKdeAppsFacts)[0]
     assert len(message.installed_apps) == 3
 
 
 def test_many_apps_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[okular_RPM, kdenetwork_RPM, kate_RPM, epiphany_PRM, polari_RPM]))
+    current_actor_context.feed(create_rpm_table(
+        InstalledRPMTable, [okular_RPM, kdenetwork_RPM, kate_RPM, epiphany_PRM, polari_RPM]
+    ))
     current_actor_context.run()
     message = current_actor_context.consume(InstalledKdeAppsFacts)[0]
     assert len(message.installed_apps) == 3
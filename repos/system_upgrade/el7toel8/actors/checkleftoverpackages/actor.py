@@ -1,6 +1,6 @@
 from leapp.actors import Actor
 from leapp.libraries.common.rpms import get_installed_rpms
-from leapp.models import LeftoverPackages, TransactionCompleted, InstalledUnsignedRPM, RPM
+from leapp.models import LeftoverPackages, TransactionCompleted, InstalledUnsignedRPMTable, RPM
 from leapp.tags import RPMUpgradePhaseTag, IPUWorkflowTag
 
 
@@ -12,7 +12,7 @@ class CheckLeftoverPackages(Actor):
     """
 
     name = 'check_leftover_packages'
-    consumes = (TransactionCompleted, InstalledUnsignedRPM)
+    consumes = (TransactionCompleted, InstalledUnsignedRPMTable)
     produces = (LeftoverPackages,)
     tags = (RPMUpgradePhaseTag, IPUWorkflowTag)
 
@@ -24,7 +24,8 @@ class CheckLeftoverPackages(Actor):
             return
 
         to_remove = LeftoverPackages()
-        unsigned = [pkg.name for pkg in next(self.consume(InstalledUnsignedRPM), InstalledUnsignedRPM()).items]
+        unsigned = next(self.consume(InstalledUnsignedRPMTable), InstalledUnsignedRPMTable()).names
+        ignored = set(unsigned + LEAPP_PACKAGES)
 
         for rpm in installed_rpms:
             rpm = rpm.strip()
@@ -32,7 +33,7 @@ class CheckLeftoverPackages(Actor):
                 continue
             name, version, release, epoch, packager, arch, pgpsig = rpm.split('|')
 
-            if 'el7' in release and name not in set(unsigned + LEAPP_PACKAGES):
+            if 'el7' in release and name not in ignored:
                 to_remove.items.append(RPM(
                     name=name,
                     version=version,
@@ -1,7 +1,8 @@
 import re
 
 from leapp import reporting
-from leapp.libraries.stdlib import api, run
+from leapp.libraries.common.rpms import verify_files
+from leapp.libraries.stdlib import api
 
 
 COMMON_REPORT_TAGS = [reporting.Tags.SERVICES]
@@ -17,12 +18,7 @@ related = [
 
 def is_sysconfig_default():
     """Check if the memcached sysconfig file was not modified since installation."""
-    try:
-        result = run(['rpm', '-V', '--nomtime', 'memcached'], checked=False)
-        return sysconfig_path not in result['stdout']
-    except OSError as e:
-        api.current_logger().warning("rpm verification failed: %s", str(e))
-        return True
+    return not verify_files([sysconfig_path]).get(sysconfig_path)
 
 
 def is_udp_disabled():
@@ -1,6 +1,6 @@
 from leapp.actors import Actor
 from leapp.libraries.actor.checkmultiplepackageversions import check
-from leapp.models import InstalledRPM
+from leapp.models import InstalledRPMTable
 from leapp.reporting import Report
 from leapp.tags import IPUWorkflowTag, ChecksPhaseTag
 
@@ -14,7 +14,7 @@ class CheckMultiplePackageVersions(Actor):
     """
 
     name = 'multiple_package_versions'
-    consumes = (InstalledRPM,)
+    consumes = (InstalledRPMTable,)
     produces = (Report,)
     tags = (IPUWorkflowTag, ChecksPhaseTag)
 
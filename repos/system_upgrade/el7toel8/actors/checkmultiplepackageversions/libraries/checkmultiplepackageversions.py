@@ -1,5 +1,5 @@
 from leapp.libraries.common.rpms import has_package
-from leapp.models import InstalledRPM
+from leapp.models import InstalledRPMTable
 from leapp.reporting import create_report, Title, Summary, Severity, Flags, Remediation, RelatedResource
 
 # package_name: remedy information
@@ -16,7 +16,7 @@ def check():
     related_resources = []
     for package, details in PROBLEM_PACKAGE_MAP.items():
         name, arch = package.split('.')
-        if has_package(InstalledRPM, name, arch) and has_package(InstalledRPM, name, 'x86_64'):
+        if has_package(InstalledRPMTable, name, arch) and has_package(InstalledRPMTable, name, 'x86_64'):
             actual_problems.append(package)
             # generate RelatedResources for the report
             related_resources.append(RelatedResource('package', package))
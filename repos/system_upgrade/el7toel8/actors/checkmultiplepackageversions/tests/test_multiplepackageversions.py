@@ -1,7 +1,8 @@
 import mock
 
 from leapp.actors import Actor
-from leapp.models import InstalledRPM, Report, RPM
+from leapp.libraries.common.rpms import create_rpm_table
+from leapp.models import InstalledRPMTable, Report, RPM
 
 
 def test_x32_x64(current_actor_context):
@@ -21,7 +22,7 @@ def test_x32_x64(current_actor_context):
            pgpsig='RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 5326810137017186')
        ]
 
-    current_actor_context.feed(InstalledRPM(items=problem_rpms))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, problem_rpms))
     current_actor_context.run()
     report = current_actor_context.consume(Report)[0].report
     assert report['title'] == ('Some packages have both 32bit and 64bit version installed which are known to'
@@ -39,7 +40,7 @@ def test_1_package(current_actor_context):
            arch='i686',
            pgpsig='RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 5326810137017186')
     ]
-    current_actor_context.feed(InstalledRPM(items=problem_rpms))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, problem_rpms))
     current_actor_context.run()
     report = current_actor_context.consume(Report)[0].report
     assert report['title'] == ('Some packages have both 32bit and 64bit version installed which are known to'
@@ -59,7 +60,7 @@ def test_x64_only(current_actor_context):
            pgpsig='RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 5326810137017186')
        ]
 
-    current_actor_context.feed(InstalledRPM(items=ok_rpms))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, ok_rpms))
     current_actor_context.run()
     assert not current_actor_context.consume(Report)
 
@@ -74,6 +75,6 @@ def test_x32_only(current_actor_context):
            arch='i686', pgpsig='RSA/SHA256, Mon 01 Jan 1970 00:00:00 AM -03, Key ID 5326810137017186'),
        ]
 
-    current_actor_context.feed(InstalledRPM(items=ok_rpms))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, ok_rpms))
     current_actor_context.run()
     assert not current_actor_context.consume(Report)
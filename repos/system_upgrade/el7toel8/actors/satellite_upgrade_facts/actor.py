@@ -2,11 +2,11 @@ import os
 
 from leapp.actors import Actor
 from leapp.libraries.common.config import architecture
-from leapp.libraries.common.rpms import has_package
+from leapp.libraries.common.rpms import has_package, iter_rpm_rows
 from leapp.libraries.stdlib import run
 from leapp.models import (
     DNFWorkaround,
-    InstalledRPM,
+    InstalledRPMTable,
     Module,
     RepositoriesSetupTasks,
     RpmTransactionTasks,
@@ -24,7 +24,7 @@ class SatelliteUpgradeFacts(Actor):
     """
 
     name = 'satellite_upgrade_facts'
-    consumes = (InstalledRPM, )
+    consumes = (InstalledRPMTable, )
     produces = (DNFWorkaround, RepositoriesSetupTasks, RpmTransactionTasks, SatelliteFacts)
     tags = (IPUWorkflowTag, FactsPhaseTag)
 
@@ -32,22 +32,22 @@ class SatelliteUpgradeFacts(Actor):
         if not architecture.matches_architecture(architecture.ARCH_X86_64):
             return
 
-        has_foreman = has_package(InstalledRPM, 'foreman') or has_package(InstalledRPM, 'foreman-proxy')
+        has_foreman = has_package(InstalledRPMTable, 'foreman') or has_package(InstalledRPMTable, 'foreman-proxy')
         if not has_foreman:
             return
 
-        has_katello_installer = has_package(InstalledRPM, 'foreman-installer-katello')
+        has_katello_installer = has_package(InstalledRPMTable, 'foreman-installer-katello')
 
-        local_postgresql = has_package(InstalledRPM, 'rh-postgresql12-postgresql-server')
-        postgresql_contrib = has_package(InstalledRPM, 'rh-postgresql12-postgresql-contrib')
-        postgresql_evr = has_package(InstalledRPM, 'rh-postgresql12-postgresql-evr')
+        local_postgresql = has_package(InstalledRPMTable, 'rh-postgresql12-postgresql-server')
+        postgresql_contrib = has_package(InstalledRPMTable, 'rh-postgresql12-postgresql-contrib')
+        postgresql_evr = has_package(InstalledRPMTable, 'rh-postgresql12-postgresql-evr')
 
         to_remove = ['tfm-runtime', 'tfm-pulpcore-runtime', 'rh-redis5-runtime', 'rh-ruby27-runtime',
                      'rh-python38-runtime']
         to_install = ['rubygem-foreman_maintain']
         modules_to_enable = [Module(name='ruby', stream='2.7')]
 
-        if has_package(InstalledRPM, 'katello'):
+        if has_package(InstalledRPMTable, 'katello'):
             # enable modules that are needed for Candlepin, which is pulled in by Katello
             modules_to_enable.append(Module(name='pki-core', stream='10.6'))
             modules_to_enable.append(Module(name='pki-deps', stream='10.6'))
@@ -55,12 +55,12 @@ class SatelliteUpgradeFacts(Actor):
             modules_to_enable.append(Module(name='python38', stream='3.8'))
             to_install.append('katello')
 
-        if has_package(InstalledRPM, 'rh-redis5-redis'):
+        if has_package(InstalledRPMTable, 'rh-redis5-redis'):
             modules_to_enable.append(Module(name='redis', stream='5'))
             to_install.append('redis')
 
-        for rpm_pkgs in self.consume(InstalledRPM):
-            for pkg in rpm_pkgs.items:
+        for rpm_pkgs in self.consume(InstalledRPMTable):
+            for pkg in iter_rpm_rows(rpm_pkgs):
                 if (pkg.name.startswith('tfm-rubygem-hammer') or pkg.name.startswith('tfm-rubygem-foreman')
                         or pkg.name.startswith('tfm-rubygem-katello')
                         or pkg.name.startswith('tfm-rubygem-smart_proxy')):
@@ -131,10 +131,10 @@ class SatelliteUpgradeFacts(Actor):
         ))
 
         repositories_to_enable = ['satellite-maintenance-6.11-for-rhel-8-x86_64-rpms']
-        if has_package(InstalledRPM, 'satellite'):
+        if has_package(InstalledRPMTable, 'satellite'):
             repositories_to_enable.append('satellite-6.11-for-rhel-8-x86_64-rpms')
             modules_to_enable.append(Module(name='satellite', stream='el8'))
-        elif has_package(InstalledRPM, 'satellite-capsule'):
+        elif has_package(InstalledRPMTable, 'satellite-capsule'):
             repositories_to_enable.append('satellite-capsule-6.11-for-rhel-8-x86_64-rpms')
             modules_to_enable.append(Module(name='satellite-capsule', stream='el8'))
 
@@ -1,9 +1,10 @@
 import os
 
 from leapp.libraries.common.config import mock_configs
+from leapp.libraries.common.rpms import create_rpm_table
 from leapp.models import (
     DNFWorkaround,
-    InstalledRPM,
+    InstalledRPMTable,
     Module,
     RepositoriesSetupTasks,
     RPM,
@@ -30,56 +31,56 @@ SATELLITE_CAPSULE_RPM = fake_package('satellite-capsule')
 
 
 def test_no_satellite_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, []))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     message = current_actor_context.consume(SatelliteFacts)
     assert not message
 
 
 def test_satellite_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     message = current_actor_context.consume(SatelliteFacts)[0]
     assert message.has_foreman
 
 
 def test_wrong_arch(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG_S390X)
     message = current_actor_context.consume(SatelliteFacts)
     assert not message
 
 
 def test_satellite_capsule_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_PROXY_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_PROXY_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     message = current_actor_context.consume(SatelliteFacts)[0]
     assert message.has_foreman
 
 
 def test_no_katello_installer_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     message = current_actor_context.consume(SatelliteFacts)[0]
     assert not message.has_katello_installer
 
 
 def test_katello_installer_present(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_RPM, KATELLO_INSTALLER_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_RPM, KATELLO_INSTALLER_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     message = current_actor_context.consume(SatelliteFacts)[0]
     assert message.has_katello_installer
 
 
 def test_enables_ruby_module(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     message = current_actor_context.consume(RpmTransactionTasks)[0]
     assert Module(name='ruby', stream='2.7') in message.modules_to_enable
 
 
 def test_enables_pki_modules(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_RPM, KATELLO_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_RPM, KATELLO_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     message = current_actor_context.consume(RpmTransactionTasks)[0]
     assert Module(name='pki-core', stream='10.6') in message.modules_to_enable
@@ -87,7 +88,7 @@ def test_enables_pki_modules(current_actor_context):
 
 
 def test_enables_satellite_module(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_RPM, SATELLITE_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_RPM, SATELLITE_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     message = current_actor_context.consume(RpmTransactionTasks)[0]
     assert Module(name='satellite', stream='el8') in message.modules_to_enable
@@ -95,7 +96,7 @@ def test_enables_satellite_module(current_actor_context):
 
 
 def test_enables_satellite_capsule_module(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_PROXY_RPM, SATELLITE_CAPSULE_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_PROXY_RPM, SATELLITE_CAPSULE_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
     message = current_actor_context.consume(RpmTransactionTasks)[0]
     assert Module(name='satellite-capsule', stream='el8') in message.modules_to_enable
@@ -113,7 +114,7 @@ def test_detects_local_postgresql(monkeypatch, current_actor_context):
         return mocked_stat
     monkeypatch.setattr("os.stat", mock_stat())
 
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_RPM, POSTGRESQL_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_RPM, POSTGRESQL_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
 
     rpmmessage = current_actor_context.consume(RpmTransactionTasks)[0]
@@ -126,7 +127,7 @@ def test_detects_local_postgresql(monkeypatch, current_actor_context):
 
 
 def test_detects_remote_postgresql(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
 
     rpmmessage = current_actor_context.consume(RpmTransactionTasks)[0]
@@ -139,7 +140,7 @@ def test_detects_remote_postgresql(current_actor_context):
 
 
 def test_enables_right_repositories_on_satellite(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_RPM, SATELLITE_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_RPM, SATELLITE_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
 
     rpmmessage = current_actor_context.consume(RepositoriesSetupTasks)[0]
@@ -150,7 +151,7 @@ def test_enables_right_repositories_on_satellite(current_actor_context):
 
 
 def test_enables_right_repositories_on_capsule(current_actor_context):
-    current_actor_context.feed(InstalledRPM(items=[FOREMAN_PROXY_RPM, SATELLITE_CAPSULE_RPM]))
+    current_actor_context.feed(create_rpm_table(InstalledRPMTable, [FOREMAN_PROXY_RPM, SATELLITE_CAPSULE_RPM]))
     current_actor_context.run(config_model=mock_configs.CONFIG)
 
     rpmmessage = current_actor_context.consume(RepositoriesSetupTasks)[0]
@@ -1,6 +1,6 @@
 from leapp.actors import Actor
 from leapp.libraries.actor import checkdeprecatedrpmsignature
-from leapp.models import CryptoPolicyInfo, InstalledRPM, Report
+from leapp.models import CryptoPolicyInfo, InstalledRPMTable, Report
 from leapp.tags import ChecksPhaseTag, IPUWorkflowTag
 
 
@@ -32,7 +32,7 @@ class CheckDeprecatedRPMSignature(Actor):
     """
 
     name = 'check_deprecated_rpm_signature'
-    consumes = (CryptoPolicyInfo, InstalledRPM)
+    consumes = (CryptoPolicyInfo, InstalledRPMTable)
     produces = (Report,)
     tags = (IPUWorkflowTag, ChecksPhaseTag)
 
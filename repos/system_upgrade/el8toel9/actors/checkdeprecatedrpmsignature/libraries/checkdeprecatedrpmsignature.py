@@ -1,6 +1,7 @@
 from leapp import reporting
+from leapp.libraries.common.rpms import iter_rpm_rows
 from leapp.libraries.stdlib import api
-from leapp.models import CryptoPolicyInfo, InstalledRPM
+from leapp.models import CryptoPolicyInfo, InstalledRPMTable
 
 FMT_LIST_SEPARATOR = '\n    - '
 
@@ -35,7 +36,7 @@ CRYPTO_POLICIES_URL = 'https://red.ht/rhel-9-security-considerations'
 
 
 def _get_rpms_with_sha1_sig():
-    installed_rpms = next(api.consume(InstalledRPM)).items
+    installed_rpms = iter_rpm_rows(next(api.consume(InstalledRPMTable)))
     return [pkg for pkg in installed_rpms if 'SHA1,' in pkg.pgpsig]
 
 
@@ -1,6 +1,6 @@
 from leapp.actors import Actor
 from leapp.libraries.actor import checkifcfg_ifcfg as ifcfg
-from leapp.models import InstalledRPM, Report, RpmTransactionTasks
+from leapp.models import InstalledRPMTable, Report, RpmTransactionTasks
 from leapp.tags import FactsPhaseTag, IPUWorkflowTag
 
 
@@ -16,7 +16,7 @@ class CheckIfcfg(Actor):
     """
 
     name = "check_ifcfg"
-    consumes = (InstalledRPM,)
+    consumes = (InstalledRPMTable,)
     produces = (Report, RpmTransactionTasks,)
     tags = (IPUWorkflowTag, FactsPhaseTag,)
 
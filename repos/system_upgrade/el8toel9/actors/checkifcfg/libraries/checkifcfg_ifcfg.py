@@ -3,7 +3,7 @@ import os
 from leapp import reporting
 from leapp.libraries.common.rpms import has_package
 from leapp.libraries.stdlib import api
-from leapp.models import InstalledRPM, RpmTransactionTasks
+from leapp.models import InstalledRPMTable, RpmTransactionTasks
 
 FMT_LIST_SEPARATOR = '\n    - '
 
@@ -26,7 +26,7 @@ def process():
     not_controlled_files = []
     rpms_to_install = []
 
-    if not has_package(InstalledRPM, 'network-scripts'):
+    if not has_package(InstalledRPMTable, 'network-scripts'):
         # If network-scripts package was not installed,
         # we don't do anything.
         return
@@ -143,7 +143,7 @@ def process():
         ])
 
     if rpms_to_install:
-        if not has_package(InstalledRPM, 'NetworkManager'):
+        if not has_package(InstalledRPMTable, 'NetworkManager'):
             # If the user was not using NetworkManager previously,
             # make sure NetworkManager is configured consistently with how
             # network-scripts behaved.
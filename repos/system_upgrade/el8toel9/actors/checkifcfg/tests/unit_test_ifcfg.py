@@ -3,9 +3,10 @@ import six
 
 from leapp import reporting
 from leapp.libraries.actor import checkifcfg_ifcfg as ifcfg
+from leapp.libraries.common.rpms import create_rpm_table
 from leapp.libraries.common.testutils import create_report_mocked, CurrentActorMocked, produce_mocked
 from leapp.libraries.stdlib import api
-from leapp.models import InstalledRPM, RPM, RpmTransactionTasks
+from leapp.models import InstalledRPMTable, RPM, RpmTransactionTasks
 
 RH_PACKAGER = 'Red Hat, Inc. <http://bugzilla.redhat.com/bugzilla>'
 
@@ -22,11 +23,11 @@ NETWORK_MANAGER_RPM = RPM(
 )
 
 INITSCRIPTS_INSTALLED = CurrentActorMocked(
-    msgs=[InstalledRPM(items=[NETWORK_SCRIPTS_RPM])]
+    msgs=[create_rpm_table(InstalledRPMTable, [NETWORK_SCRIPTS_RPM])]
 )
 
 INITSCRIPTS_AND_NM_INSTALLED = CurrentActorMocked(
-    msgs=[InstalledRPM(items=[NETWORK_SCRIPTS_RPM, NETWORK_MANAGER_RPM])]
+    msgs=[create_rpm_table(InstalledRPMTable, [NETWORK_SCRIPTS_RPM, NETWORK_MANAGER_RPM])]
 )
 
 
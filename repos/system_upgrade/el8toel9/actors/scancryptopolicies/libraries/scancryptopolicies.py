@@ -1,7 +1,8 @@
 import os
 
 from leapp.exceptions import StopActorExecutionError
-from leapp.libraries.stdlib import api, run
+from leapp.libraries.common.rpms import verify_files
+from leapp.libraries.stdlib import api
 from leapp.models import CryptoPolicyInfo, CustomCryptoPolicy, CustomCryptoPolicyModule
 
 CRYPTO_CURRENT_STATE_FILE = '/etc/crypto-policies/state/current'
@@ -35,20 +36,9 @@ def find_rpm_untracked(files):
     """Check if the list of files is tracked by RPM"""
     if not files:
         return []
-    try:
-        res = run(['rpm', '-Vf', ] + files, split=True, checked=False)
-    except OSError as err:
-        error = 'Failed to invoke rpm to check untracked files: {}'.format(str(err))
-        api.current_logger().error(error)
-        return []
-
+    verification = verify_files(files)
     # return only untracked files from the list
-    out = []
-    for file in files:
-        exp = "file {} is not owned by any package".format(file)
-        if exp in res['stdout']:
-            out.append(file)
-    return out
+    return [file for file in files if file in verification and verification[file] is None]
 
 
 def read_policy_dirs(dirs, obj, extension):